@@ -0,0 +1,143 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi_jwt import JwtAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.async_endpoints.parties import delete_party, external_identifier_payload
+from app.api.v1.endpoints.organisations import create_organisation_links
+from app.api.v1.fieldsets import Fieldset, get_fieldset
+from app.api.v1.filtering import ListQuery, get_list_query
+from app.db.session import get_async_db
+from app.models.organisation import Organisation
+from app.models.outbox_event import OutboxEvent
+from app.models.party import Party
+from app.routes.auth import auth_scheme, require_roles
+from app.schemas.hateoas import HypermediaModel
+from app.schemas.organisation import OrganisationCreate, OrganisationRead
+from app.services.party_search import reindex_party
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[HypermediaModel])
+async def read_organisations(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    list_query: ListQuery = Depends(get_list_query),
+    fieldset: Fieldset = Depends(get_fieldset),
+    db: AsyncSession = Depends(get_async_db),
+    credentials: JwtAuthorizationCredentials = Depends(auth_scheme),
+):
+    require_roles(credentials, ["user"])
+    query = list_query.apply(select(Organisation), Organisation)
+    query = fieldset.apply(query, Organisation, OrganisationRead)
+    organisations = (await db.scalars(query.offset(skip).limit(limit))).all()
+    return [
+        {
+            "data": fieldset.dump(org, OrganisationRead),
+            "links": create_organisation_links(request, org.party_id) if fieldset.links else []
+        }
+        for org in organisations
+    ]
+
+@router.post("/", response_model=HypermediaModel)
+async def create_organisation(
+    org: OrganisationCreate,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    credentials: JwtAuthorizationCredentials = Depends(auth_scheme),
+):
+    require_roles(credentials, ["user"])
+    party = Party(party_type="organisation", display_name=org.organisation_name)
+    db.add(party)
+    await db.flush()
+
+    db_org = Organisation(party_id=party.party_id, **org.model_dump())
+    db.add(db_org)
+    db.add(OutboxEvent(
+        event_type="OrganisationCreated",
+        payload={
+            "party_id": party.party_id,
+            "organisation_name": org.organisation_name
+        }
+    ))
+    await db.run_sync(reindex_party, party.party_id)
+    await db.commit()
+
+    return {
+        "data": OrganisationRead.from_orm(db_org),
+        "links": create_organisation_links(request, db_org.party_id)
+    }
+
+@router.get("/{party_id:int}", response_model=HypermediaModel)
+async def read_organisation(
+    party_id: int,
+    request: Request,
+    fieldset: Fieldset = Depends(get_fieldset),
+    db: AsyncSession = Depends(get_async_db),
+    credentials: JwtAuthorizationCredentials = Depends(auth_scheme),
+):
+    require_roles(credentials, ["user"])
+    query = fieldset.apply(select(Organisation), Organisation, OrganisationRead)
+    db_org = await db.scalar(query.where(Organisation.party_id == party_id))
+    if db_org is None:
+        raise HTTPException(status_code=404, detail="Organisation not found")
+    return {
+        "data": fieldset.dump(db_org, OrganisationRead),
+        "links": create_organisation_links(request, db_org.party_id) if fieldset.links else []
+    }
+
+@router.put("/{party_id:int}", response_model=HypermediaModel)
+async def update_organisation(
+    party_id: int,
+    org_update: OrganisationCreate,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    credentials: JwtAuthorizationCredentials = Depends(auth_scheme),
+):
+    require_roles(credentials, ["user"])
+    db_org = await db.get(Organisation, party_id)
+    if not db_org:
+        raise HTTPException(status_code=404, detail="Organisation not found")
+    db_org.organisation_name = org_update.organisation_name
+    party = await db.get(Party, party_id)
+    if party:
+        party.display_name = org_update.organisation_name
+    db.add(OutboxEvent(
+        event_type="OrganisationUpdated",
+        payload={
+            "party_id": party_id,
+            "organisation_name": org_update.organisation_name,
+            "external_identifiers": await external_identifier_payload(db, party_id)
+        }
+    ))
+    await db.run_sync(reindex_party, party_id)
+    await db.commit()
+    return {
+        "data": OrganisationRead.from_orm(db_org),
+        "links": create_organisation_links(request, db_org.party_id)
+    }
+
+@router.delete("/{party_id:int}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_organisation(
+    party_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    credentials: JwtAuthorizationCredentials = Depends(auth_scheme),
+):
+    require_roles(credentials, ["user"])
+    db_org = await db.get(Organisation, party_id)
+    if not db_org:
+        raise HTTPException(status_code=404, detail="Organisation not found")
+    db.add(OutboxEvent(
+        event_type="OrganisationDeleted",
+        payload={
+            "party_id": party_id,
+            "external_identifiers": await external_identifier_payload(db, party_id)
+        }
+    ))
+    await db.run_sync(delete_party, db_org)
+    await db.commit()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
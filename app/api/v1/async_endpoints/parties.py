@@ -0,0 +1,63 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi_jwt import JwtAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.api.v1.endpoints.parties import create_party_links
+from app.api.v1.fieldsets import Fieldset, get_fieldset
+from app.api.v1.filtering import ListQuery, get_list_query
+from app.db.session import get_async_db
+from app.models.external_identifier import ExternalIdentifier
+from app.models.party import Party
+from app.routes.auth import auth_scheme, require_roles
+from app.schemas.hateoas import HypermediaModel
+from app.schemas.party import PartyRead
+from app.services import hierarchy
+from app.services.party_search import remove_parties
+
+router = APIRouter()
+
+
+def delete_party(db: Session, subtype):
+    """Delete a party and its subtype row; the ORM cascades load collections, so this runs under run_sync."""
+    hierarchy.remove_party(db, subtype.party_id)
+    db.delete(subtype)
+    party = db.get(Party, subtype.party_id)
+    if party:
+        db.delete(party)
+    remove_parties(db, [subtype.party_id])
+
+
+async def external_identifier_payload(db: AsyncSession, party_id: int) -> list[dict]:
+    identifiers = await db.scalars(select(ExternalIdentifier).where(ExternalIdentifier.party_id == party_id))
+    return [{"system_name": ei.system_name, "external_id": ei.external_id} for ei in identifiers]
+
+
+@router.get("/", response_model=List[HypermediaModel])
+async def read_parties(request: Request, skip: int = 0, limit: int = 100, list_query: ListQuery = Depends(get_list_query), fieldset: Fieldset = Depends(get_fieldset), credentials: JwtAuthorizationCredentials = Depends(auth_scheme), db: AsyncSession = Depends(get_async_db)):
+    require_roles(credentials, ["user"])
+    query = list_query.apply(select(Party), Party)
+    query = fieldset.apply(query, Party, PartyRead, "party_type")
+    parties = (await db.scalars(query.offset(skip).limit(limit))).all()
+    return [
+        {
+            "data": fieldset.dump(party, PartyRead),
+            "links": create_party_links(request, party) if fieldset.links else []
+        }
+        for party in parties
+    ]
+
+@router.get("/{party_id:int}", response_model=HypermediaModel)
+async def read_party(party_id: int, request: Request, fieldset: Fieldset = Depends(get_fieldset), credentials: JwtAuthorizationCredentials = Depends(auth_scheme), db: AsyncSession = Depends(get_async_db)):
+    require_roles(credentials, ["user"])
+    query = fieldset.apply(select(Party), Party, PartyRead, "party_type")
+    db_party = await db.scalar(query.where(Party.party_id == party_id))
+    if db_party is None:
+        raise HTTPException(status_code=404, detail="Party not found")
+    return {
+        "data": fieldset.dump(db_party, PartyRead),
+        "links": create_party_links(request, db_party) if fieldset.links else []
+    }
@@ -0,0 +1,146 @@
+import asyncio
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi_jwt import JwtAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.async_endpoints.parties import delete_party, external_identifier_payload
+from app.api.v1.endpoints.persons import create_person_links
+from app.api.v1.fieldsets import Fieldset, get_fieldset
+from app.api.v1.filtering import ListQuery, get_list_query
+from app.config import settings
+from app.db.session import get_async_db
+from app.models.outbox_event import OutboxEvent
+from app.models.party import Party
+from app.models.person import Person
+from app.routes.auth import auth_scheme, require_roles
+from app.schemas.hateoas import HypermediaModel
+from app.schemas.person import PersonCreate, PersonRead
+from app.services.party_search import reindex_party
+from app.services.write_coalescer import write_coalescer
+
+router = APIRouter()
+
+
+async def coalesced_write(kind: str, args, db: AsyncSession):
+    """Queue a person write with the sync routes' writes, so coalescing still applies with async handlers."""
+    # The write happens on the coalescer's session; keep this client's reads on the primary all the same
+    db.sync_session.wrote = True
+    return await asyncio.wrap_future(write_coalescer.submit(kind, args))
+
+
+@router.get("/", response_model=List[HypermediaModel])
+async def read_persons(request: Request, skip: int = 0, limit: int = 100, list_query: ListQuery = Depends(get_list_query), fieldset: Fieldset = Depends(get_fieldset), db: AsyncSession = Depends(get_async_db), credentials: JwtAuthorizationCredentials = Depends(auth_scheme)):
+    require_roles(credentials, ["user"])
+    query = list_query.apply(select(Person), Person)
+    query = fieldset.apply(query, Person, PersonRead)
+    persons = (await db.scalars(query.offset(skip).limit(limit))).all()
+    return [
+        {
+            "data": fieldset.dump(person, PersonRead),
+            "links": create_person_links(request, person.party_id) if fieldset.links else []
+        }
+        for person in persons
+    ]
+
+@router.get("/{party_id:int}", response_model=HypermediaModel)
+async def read_person(party_id: int, request: Request, fieldset: Fieldset = Depends(get_fieldset), db: AsyncSession = Depends(get_async_db), credentials: JwtAuthorizationCredentials = Depends(auth_scheme)):
+    require_roles(credentials, ["user"])
+    query = fieldset.apply(select(Person), Person, PersonRead)
+    db_person = await db.scalar(query.where(Person.party_id == party_id))
+    if db_person is None:
+        raise HTTPException(status_code=404, detail="Person not found")
+    return {
+        "data": fieldset.dump(db_person, PersonRead),
+        "links": create_person_links(request, db_person.party_id) if fieldset.links else []
+    }
+
+@router.post("/", response_model=HypermediaModel)
+async def create_person(person: PersonCreate, request: Request, db: AsyncSession = Depends(get_async_db), credentials: JwtAuthorizationCredentials = Depends(auth_scheme)):
+    require_roles(credentials, ["user"])
+    if settings.WRITE_COALESCING_ENABLED:
+        db_person = await coalesced_write("person_create", person, db)
+        return {"data": db_person, "links": create_person_links(request, db_person.party_id)}
+
+    party = Party(party_type="person", display_name=f"{person.first_name} {person.last_name}")
+    db.add(party)
+    await db.flush()
+
+    db_person = Person(party_id=party.party_id, **person.model_dump())
+    db.add(db_person)
+    db.add(OutboxEvent(
+        event_type="PersonCreated",
+        payload={
+            "party_id": party.party_id,
+            "first_name": person.first_name,
+            "last_name": person.last_name,
+            "email": person.email
+        }
+    ))
+    # Services are written against Session; run_sync hands them one on this connection
+    await db.run_sync(reindex_party, party.party_id)
+    await db.commit()
+
+    return {
+        "data": PersonRead.from_orm(db_person),
+        "links": create_person_links(request, db_person.party_id)
+    }
+
+@router.put("/persons/{party_id:int}", response_model=HypermediaModel)
+async def update_person(party_id: int, person_update: PersonCreate, request: Request, db: AsyncSession = Depends(get_async_db), credentials: JwtAuthorizationCredentials = Depends(auth_scheme)):
+    require_roles(credentials, ["user"])
+    if settings.WRITE_COALESCING_ENABLED:
+        db_person = await coalesced_write("person_update", (party_id, person_update), db)
+        if db_person is None:
+            raise HTTPException(status_code=404, detail="Person not found")
+        return {"data": db_person, "links": create_person_links(request, db_person.party_id)}
+
+    db_person = await db.get(Person, party_id)
+    if not db_person:
+        raise HTTPException(status_code=404, detail="Person not found")
+
+    db_person.first_name = person_update.first_name
+    db_person.last_name = person_update.last_name
+    db_person.email = person_update.email
+    party = await db.get(Party, party_id)
+    if party:
+        party.display_name = f"{person_update.first_name} {person_update.last_name}"
+
+    db.add(OutboxEvent(
+        event_type="PersonUpdated",
+        payload={
+            "party_id": party_id,
+            "first_name": person_update.first_name,
+            "last_name": person_update.last_name,
+            "email": person_update.email,
+            "external_identifiers": await external_identifier_payload(db, party_id)
+        }
+    ))
+    await db.run_sync(reindex_party, party_id)
+    await db.commit()
+
+    return {
+        "data": PersonRead.from_orm(db_person),
+        "links": create_person_links(request, db_person.party_id)
+    }
+
+@router.delete("/persons/{party_id:int}", status_code=status.HTTP_204_NO_CONTENT, response_model=None)
+async def delete_person(party_id: int, db: AsyncSession = Depends(get_async_db), credentials: JwtAuthorizationCredentials = Depends(auth_scheme)):
+    require_roles(credentials, ["user"])
+    db_person = await db.get(Person, party_id)
+    if db_person is None:
+        raise HTTPException(status_code=404, detail="Person not found")
+
+    db.add(OutboxEvent(
+        event_type="PersonDeleted",
+        payload={
+            "party_id": party_id,
+            "external_identifiers": await external_identifier_payload(db, party_id)
+        }
+    ))
+    await db.run_sync(delete_party, db_person)
+    await db.commit()
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
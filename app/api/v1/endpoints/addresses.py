@@ -2,45 +2,47 @@ from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi import Request
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from fastapi_jwt import JwtAuthorizationCredentials
 from fastapi import Depends
 from app.routes.auth import auth_scheme, require_roles
 
-from app.db.session import SessionLocal
+from app.api.v1.fieldsets import Fieldset, get_fieldset
+from app.api.v1.filtering import ListQuery, get_list_query
+from app.db.session import get_db
 from app.models.address import Address
 from app.models.party import Party
 from app.models.party_address import PartyAddress
 from app.schemas.address import AddressCreate, AddressRead
 from app.schemas.hateoas import HypermediaModel
 from app.schemas.party import PartyRead
+from app.services.address_normalization import canonicalize, content_hash
+from app.services.party_search import reindex_parties
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get("/", response_model=List[HypermediaModel])
 def read_addresses(
     request: Request,
     skip: int = 0,
     limit: int = 100,
+    list_query: ListQuery = Depends(get_list_query),
+    fieldset: Fieldset = Depends(get_fieldset),
     credentials: JwtAuthorizationCredentials = Depends(auth_scheme),
     db: Session = Depends(get_db),
 ):
     require_roles(credentials, ["user"])
-    addresses = db.query(Address).offset(skip).limit(limit).all()
+    query = list_query.apply(db.query(Address), Address)
+    query = fieldset.apply(query, Address, AddressRead)
+    addresses = query.offset(skip).limit(limit).all()
 
     response = []
     for address in addresses:
         response.append({
-            "data": AddressRead.from_orm(address),
-            "links": create_address_links(request, address.address_id)
+            "data": fieldset.dump(address, AddressRead),
+            "links": create_address_links(request, address.address_id) if fieldset.links else []
         })
 
     return response
@@ -60,10 +62,21 @@ def create_address(
     db: Session = Depends(get_db),
 ):
     require_roles(credentials, ["user"])
-    db_address = Address(**address.model_dump())
-    db.add(db_address)
-    db.commit()
-    db.refresh(db_address)
+    canonical = canonicalize(address.model_dump())
+    address_hash = content_hash(canonical)
+    # The same address posted again resolves to the row already stored
+    db_address = db.query(Address).filter(Address.address_hash == address_hash).first()
+    if db_address is None:
+        db_address = Address(**canonical, address_hash=address_hash)
+        db.add(db_address)
+        try:
+            db.commit()
+        except IntegrityError:
+            # A concurrent request stored it first
+            db.rollback()
+            db_address = db.query(Address).filter(Address.address_hash == address_hash).one()
+        else:
+            db.refresh(db_address)
     return {
         "data": AddressRead.from_orm(db_address),
         "links": create_address_links(request, db_address.address_id)
@@ -73,16 +86,18 @@ def create_address(
 def read_address(
     address_id: int,
     request: Request,
+    fieldset: Fieldset = Depends(get_fieldset),
     credentials: JwtAuthorizationCredentials = Depends(auth_scheme),
     db: Session = Depends(get_db),
 ):
     require_roles(credentials, ["user"])
-    db_address = db.query(Address).filter(Address.address_id == address_id).first()
+    query = fieldset.apply(db.query(Address), Address, AddressRead)
+    db_address = query.filter(Address.address_id == address_id).first()
     if db_address is None:
         raise HTTPException(status_code=404, detail="Address not found")
     return {
-        "data": AddressRead.from_orm(db_address),
-        "links": create_address_links(request, db_address.address_id)
+        "data": fieldset.dump(db_address, AddressRead),
+        "links": create_address_links(request, db_address.address_id) if fieldset.links else []
     }
 
 @router.delete("/{address_id}", response_model=dict)
@@ -95,7 +110,19 @@ def delete_address(
     db_address = db.query(Address).filter(Address.address_id == address_id).first()
     if db_address is None:
         raise HTTPException(status_code=404, detail="Address not found")
+    party_ids = [
+        party_id for (party_id,) in
+        db.query(PartyAddress.party_id).filter(PartyAddress.address_id == address_id).all()
+    ]
+    # Addresses are deduplicated, so one row can belong to several parties; each unlinks its own
+    if len(party_ids) > 1:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Address is linked to {len(party_ids)} parties; remove their links through /party-addresses",
+        )
+    db.query(PartyAddress).filter(PartyAddress.address_id == address_id).delete(synchronize_session=False)
     db.delete(db_address)
+    reindex_parties(db, party_ids)
     db.commit()
     return {"detail": "Address successfully deleted"}
 
@@ -0,0 +1,160 @@
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi_jwt import JwtAuthorizationCredentials
+from starlette.types import Message
+
+from app.config import settings
+from app.db.session import RoutingSessionLocal, client_key, recent_writers, shared_session, write_engine
+from app.routes.auth import auth_scheme, require_roles
+from app.schemas.batch import BatchItem, BatchItemResponse, BatchRequest, BatchResponse
+
+router = APIRouter()
+
+READ_METHODS = {"GET", "HEAD"}
+# Set from the batch request itself, not the sub-request
+RESERVED_HEADERS = {"authorization", "content-type", "content-length", "accept", "accept-encoding", "host"}
+# Streams never finish and a long poll would hold up the rest of the batch
+STREAMING_PATHS = ("/events",)
+LONG_POLL_PATHS = ("/changes",)
+
+
+def invalid_path(path: str) -> bool:
+    path, _, query = path.partition("?")
+    if not path.startswith("/") or path.rstrip("/") == "/batch" or path.startswith(STREAMING_PATHS):
+        return True
+    if path.startswith(LONG_POLL_PATHS):
+        try:
+            return any(float(wait) > 0 for wait in parse_qs(query).get("wait", []))
+        except ValueError:
+            # Left to the endpoint's own validation
+            return False
+    return False
+
+
+def sub_request_scope(request: Request, item: BatchItem, body: bytes) -> dict:
+    path, _, query = item.path.partition("?")
+    headers = [
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in item.headers.items() if name.lower() not in RESERVED_HEADERS
+    ]
+    headers += [(b"content-type", b"application/json"), (b"accept", b"application/json"),
+                (b"content-length", str(len(body)).encode())]
+    if "authorization" in request.headers:
+        headers.append((b"authorization", request.headers["authorization"].encode("latin-1")))
+    return {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": item.method,
+        "scheme": request.scope["scheme"],
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": headers,
+    }
+
+
+async def dispatch(request: Request, item: BatchItem) -> BatchItemResponse:
+    """Run one sub-request through the whole application, auth and middleware included."""
+    if invalid_path(item.path):
+        return BatchItemResponse(id=item.id, status=400, headers={}, body={"detail": f"Invalid path {item.path}"})
+    body = b"" if item.body is None else json.dumps(item.body).encode()
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive() -> Message:
+        if messages:
+            return messages.pop()
+        # Nothing more to read; wait like a connection that stays open
+        await asyncio.Event().wait()
+
+    status, headers, chunks = None, {}, []
+
+    async def send(message: Message):
+        nonlocal status, headers
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in message.get("headers", [])}
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await asyncio.wait_for(request.app(sub_request_scope(request, item, body), receive, send),
+                               settings.BATCH_ITEM_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        status, headers = 504, {"content-type": "application/json"}
+        chunks = [b'{"detail": "Sub-request timed out"}']
+    except Exception:
+        # The server error middleware has already sent the 500 when it re-raises
+        if status is None:
+            status, headers, chunks = 500, {}, [b'{"detail": "Internal Server Error"}']
+
+    content = b"".join(chunks)
+    if not content:
+        payload = None
+    elif headers.get("content-type", "").startswith("application/json"):
+        payload = json.loads(content)
+    else:
+        payload = content.decode(errors="replace")
+    headers.pop("content-length", None)
+    return BatchItemResponse(id=item.id, status=status, headers=headers, body=payload)
+
+
+@router.post("", response_model=BatchResponse)
+async def run_batch(
+    batch: BatchRequest,
+    request: Request,
+    credentials: JwtAuthorizationCredentials = Depends(auth_scheme),
+):
+    """
+    Run up to BATCH_MAX_REQUESTS API calls in one round trip.
+
+    Each sub-request goes through the same routing, auth checks and
+    middleware as a direct call, with this request's Authorization header.
+    Writes run in order, sharing one database session; runs of GETs between
+    them run concurrently, so a GET listed after a write sees it. A failing
+    sub-request only fails its own response.
+    """
+    require_roles(credentials, ["user"])
+    if len(batch.requests) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(status_code=400, detail=f"A batch holds at most {settings.BATCH_MAX_REQUESTS} requests")
+
+    responses = [None] * len(batch.requests)
+    semaphore = asyncio.Semaphore(settings.BATCH_READ_CONCURRENCY)
+
+    async def read(index: int, item: BatchItem):
+        async with semaphore:
+            responses[index] = await dispatch(request, item)
+
+    db = None
+    reads = []
+    try:
+        for index, item in enumerate(batch.requests):
+            if item.method in READ_METHODS:
+                reads.append(read(index, item))
+                continue
+            await asyncio.gather(*reads)
+            reads = []
+            if db is None:
+                db = RoutingSessionLocal(read_only=False, primary=write_engine)
+            token = shared_session.set(db)
+            try:
+                responses[index] = await dispatch(request, item)
+            finally:
+                shared_session.reset(token)
+                # Whatever the sub-request left uncommitted does not leak into the next one
+                await asyncio.to_thread(db.rollback)
+            if db.wrote:
+                # Later GETs stay on the primary, as they would for separate calls
+                recent_writers.record(client_key(request))
+        await asyncio.gather(*reads)
+    finally:
+        if db is not None:
+            await asyncio.to_thread(db.close)
+
+    return {"responses": responses}
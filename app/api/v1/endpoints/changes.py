@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi_jwt import JwtAuthorizationCredentials
+
+from app.config import settings
+from app.db.session import SessionLocal
+from app.routes.auth import auth_scheme, require_roles
+from app.schemas.change import ChangeRead
+from app.services.change_feed import read_changes
+
+router = APIRouter()
+
+
+def parse_event_types(event_type: str | None) -> set[str] | None:
+    if not event_type:
+        return None
+    return {t.strip() for t in event_type.split(",") if t.strip()} or None
+
+
+def fetch_changes(since: int, limit: int, event_types: set[str] | None, party_id: int | None):
+    db = SessionLocal()
+    try:
+        events, cursor = read_changes(db, since, limit, event_types, party_id)
+        return [ChangeRead.from_orm(event) for event in events], cursor
+    finally:
+        db.close()
+
+
+@router.get("/", response_model=dict)
+async def read_change_feed(
+    request: Request,
+    since: int = Query(0, ge=0, description="Cursor returned by the previous call; 0 reads from the start"),
+    limit: int = Query(100, ge=1, le=1000),
+    wait: float = Query(0, ge=0, le=60, description="Seconds to hold the request open while no changes exist"),
+    event_type: str | None = Query(None, description="Comma-separated event types"),
+    party_id: int | None = None,
+    credentials: JwtAuthorizationCredentials = Depends(auth_scheme),
+):
+    """
+    Ordered outbox events after a cursor, for mirrors that sync incrementally.
+
+    The cursor is the outbox event_id, which only grows. With wait > 0 the
+    request long-polls: it returns as soon as a change arrives or the wait
+    runs out with an empty changes list. Always continue from the returned
+    cursor: with filters it can move past events that did not match.
+    """
+    require_roles(credentials, ["user"])
+    event_types = parse_event_types(event_type)
+    deadline = time.monotonic() + wait
+    cursor = since
+    while True:
+        changes, cursor = await asyncio.to_thread(fetch_changes, cursor, limit, event_types, party_id)
+        remaining = deadline - time.monotonic()
+        if changes or remaining <= 0 or await request.is_disconnected():
+            break
+        # Filtered-out events still advance the cursor, keep scanning from there
+        await asyncio.sleep(min(settings.CHANGE_FEED_POLL_INTERVAL, remaining))
+
+    base_url = str(request.base_url).rstrip('/')
+    query = f"limit={limit}" + (f"&event_type={event_type}" if event_type else "") \
+        + (f"&party_id={party_id}" if party_id is not None else "")
+    return {
+        "changes": changes,
+        "cursor": cursor,
+        "links": [
+            {"rel": "self", "href": f"{base_url}/changes/?since={since}&{query}"},
+            {"rel": "next", "href": f"{base_url}/changes/?since={cursor}&{query}"},
+        ]
+    }
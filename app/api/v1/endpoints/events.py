@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from fastapi_jwt import JwtAuthorizationCredentials
+
+from app.api.v1.endpoints.changes import parse_event_types
+from app.routes.auth import auth_scheme, credentials_from_token, require_roles
+from app.services.event_stream import event_broadcaster
+
+router = APIRouter()
+
+# Comment lines keep proxies from timing out idle streams
+KEEPALIVE_SECONDS = 15
+
+
+def format_sse(event_id: str, event_type: str, payload: dict) -> str:
+    return f"id: {event_id}\nevent: {event_type}\ndata: {json.dumps(payload)}\n\n"
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    event_type: str | None = Query(None, description="Comma-separated event types"),
+    party_id: int | None = None,
+    credentials: JwtAuthorizationCredentials = Depends(auth_scheme),
+):
+    """Server-Sent Events push of outbox events as process_outbox publishes them."""
+    require_roles(credentials, ["user"])
+    subscriber = event_broadcaster.subscribe(parse_event_types(event_type), party_id)
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    yield "event: overflow\ndata: {}\n\n"
+                    break
+                yield format_sse(*event)
+        finally:
+            event_broadcaster.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def websocket_events(
+    websocket: WebSocket,
+    token: str | None = None,
+    event_type: str | None = None,
+    party_id: int | None = None,
+):
+    """WebSocket push of outbox events; browsers cannot set headers here, so the JWT comes as ?token=."""
+    try:
+        require_roles(credentials_from_token(token), ["user"])
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=e.detail)
+        return
+
+    await websocket.accept()
+    subscriber = event_broadcaster.subscribe(parse_event_types(event_type), party_id)
+
+    async def send_events():
+        while True:
+            event = await subscriber.queue.get()
+            if event is None:
+                await websocket.close(code=1013, reason="Client fell behind the event stream")
+                return
+            event_id, type_name, payload = event
+            await websocket.send_json({"id": event_id, "event_type": type_name, "payload": payload})
+
+    async def receive_until_disconnect():
+        # Client messages are ignored; reading them is how a closed socket is noticed between events
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    sender = asyncio.create_task(send_events())
+    receiver = asyncio.create_task(receive_until_disconnect())
+    try:
+        done, _ = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        sender.cancel()
+        receiver.cancel()
+        event_broadcaster.unsubscribe(subscriber)
+    for task in done:
+        error = task.exception()
+        if error is not None and not isinstance(error, WebSocketDisconnect):
+            raise error
@@ -4,44 +4,50 @@ from fastapi import APIRouter, HTTPException
 from fastapi import Depends
 from fastapi import Request
 from fastapi_jwt import JwtAuthorizationCredentials
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.db.session import SessionLocal
+from app.api.v1.fieldsets import Fieldset, get_fieldset
+from app.api.v1.filtering import ListQuery, get_list_query
+from app.db.session import get_db
 from app.models.external_identifier import ExternalIdentifier
 from app.routes.auth import auth_scheme, require_roles
-from app.schemas.external_identifier import ExternalIdentifierCreate, ExternalIdentifierRead
+from app.schemas.external_identifier import (
+    ExternalIdentifierCreate,
+    ExternalIdentifierRead,
+    ExternalIdentifierResolution,
+    ExternalIdentifierResolveRequest,
+)
 from app.schemas.hateoas import HypermediaModel
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 
 @router.get("/", response_model=List[HypermediaModel])
 def read_external_identifiers(
     skip: int = 0,
     limit: int = 100,
     request: Request = None,
+    list_query: ListQuery = Depends(get_list_query),
+    fieldset: Fieldset = Depends(get_fieldset),
     db: Session = Depends(get_db),
     credentials: JwtAuthorizationCredentials = Depends(auth_scheme)
 ):
     require_roles(credentials, ["user"])
-    legacy_identifiers = db.query(ExternalIdentifier).offset(skip).limit(limit).all()
+    query = list_query.apply(db.query(ExternalIdentifier), ExternalIdentifier)
+    query = fieldset.apply(query, ExternalIdentifier, ExternalIdentifierRead, "party_id")
+    legacy_identifiers = query.offset(skip).limit(limit).all()
     base_url = str(request.base_url).rstrip('/')
     li_list = []
     for li in legacy_identifiers:
-        li_data = ExternalIdentifierRead.from_orm(li)
+        li_data = fieldset.dump(li, ExternalIdentifierRead)
         li_list.append({
             "data": li_data,
             "links": [
                 {"rel": "self", "href": f"{base_url}/external-identifiers/{li.external_identifier_id}"},
                 {"rel": "party", "href": f"{base_url}/parties/{li.party_id}"}
-            ]
+            ] if fieldset.links else []
         })
     return li_list
 
@@ -55,7 +61,11 @@ def create_external_identifier(
     require_roles(credentials, ["user"])
     db_li = ExternalIdentifier(**li.model_dump())
     db.add(db_li)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="ExternalIdentifier already exists")
     db.refresh(db_li)
     li_data = ExternalIdentifierRead.from_orm(db_li)
     base_url = str(request.base_url).rstrip('/')
@@ -67,25 +77,99 @@ def create_external_identifier(
         ]
     }
 
+@router.get("/lookup", response_model=HypermediaModel)
+def lookup_external_identifier(
+    system_name: str,
+    external_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    credentials: JwtAuthorizationCredentials = Depends(auth_scheme)
+):
+    require_roles(credentials, ["user"])
+    db_li = db.query(ExternalIdentifier).filter(
+        ExternalIdentifier.system_name == system_name,
+        ExternalIdentifier.external_id == external_id
+    ).first()
+    if db_li is None:
+        raise HTTPException(status_code=404, detail="ExternalIdentifier not found")
+    li_data = ExternalIdentifierRead.from_orm(db_li)
+    base_url = str(request.base_url).rstrip('/')
+    return {
+        "data": li_data,
+        "links": [
+            {"rel": "self", "href": f"{base_url}/external-identifiers/{db_li.external_identifier_id}"},
+            {"rel": "party", "href": f"{base_url}/parties/{db_li.party_id}"}
+        ]
+    }
+
+@router.post("/resolve", response_model=dict)
+def resolve_external_identifiers(
+    resolve: ExternalIdentifierResolveRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    credentials: JwtAuthorizationCredentials = Depends(auth_scheme)
+):
+    require_roles(credentials, ["user"])
+    # Group the pairs by system so the single query becomes
+    # (system_name = ? AND external_id IN (...)) OR ..., one index range per system
+    by_system: dict[str, set[str]] = {}
+    for key in resolve.identifiers:
+        by_system.setdefault(key.system_name, set()).add(key.external_id)
+
+    found = {}
+    if by_system:
+        rows = db.query(
+            ExternalIdentifier.system_name,
+            ExternalIdentifier.external_id,
+            ExternalIdentifier.party_id
+        ).filter(or_(*(
+            and_(ExternalIdentifier.system_name == system_name, ExternalIdentifier.external_id.in_(external_ids))
+            for system_name, external_ids in by_system.items()
+        ))).all()
+        found = {(row.system_name, row.external_id): row.party_id for row in rows}
+
+    base_url = str(request.base_url).rstrip('/')
+    results = []
+    for key in resolve.identifiers:
+        party_id = found.get((key.system_name, key.external_id))
+        results.append({
+            "data": ExternalIdentifierResolution(
+                system_name=key.system_name,
+                external_id=key.external_id,
+                party_id=party_id
+            ),
+            "links": [{"rel": "party", "href": f"{base_url}/parties/{party_id}"}] if party_id is not None else []
+        })
+
+    return {
+        "resolved": sum(1 for result in results if result["data"].party_id is not None),
+        "results": results,
+        "links": [
+            {"rel": "self", "href": f"{base_url}/external-identifiers/resolve"}
+        ]
+    }
+
 @router.get("/{external_identifier_id}", response_model=HypermediaModel)
 def read_external_identifier(
     external_identifier_id: int,
     request: Request,
+    fieldset: Fieldset = Depends(get_fieldset),
     db: Session = Depends(get_db),
     credentials: JwtAuthorizationCredentials = Depends(auth_scheme)
 ):
     require_roles(credentials, ["user"])
-    db_li = db.query(ExternalIdentifier).filter(ExternalIdentifier.external_identifier_id == external_identifier_id).first()
+    query = fieldset.apply(db.query(ExternalIdentifier), ExternalIdentifier, ExternalIdentifierRead, "party_id")
+    db_li = query.filter(ExternalIdentifier.external_identifier_id == external_identifier_id).first()
     if db_li is None:
         raise HTTPException(status_code=404, detail="ExternalIdentifier not found")
-    li_data = ExternalIdentifierRead.from_orm(db_li)
+    li_data = fieldset.dump(db_li, ExternalIdentifierRead)
     base_url = str(request.base_url).rstrip('/')
     return {
         "data": li_data,
         "links": [
             {"rel": "self", "href": f"{base_url}/external-identifiers/{db_li.external_identifier_id}"},
             {"rel": "party", "href": f"{base_url}/parties/{db_li.party_id}"}
-        ]
+        ] if fieldset.links else []
     }
 
 @router.delete("/{external_identifier_id}", response_model=HypermediaModel)
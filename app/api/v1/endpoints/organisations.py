@@ -1,11 +1,14 @@
 from typing import List
 
-from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
 from fastapi import Depends
 from fastapi_jwt import JwtAuthorizationCredentials
 from sqlalchemy.orm import Session
 
-from app.db.session import SessionLocal
+from app.api.v1.fieldsets import Fieldset, get_fieldset
+from app.api.v1.filtering import ListQuery, get_list_query
+from app.config import settings
+from app.db.session import get_db
 from app.models.external_identifier import ExternalIdentifier
 from app.models.organisation import Organisation
 from app.models.outbox_event import OutboxEvent
@@ -13,32 +16,31 @@ from app.models.party import Party
 from app.routes.auth import auth_scheme, require_roles
 from app.schemas.hateoas import HypermediaModel
 from app.schemas.organisation import OrganisationCreate, OrganisationRead
+from app.services import hierarchy
+from app.services.party_search import remove_parties, reindex_party
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get("/", response_model=List[HypermediaModel])
 def read_organisations(
     request: Request,
     skip: int = 0,
     limit: int = 100,
+    list_query: ListQuery = Depends(get_list_query),
+    fieldset: Fieldset = Depends(get_fieldset),
     db: Session = Depends(get_db),
     credentials: JwtAuthorizationCredentials = Depends(auth_scheme),
 ):
     require_roles(credentials, ["user"])
-    organisations = db.query(Organisation).offset(skip).limit(limit).all()
+    query = list_query.apply(db.query(Organisation), Organisation)
+    query = fieldset.apply(query, Organisation, OrganisationRead)
+    organisations = query.offset(skip).limit(limit).all()
 
     response = []
     for org in organisations:
         response.append({
-            "data": OrganisationRead.from_orm(org),
-            "links": create_organisation_links(request, org.party_id)
+            "data": fieldset.dump(org, OrganisationRead),
+            "links": create_organisation_links(request, org.party_id) if fieldset.links else []
         })
 
     return response
@@ -81,6 +83,7 @@ def create_organisation(
         }
     )
     db.add(outbox_event)
+    reindex_party(db, db_org.party_id)
     db.commit()
 
     return {
@@ -92,17 +95,19 @@ def create_organisation(
 def read_organisation(
     party_id: int,
     request: Request,
+    fieldset: Fieldset = Depends(get_fieldset),
     db: Session = Depends(get_db),
     credentials: JwtAuthorizationCredentials = Depends(auth_scheme),
 ):
     require_roles(credentials, ["user"])
-    db_org = db.query(Organisation).filter(Organisation.party_id == party_id).first()
+    query = fieldset.apply(db.query(Organisation), Organisation, OrganisationRead)
+    db_org = query.filter(Organisation.party_id == party_id).first()
     if db_org is None:
         raise HTTPException(status_code=404, detail="Organisation not found")
 
     return {
-        "data": OrganisationRead.from_orm(db_org),
-        "links": create_organisation_links(request, db_org.party_id)
+        "data": fieldset.dump(db_org, OrganisationRead),
+        "links": create_organisation_links(request, db_org.party_id) if fieldset.links else []
     }
 
 
@@ -141,6 +146,7 @@ def update_organisation(
         }
     )
     db.add(outbox_event)
+    reindex_party(db, party_id)
     # Commit all changes
     db.commit()
     db.refresh(db_org)
@@ -177,10 +183,74 @@ def delete_organisation(
         }
     )
     db.add(outbox_event)
+    hierarchy.remove_party(db, party_id)
     # Remove organisation and party records
     db.delete(db_org)
     party = db.query(Party).filter(Party.party_id == party_id).first()
     if party:
         db.delete(party)
+    remove_parties(db, [party_id])
     db.commit()
-    return Response(status_code=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+def read_organisation_hierarchy(direction: str, party_id: int, request: Request, types: str | None,
+                                max_depth: int | None, db: Session):
+    if db.query(Organisation.party_id).filter(Organisation.party_id == party_id).first() is None:
+        raise HTTPException(status_code=404, detail="Organisation not found")
+
+    relationship_types = [t.strip() for t in types.split(",") if t.strip()] if types else None
+    unknown = set(relationship_types or []) - set(settings.HIERARCHY_RELATIONSHIP_TYPES)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Not a hierarchical relationship type: {', '.join(sorted(unknown))}")
+
+    related = hierarchy.related(party_id, direction, relationship_types, max_depth)
+    rows = (
+        db.query(Organisation, related.c.depth)
+        .join(related, related.c.party_id == Organisation.party_id)
+        .order_by(related.c.depth, Organisation.party_id)
+        .all()
+    )
+
+    base_url = str(request.base_url).rstrip('/')
+    return {
+        "party_id": party_id,
+        direction: [
+            {
+                "data": OrganisationRead.from_orm(org),
+                "depth": depth,
+                "links": create_organisation_links(request, org.party_id)
+            }
+            for org, depth in rows
+        ],
+        "links": [
+            {"rel": "self", "href": f"{base_url}/organisations/{party_id}/{direction}"},
+            {"rel": "organisation", "href": f"{base_url}/organisations/{party_id}"}
+        ]
+    }
+
+
+@router.get("/{party_id}/descendants", response_model=dict)
+def read_organisation_descendants(
+    party_id: int,
+    request: Request,
+    types: str | None = Query(None, description="Comma-separated hierarchical relationship types"),
+    max_depth: int | None = Query(None, ge=1),
+    db: Session = Depends(get_db),
+    credentials: JwtAuthorizationCredentials = Depends(auth_scheme),
+):
+    require_roles(credentials, ["user"])
+    return read_organisation_hierarchy("descendants", party_id, request, types, max_depth, db)
+
+
+@router.get("/{party_id}/ancestors", response_model=dict)
+def read_organisation_ancestors(
+    party_id: int,
+    request: Request,
+    types: str | None = Query(None, description="Comma-separated hierarchical relationship types"),
+    max_depth: int | None = Query(None, ge=1),
+    db: Session = Depends(get_db),
+    credentials: JwtAuthorizationCredentials = Depends(auth_scheme),
+):
+    require_roles(credentials, ["user"])
+    return read_organisation_hierarchy("ancestors", party_id, request, types, max_depth, db)
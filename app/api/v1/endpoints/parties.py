@@ -1,32 +1,36 @@
-from typing import List
+from typing import List, Literal
 
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi import Depends
 from fastapi_jwt import JwtAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, aliased
 
-from app.db.session import SessionLocal
+from app.api.v1.fieldsets import Fieldset, get_fieldset
+from app.api.v1.filtering import ListQuery, get_list_query
+from app.api.v1.temporal import ActiveWindow, get_active_window
+from app.config import settings
+from app.db.session import get_db
 from app.models.address import Address
+from app.models.duplicate_candidate import DuplicateCandidate
 from app.models.external_identifier import ExternalIdentifier
 from app.models.party import Party
 from app.models.party_address import PartyAddress
 from app.models.party_relationship import PartyRelationship
 from app.routes.auth import auth_scheme, require_roles
 from app.schemas.address import AddressRead
+from app.schemas.duplicate_candidate import DuplicateCandidateRead
 from app.schemas.external_identifier import ExternalIdentifierRead
 from app.schemas.hateoas import HypermediaModel
-from app.schemas.party import PartyRead
+from app.schemas.party import PartyCompletion, PartyMergeRequest, PartyRead
 from app.schemas.party_relationship import PartyRelationshipRead
+from app.services.autocomplete import autocomplete_index
+from app.services.graph_index import graph_index
+from app.services.merge import MergeConflict, merge_parties
+from app.services.party_network import find_network, hop_distances
+from app.services.party_search import search_parties
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 def create_party_links(request: Request, party: Party):
     base_url = str(request.base_url).rstrip('/')
     links = [
@@ -45,26 +49,174 @@ def create_party_links(request: Request, party: Party):
     return links
 
 @router.get("/", response_model=List[HypermediaModel])
-def read_parties(request: Request, skip: int = 0, limit: int = 100, credentials: JwtAuthorizationCredentials = Depends(auth_scheme), db: Session = Depends(get_db)):
+def read_parties(request: Request, skip: int = 0, limit: int = 100, list_query: ListQuery = Depends(get_list_query), fieldset: Fieldset = Depends(get_fieldset), credentials: JwtAuthorizationCredentials = Depends(auth_scheme), db: Session = Depends(get_db)):
     require_roles(credentials, ["user"])
-    parties = db.query(Party).offset(skip).limit(limit).all()
+    query = list_query.apply(db.query(Party), Party)
+    query = fieldset.apply(query, Party, PartyRead, "party_type")
+    parties = query.offset(skip).limit(limit).all()
     response = []
     for party in parties:
+        response.append({
+            "data": fieldset.dump(party, PartyRead),
+            "links": create_party_links(request, party) if fieldset.links else []
+        })
+    return response
+
+@router.get("/search", response_model=List[HypermediaModel])
+def search(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    credentials: JwtAuthorizationCredentials = Depends(auth_scheme),
+    db: Session = Depends(get_db),
+):
+    require_roles(credentials, ["user"])
+    party_ids = search_parties(db, q, limit)
+    parties = {party.party_id: party for party in db.query(Party).filter(Party.party_id.in_(party_ids)).all()}
+    response = []
+    # Keep the ranking order from the search index
+    for party_id in party_ids:
+        party = parties.get(party_id)
+        if party is None:
+            continue
         response.append({
             "data": PartyRead.from_orm(party),
             "links": create_party_links(request, party)
         })
     return response
 
+@router.get("/duplicates", response_model=List[HypermediaModel])
+def read_duplicates(
+    request: Request,
+    party_type: Literal["person", "organisation"] | None = None,
+    party_id: int | None = None,
+    min_score: float = Query(0.0, ge=0.0, le=1.0),
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    credentials: JwtAuthorizationCredentials = Depends(auth_scheme),
+    db: Session = Depends(get_db),
+):
+    """Duplicate candidates found by the last `manage_db find-duplicates` run, best match first."""
+    require_roles(credentials, ["user"])
+    party, duplicate = aliased(Party), aliased(Party)
+    # Join both parties so pairs whose parties were deleted or merged since the run drop out
+    query = (
+        db.query(DuplicateCandidate)
+        .join(party, party.party_id == DuplicateCandidate.party_id)
+        .join(duplicate, duplicate.party_id == DuplicateCandidate.duplicate_party_id)
+        .filter(DuplicateCandidate.score >= min_score)
+    )
+    if party_type is not None:
+        query = query.filter(DuplicateCandidate.party_type == party_type)
+    if party_id is not None:
+        query = query.filter(
+            (DuplicateCandidate.party_id == party_id) | (DuplicateCandidate.duplicate_party_id == party_id)
+        )
+    candidates = (
+        query.order_by(DuplicateCandidate.score.desc(), DuplicateCandidate.candidate_id)
+        .offset(skip).limit(limit).all()
+    )
+
+    base_url = str(request.base_url).rstrip('/')
+    return [
+        {
+            "data": DuplicateCandidateRead.from_orm(candidate),
+            "links": [
+                {"rel": "party", "href": f"{base_url}/parties/{candidate.party_id}"},
+                {"rel": "duplicate", "href": f"{base_url}/parties/{candidate.duplicate_party_id}"},
+            ]
+        }
+        for candidate in candidates
+    ]
+
+@router.get("/autocomplete", response_model=List[HypermediaModel])
+def autocomplete(
+    request: Request,
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    party_type: Literal["person", "organisation"] | None = None,
+    credentials: JwtAuthorizationCredentials = Depends(auth_scheme),
+    db: Session = Depends(get_db),
+):
+    require_roles(credentials, ["user"])
+    autocomplete_index.ensure_loaded(db)
+    base_url = str(request.base_url).rstrip('/')
+    response = []
+    for party_id, display_name, completion_type in autocomplete_index.complete(prefix, limit, party_type):
+        response.append({
+            "data": PartyCompletion(party_id=party_id, party_type=completion_type, display_name=display_name),
+            "links": [{"rel": "self", "href": f"{base_url}/parties/{party_id}"}]
+        })
+    return response
+
+def get_graph(db: Session = Depends(get_db)):
+    if not settings.GRAPH_INDEX_ENABLED:
+        raise HTTPException(status_code=503, detail="Graph index is not enabled")
+    graph_index.ensure_loaded(db)
+    # Cheap primary key range read; keeps this worker's graph current with recent writes
+    graph_index.refresh_from_outbox(db)
+    return graph_index
+
+@router.get("/graph/stats", response_model=dict)
+def read_graph_stats(credentials: JwtAuthorizationCredentials = Depends(auth_scheme), graph=Depends(get_graph)):
+    require_roles(credentials, ["user"])
+    return graph.stats()
+
 @router.get("/{party_id}", response_model=HypermediaModel)
-def read_party(party_id: int, request: Request, credentials: JwtAuthorizationCredentials = Depends(auth_scheme), db: Session = Depends(get_db)):
+def read_party(party_id: int, request: Request, fieldset: Fieldset = Depends(get_fieldset), credentials: JwtAuthorizationCredentials = Depends(auth_scheme), db: Session = Depends(get_db)):
     require_roles(credentials, ["user"])
-    db_party = db.query(Party).filter(Party.party_id == party_id).first()
+    query = fieldset.apply(db.query(Party), Party, PartyRead, "party_type")
+    db_party = query.filter(Party.party_id == party_id).first()
     if db_party is None:
         raise HTTPException(status_code=404, detail="Party not found")
     return {
-        "data": PartyRead.from_orm(db_party),
-        "links": create_party_links(request, db_party)
+        "data": fieldset.dump(db_party, PartyRead),
+        "links": create_party_links(request, db_party) if fieldset.links else []
+    }
+
+@router.post("/{party_id}/merge", response_model=dict)
+def merge_party(
+    party_id: int,
+    merge: PartyMergeRequest,
+    request: Request,
+    credentials: JwtAuthorizationCredentials = Depends(auth_scheme),
+    db: Session = Depends(get_db),
+):
+    require_roles(credentials, ["user"])
+    survivor = db.query(Party).filter(Party.party_id == party_id).first()
+    if survivor is None:
+        raise HTTPException(status_code=404, detail="Party not found")
+    loser_ids = set(merge.loser_ids)
+    if party_id in loser_ids:
+        raise HTTPException(status_code=400, detail="A party cannot be merged into itself")
+
+    loser_types = dict(db.query(Party.party_id, Party.party_type).filter(Party.party_id.in_(loser_ids)).all())
+    missing = loser_ids - loser_types.keys()
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Parties not found: {', '.join(map(str, sorted(missing)))}")
+    mismatched = sorted(loser for loser, party_type in loser_types.items() if party_type != survivor.party_type)
+    if mismatched:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Parties {', '.join(map(str, mismatched))} are not of type {survivor.party_type}",
+        )
+
+    try:
+        summary = merge_parties(db, survivor, sorted(loser_ids))
+    except MergeConflict as e:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(e))
+    db.commit()
+    db.refresh(survivor)
+
+    base_url = str(request.base_url).rstrip('/')
+    return {
+        "data": PartyRead.from_orm(survivor),
+        "merged_party_ids": sorted(loser_ids),
+        **summary,
+        "links": create_party_links(request, survivor) + [
+            {"rel": "merge", "href": f"{base_url}/parties/{party_id}/merge"}
+        ]
     }
 
 @router.get("/{party_id}/addresses", response_model=dict)
@@ -106,9 +258,9 @@ def read_party_addresses(party_id: int, request: Request, credentials: JwtAuthor
     }
 
 @router.get("/{party_id}/relationships", response_model=dict)
-def read_party_relationships(party_id: int, request: Request, credentials: JwtAuthorizationCredentials = Depends(auth_scheme), db: Session = Depends(get_db)):
+def read_party_relationships(party_id: int, request: Request, window: ActiveWindow = Depends(get_active_window), credentials: JwtAuthorizationCredentials = Depends(auth_scheme), db: Session = Depends(get_db)):
     require_roles(credentials, ["user"])
-    relationships = db.query(PartyRelationship).filter(
+    relationships = window.apply(db.query(PartyRelationship), PartyRelationship).filter(
         (PartyRelationship.from_party_id == party_id) |
         (PartyRelationship.to_party_id == party_id)
     ).all()
@@ -173,4 +325,136 @@ def read_party_external_identifiers(party_id: int, request: Request, credentials
             {"rel": "self", "href": f"{base_url}/parties/{party_id}/external-identifiers"},
             {"rel": "party", "href": f"{base_url}/parties/{party_id}"}
         ]
-    }
\ No newline at end of file
+    }
+
+@router.get("/{party_id}/network", response_model=dict)
+def read_party_network(
+    party_id: int,
+    request: Request,
+    depth: int = Query(1, ge=1, le=5),
+    types: str | None = Query(None, description="Comma-separated relationship types to follow"),
+    direction: Literal["outgoing", "incoming", "both"] = "both",
+    limit: int = Query(500, ge=1, le=5000),
+    credentials: JwtAuthorizationCredentials = Depends(auth_scheme),
+    db: Session = Depends(get_db),
+):
+    require_roles(credentials, ["user"])
+    party = db.query(Party).filter(Party.party_id == party_id).first()
+    if party is None:
+        raise HTTPException(status_code=404, detail="Party not found")
+
+    relationship_types = [t.strip() for t in types.split(",") if t.strip()] if types else None
+    rows, truncated = find_network(db, party_id, depth, relationship_types, direction, limit)
+    distances = hop_distances(party_id, rows, direction)
+
+    base_url = str(request.base_url).rstrip('/')
+    relationship_responses = []
+    for rel, hop in rows:
+        relationship_responses.append({
+            "data": PartyRelationshipRead.from_orm(rel),
+            "hop": hop,
+            "links": [
+                {"rel": "self", "href": f"{base_url}/party-relationships/{rel.relationship_id}"},
+                {"rel": "from_party", "href": f"{base_url}/parties/{rel.from_party_id}"},
+                {"rel": "to_party", "href": f"{base_url}/parties/{rel.to_party_id}"}
+            ]
+        })
+
+    return {
+        "party_id": party_id,
+        "depth": depth,
+        "direction": direction,
+        "truncated": truncated,
+        "parties": [
+            {"party_id": node_id, "hop": hop, "links": [{"rel": "self", "href": f"{base_url}/parties/{node_id}"}]}
+            for node_id, hop in sorted(distances.items(), key=lambda item: (item[1], item[0]))
+        ],
+        "relationships": relationship_responses,
+        "links": [
+            {"rel": "self", "href": str(request.url)},
+            {"rel": "party", "href": f"{base_url}/parties/{party_id}"}
+        ]
+    }
+
+@router.get("/{party_id}/path-to/{target_party_id}", response_model=dict)
+def read_party_path(
+    party_id: int,
+    target_party_id: int,
+    request: Request,
+    max_depth: int = Query(6, ge=1, le=12),
+    types: str | None = Query(None, description="Comma-separated relationship types to follow"),
+    direction: Literal["outgoing", "incoming", "both"] = "both",
+    credentials: JwtAuthorizationCredentials = Depends(auth_scheme),
+    graph=Depends(get_graph),
+):
+    require_roles(credentials, ["user"])
+    relationship_types = [t.strip() for t in types.split(",") if t.strip()] if types else None
+    path = graph.shortest_path(party_id, target_party_id, direction, relationship_types, max_depth)
+    if path is None:
+        raise HTTPException(status_code=404, detail="No path found between these parties")
+
+    party_ids, relationship_ids = path
+    base_url = str(request.base_url).rstrip('/')
+    return {
+        "party_id": party_id,
+        "target_party_id": target_party_id,
+        "length": len(relationship_ids),
+        "parties": [{"party_id": pid, "links": [{"rel": "self", "href": f"{base_url}/parties/{pid}"}]} for pid in party_ids],
+        "relationships": [
+            {"relationship_id": rid, "links": [{"rel": "self", "href": f"{base_url}/party-relationships/{rid}"}]}
+            for rid in relationship_ids
+        ],
+        "links": [
+            {"rel": "self", "href": str(request.url)},
+            {"rel": "party", "href": f"{base_url}/parties/{party_id}"},
+            {"rel": "target", "href": f"{base_url}/parties/{target_party_id}"}
+        ]
+    }
+
+@router.get("/{party_id}/neighbourhood", response_model=dict)
+def read_party_neighbourhood(
+    party_id: int,
+    request: Request,
+    k: int = Query(2, ge=1, le=10),
+    types: str | None = Query(None, description="Comma-separated relationship types to follow"),
+    direction: Literal["outgoing", "incoming", "both"] = "both",
+    limit: int = Query(10000, ge=1, le=1000000),
+    credentials: JwtAuthorizationCredentials = Depends(auth_scheme),
+    graph=Depends(get_graph),
+):
+    require_roles(credentials, ["user"])
+    relationship_types = [t.strip() for t in types.split(",") if t.strip()] if types else None
+    distances, truncated = graph.k_hop(party_id, k, direction, relationship_types, limit)
+    base_url = str(request.base_url).rstrip('/')
+    return {
+        "party_id": party_id,
+        "k": k,
+        "truncated": truncated,
+        "parties": [{"party_id": pid, "hop": hop} for pid, hop in distances.items()],
+        "links": [
+            {"rel": "self", "href": str(request.url)},
+            {"rel": "party", "href": f"{base_url}/parties/{party_id}"}
+        ]
+    }
+
+@router.get("/{party_id}/component", response_model=dict)
+def read_party_component(
+    party_id: int,
+    request: Request,
+    limit: int = Query(10000, ge=1, le=1000000),
+    credentials: JwtAuthorizationCredentials = Depends(auth_scheme),
+    graph=Depends(get_graph),
+):
+    require_roles(credentials, ["user"])
+    members, truncated = graph.component(party_id, limit)
+    base_url = str(request.base_url).rstrip('/')
+    return {
+        "party_id": party_id,
+        "size": len(members),
+        "truncated": truncated,
+        "party_ids": sorted(members),
+        "links": [
+            {"rel": "self", "href": str(request.url)},
+            {"rel": "party", "href": f"{base_url}/parties/{party_id}"}
+        ]
+    }
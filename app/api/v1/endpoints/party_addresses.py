@@ -5,22 +5,18 @@ from fastapi import Request
 from fastapi_jwt import JwtAuthorizationCredentials
 from sqlalchemy.orm import Session
 
-from app.db.session import SessionLocal
+from app.api.v1.fieldsets import Fieldset, get_fieldset
+from app.api.v1.filtering import ListQuery, get_list_query
+from app.db.session import get_db
 from app.models.party_address import PartyAddress
 from app.routes.auth import auth_scheme, require_roles
 from app.schemas.hateoas import HypermediaModel
 from app.schemas.party_address import PartyAddressCreate, PartyAddressRead
+from app.services.party_search import reindex_party
 
 router = APIRouter()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 
 @router.get("/", response_model=Union[HypermediaModel, List[HypermediaModel]])
 def read_party_addresses(
@@ -29,6 +25,8 @@ def read_party_addresses(
     address_id: int | None = None,
     skip: int = 0,
     limit: int = 100,
+    list_query: ListQuery = Depends(get_list_query),
+    fieldset: Fieldset = Depends(get_fieldset),
     db: Session = Depends(get_db),
     credentials: JwtAuthorizationCredentials = Depends(auth_scheme)
 ):
@@ -42,27 +40,29 @@ def read_party_addresses(
         ).first()
         if pa is None:
             raise HTTPException(status_code=404, detail="PartyAddress not found")
-        pa_data = PartyAddressRead.from_orm(pa)
+        pa_data = fieldset.dump(pa, PartyAddressRead)
         return {
             "data": pa_data,
             "links": [
                 {"rel": "self", "href": f"{base_url}/party-addresses?party_id={pa.party_id}&address_id={pa.address_id}"},
                 {"rel": "party", "href": f"{base_url}/parties/{pa.party_id}"},
                 {"rel": "address", "href": f"{base_url}/addresses/{pa.address_id}"}
-            ]
+            ] if fieldset.links else []
         }
     # Otherwise return list
-    party_addresses = db.query(PartyAddress).offset(skip).limit(limit).all()
+    query = list_query.apply(db.query(PartyAddress), PartyAddress)
+    query = fieldset.apply(query, PartyAddress, PartyAddressRead)
+    party_addresses = query.offset(skip).limit(limit).all()
     pa_list = []
     for pa in party_addresses:
-        pa_data = PartyAddressRead.from_orm(pa)
+        pa_data = fieldset.dump(pa, PartyAddressRead)
         pa_list.append({
             "data": pa_data,
             "links": [
                 {"rel": "self", "href": f"{base_url}/party-addresses?party_id={pa.party_id}&address_id={pa.address_id}"},
                 {"rel": "party", "href": f"{base_url}/parties/{pa.party_id}"},
                 {"rel": "address", "href": f"{base_url}/addresses/{pa.address_id}"}
-            ]
+            ] if fieldset.links else []
         })
     return pa_list
 
@@ -71,6 +71,7 @@ def create_party_address(pa: PartyAddressCreate, request: Request, db: Session =
     require_roles(credentials, ["user"])
     db_pa = PartyAddress(**pa.model_dump())
     db.add(db_pa)
+    reindex_party(db, pa.party_id)
     db.commit()
     db.refresh(db_pa)
     pa_data = PartyAddressRead.from_orm(db_pa)
@@ -99,6 +100,7 @@ def delete_party_address(pa: PartyAddressCreate, request: Request, db: Session =
     base_url = str(request.base_url).rstrip('/')
 
     db.delete(db_pa)
+    reindex_party(db, pa.party_id)
     db.commit()
     return {
         "data": pa_data,
@@ -5,45 +5,64 @@ from fastapi import Depends
 from fastapi_jwt import JwtAuthorizationCredentials
 from sqlalchemy.orm import Session
 
-from app.db.session import SessionLocal
+from app.api.v1.fieldsets import Fieldset, get_fieldset
+from app.api.v1.filtering import ListQuery, get_list_query
+from app.api.v1.temporal import ActiveWindow, get_active_window
+from app.db.session import get_db
+from app.models.outbox_event import OutboxEvent
 from app.models.party_relationship import PartyRelationship
 from app.routes.auth import require_roles, auth_scheme
 from app.schemas.hateoas import HypermediaModel
 from app.schemas.party_relationship import PartyRelationshipCreate, PartyRelationshipRead
+from app.services import hierarchy
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 
 @router.get("/", response_model=List[HypermediaModel])
-def read_party_relationships(skip: int = 0, limit: int = 100, request: Request = None, credentials: JwtAuthorizationCredentials = Depends(auth_scheme), db: Session = Depends(get_db)):
+def read_party_relationships(skip: int = 0, limit: int = 100, request: Request = None, list_query: ListQuery = Depends(get_list_query), window: ActiveWindow = Depends(get_active_window), fieldset: Fieldset = Depends(get_fieldset), credentials: JwtAuthorizationCredentials = Depends(auth_scheme), db: Session = Depends(get_db)):
     require_roles(credentials, ["user"])
-    relationships = db.query(PartyRelationship).offset(skip).limit(limit).all()
+    query = window.apply(db.query(PartyRelationship), PartyRelationship)
+    query = list_query.apply(query, PartyRelationship)
+    query = fieldset.apply(query, PartyRelationship, PartyRelationshipRead, "from_party_id", "to_party_id")
+    relationships = query.offset(skip).limit(limit).all()
     base_url = str(request.base_url).rstrip('/')
     pr_list = []
     for pr in relationships:
-        pr_data = PartyRelationshipRead.from_orm(pr)
+        pr_data = fieldset.dump(pr, PartyRelationshipRead)
         pr_list.append({
             "data": pr_data,
             "links": [
                 {"rel": "self", "href": f"{base_url}/party-relationships/{pr.relationship_id}"},
                 {"rel": "from_party", "href": f"{base_url}/parties/{pr.from_party_id}"},
                 {"rel": "to_party", "href": f"{base_url}/parties/{pr.to_party_id}"}
-            ]
+            ] if fieldset.links else []
         })
     return pr_list
 
+def relationship_event_payload(pr: PartyRelationship) -> dict:
+    return {
+        "relationship_id": pr.relationship_id,
+        "from_party_id": pr.from_party_id,
+        "to_party_id": pr.to_party_id,
+        "relationship_type": pr.relationship_type,
+        "start_date": pr.start_date.isoformat() if pr.start_date else None,
+        "end_date": pr.end_date.isoformat() if pr.end_date else None,
+    }
+
 @router.post("/", response_model=HypermediaModel)
 def create_party_relationship(request: Request, pr: PartyRelationshipCreate, credentials: JwtAuthorizationCredentials = Depends(auth_scheme), db: Session = Depends(get_db)):
     require_roles(credentials, ["user"])
+    if hierarchy.is_hierarchical(pr.relationship_type) and hierarchy.creates_cycle(
+        db, pr.relationship_type, pr.from_party_id, pr.to_party_id
+    ):
+        raise HTTPException(status_code=409, detail="Relationship would create a cycle in the hierarchy")
     db_pr = PartyRelationship(**pr.model_dump())
     db.add(db_pr)
+    db.flush()
+    hierarchy.add_relationship(db, db_pr)
+    # Emit outbox event for creation
+    db.add(OutboxEvent(event_type="PartyRelationshipCreated", payload=relationship_event_payload(db_pr)))
     db.commit()
     db.refresh(db_pr)
     pr_data = PartyRelationshipRead.from_orm(db_pr)
@@ -58,12 +77,13 @@ def create_party_relationship(request: Request, pr: PartyRelationshipCreate, cre
     }
 
 @router.get("/{relationship_id}", response_model=HypermediaModel)
-def read_party_relationship(relationship_id: int, request: Request, credentials: JwtAuthorizationCredentials = Depends(auth_scheme), db: Session = Depends(get_db)):
+def read_party_relationship(relationship_id: int, request: Request, fieldset: Fieldset = Depends(get_fieldset), credentials: JwtAuthorizationCredentials = Depends(auth_scheme), db: Session = Depends(get_db)):
     require_roles(credentials, ["user"])
-    db_pr = db.query(PartyRelationship).filter(PartyRelationship.relationship_id == relationship_id).first()
+    query = fieldset.apply(db.query(PartyRelationship), PartyRelationship, PartyRelationshipRead, "from_party_id", "to_party_id")
+    db_pr = query.filter(PartyRelationship.relationship_id == relationship_id).first()
     if db_pr is None:
         raise HTTPException(status_code=404, detail="PartyRelationship not found")
-    pr_data = PartyRelationshipRead.from_orm(db_pr)
+    pr_data = fieldset.dump(db_pr, PartyRelationshipRead)
     base_url = str(request.base_url).rstrip('/')
     return {
         "data": pr_data,
@@ -71,7 +91,7 @@ def read_party_relationship(relationship_id: int, request: Request, credentials:
             {"rel": "self", "href": f"{base_url}/party-relationships/{db_pr.relationship_id}"},
             {"rel": "from_party", "href": f"{base_url}/parties/{db_pr.from_party_id}"},
             {"rel": "to_party", "href": f"{base_url}/parties/{db_pr.to_party_id}"}
-        ]
+        ] if fieldset.links else []
     }
 
 @router.delete("/{relationship_id}", response_model=HypermediaModel)
@@ -82,6 +102,9 @@ def delete_party_relationship(relationship_id: int, request: Request, credential
         raise HTTPException(status_code=404, detail="PartyRelationship not found")
     pr_data = PartyRelationshipRead.from_orm(db_pr)
     base_url = str(request.base_url).rstrip('/')
+    # Emit outbox event for deletion
+    db.add(OutboxEvent(event_type="PartyRelationshipDeleted", payload=relationship_event_payload(db_pr)))
+    hierarchy.remove_relationship(db, db_pr)
     db.delete(db_pr)
     db.commit()
     return {
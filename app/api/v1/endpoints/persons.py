@@ -1,10 +1,15 @@
+import asyncio
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi_jwt import JwtAuthorizationCredentials
 from sqlalchemy.orm import Session
 
-from app.db.session import SessionLocal
+from app.api.v1.fieldsets import Fieldset, get_fieldset
+from app.api.v1.filtering import ListQuery, get_list_query
+from app.config import settings
+from app.db.session import get_db
 from app.models.external_identifier import ExternalIdentifier
 from app.models.outbox_event import OutboxEvent
 from app.models.party import Party
@@ -12,40 +17,39 @@ from app.models.person import Person
 from app.routes.auth import auth_scheme, require_roles
 from app.schemas.hateoas import HypermediaModel
 from app.schemas.person import PersonCreate, PersonRead
+from app.services import hierarchy
+from app.services.party_search import remove_parties
+from app.services.write_coalescer import write_coalescer
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get("/", response_model=List[HypermediaModel])
-def read_persons(request: Request, skip: int = 0, limit: int = 100, db: Session = Depends(get_db), credentials: JwtAuthorizationCredentials = Depends(auth_scheme)):
+def read_persons(request: Request, skip: int = 0, limit: int = 100, list_query: ListQuery = Depends(get_list_query), fieldset: Fieldset = Depends(get_fieldset), db: Session = Depends(get_db), credentials: JwtAuthorizationCredentials = Depends(auth_scheme)):
     require_roles(credentials, ["user"])
-    persons = db.query(Person).offset(skip).limit(limit).all()
+    query = list_query.apply(db.query(Person), Person)
+    query = fieldset.apply(query, Person, PersonRead)
+    persons = query.offset(skip).limit(limit).all()
 
     response = []
     for person in persons:
         response.append({
-            "data": PersonRead.from_orm(person),
-            "links": create_person_links(request, person.party_id)
+            "data": fieldset.dump(person, PersonRead),
+            "links": create_person_links(request, person.party_id) if fieldset.links else []
         })
 
     return response
 
 @router.get("/{party_id}", response_model=HypermediaModel)
-def read_person(party_id: int, request: Request, db: Session = Depends(get_db), credentials: JwtAuthorizationCredentials = Depends(auth_scheme)):
+def read_person(party_id: int, request: Request, fieldset: Fieldset = Depends(get_fieldset), db: Session = Depends(get_db), credentials: JwtAuthorizationCredentials = Depends(auth_scheme)):
     require_roles(credentials, ["user"])
-    db_person = db.query(Person).filter(Person.party_id == party_id).first()
+    query = fieldset.apply(db.query(Person), Person, PersonRead)
+    db_person = query.filter(Person.party_id == party_id).first()
     if db_person is None:
         raise HTTPException(status_code=404, detail="Person not found")
 
     return {
-        "data": PersonRead.from_orm(db_person),
-        "links": create_person_links(request, db_person.party_id)
+        "data": fieldset.dump(db_person, PersonRead),
+        "links": create_person_links(request, db_person.party_id) if fieldset.links else []
     }
 
 def create_person_links(request: Request, party_id: int):
@@ -58,39 +62,35 @@ def create_person_links(request: Request, party_id: int):
         {"rel": "legacy-identifiers", "href": f"{base_url}/parties/{party_id}/legacy-identifiers"},
     ]
 
+async def write_persons(kind: str, args, db: Session):
+    """
+    Run one person write through its batch function: queued with concurrent
+    writes in a shared transaction when coalescing is on, otherwise alone on
+    the request's session.
+    """
+    if settings.WRITE_COALESCING_ENABLED:
+        # The write happens on the coalescer's session; keep this client's reads on the primary all the same
+        db.wrote = True
+        return await asyncio.wrap_future(write_coalescer.submit(kind, args))
+
+    def write():
+        result = write_coalescer.handlers[kind](db, [args])[0]
+        db.commit()
+        return result
+    return await run_in_threadpool(write)
+
 @router.post("/", response_model=HypermediaModel)
-def create_person(
+async def create_person(
     person: PersonCreate,
     request: Request,
     db: Session = Depends(get_db),
     credentials: JwtAuthorizationCredentials = Depends(auth_scheme)
 ):
     require_roles(credentials, ["user"])
-    party = Party(party_type="person", display_name=f"{person.first_name} {person.last_name}")
-    db.add(party)
-    db.commit()
-    db.refresh(party)
-
-    db_person = Person(party_id=party.party_id, **person.model_dump())
-    db.add(db_person)
-
-    # Create outbox event explicitly
-    outbox_event = OutboxEvent(
-        event_type="PersonCreated",
-        payload={
-            "party_id": party.party_id,
-            "first_name": person.first_name,
-            "last_name": person.last_name,
-            "email": person.email
-        }
-    )
-    db.add(outbox_event)
-
-    db.commit()
-    db.refresh(db_person)
+    db_person = await write_persons("person_create", person, db)
 
     return {
-        "data": PersonRead.from_orm(db_person),
+        "data": db_person,
         "links": create_person_links(request, db_person.party_id)
     }
 
@@ -98,49 +98,15 @@ def create_person(
     "/persons/{party_id}",
     response_model=HypermediaModel
 )
-def update_person(party_id: int, person_update: PersonCreate, request: Request, db: Session = Depends(get_db), credentials: JwtAuthorizationCredentials = Depends(auth_scheme)):
+async def update_person(party_id: int, person_update: PersonCreate, request: Request, db: Session = Depends(get_db), credentials: JwtAuthorizationCredentials = Depends(auth_scheme)):
     require_roles(credentials, ["user"])
-    # Retrieve the existing person record
-    db_person = db.query(Person).filter(Person.party_id == party_id).first()
-    if not db_person:
+    db_person = await write_persons("person_update", (party_id, person_update), db)
+    if db_person is None:
         raise HTTPException(status_code=404, detail="Person not found")
 
-    # Update the person's fields
-    db_person.first_name = person_update.first_name
-    db_person.last_name = person_update.last_name
-    db_person.email = person_update.email
-
-    # Update the associated party's display_name
-    party = db.query(Party).filter(Party.party_id == party_id).first()
-    if party:
-        party.display_name = f"{person_update.first_name} {person_update.last_name}"
-
-    # Emit outbox event explicitly for the update
-    # Gather external identifiers
-    identifiers = db.query(ExternalIdentifier).filter(ExternalIdentifier.party_id == party_id).all()
-    ext_ids = [
-        {"system_name": ei.system_name, "external_id": ei.external_id}
-        for ei in identifiers
-    ]
-    outbox_event = OutboxEvent(
-        event_type="PersonUpdated",
-        payload={
-            "party_id": party_id,
-            "first_name": person_update.first_name,
-            "last_name": person_update.last_name,
-            "email": person_update.email,
-            "external_identifiers": ext_ids
-        }
-    )
-    db.add(outbox_event)
-
-    # Commit all changes
-    db.commit()
-    db.refresh(db_person)
-
     # Return HATEOAS response
     return {
-        "data": PersonRead.from_orm(db_person),
+        "data": db_person,
         "links": create_person_links(request, db_person.party_id)
     }
 
@@ -171,11 +137,13 @@ def delete_person(party_id: int, request: Request, db: Session = Depends(get_db)
         }
     )
     db.add(outbox_event)
+    hierarchy.remove_party(db, party_id)
     # Remove the person and party records
     db.delete(db_person)
     party = db.query(Party).filter(Party.party_id == party_id).first()
     if party:
         db.delete(party)
+    remove_parties(db, [party_id])
     db.commit()
 
     return Response(status_code=status.HTTP_204_NO_CONTENT)
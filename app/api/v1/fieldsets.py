@@ -0,0 +1,49 @@
+from fastapi import HTTPException, Query
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+
+
+class Fieldset:
+    """Sparse fieldset requested through the `fields=` and `links=` query parameters."""
+
+    def __init__(self, fields: list[str] | None = None, links: bool = True):
+        self.fields = fields
+        self.links = links
+
+    def validate(self, schema):
+        if self.fields is None:
+            return None
+        unknown = [name for name in self.fields if name not in schema.model_fields]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown field(s) requested: {', '.join(unknown)}"
+            )
+        return self.fields
+
+    def apply(self, query, model, schema, *required: str):
+        # Prune the SELECT to the requested columns plus whatever the links need
+        fields = self.validate(schema)
+        if fields is None:
+            return query
+        mapper = inspect(model)
+        loadable = {attr.key for attr in mapper.column_attrs}
+        names = [column.key for column in mapper.primary_key]
+        names += [name for name in (*required, *fields) if name not in names]
+        columns = [getattr(model, name) for name in names if name in loadable]
+        return query.options(load_only(*columns))
+
+    def dump(self, obj, schema):
+        if self.fields is None:
+            return schema.from_orm(obj)
+        return {name: getattr(obj, name, None) for name in self.fields}
+
+
+def get_fieldset(
+    fields: str | None = Query(None, description="Comma-separated list of fields to return"),
+    links: bool = Query(True, description="Set to false to omit hypermedia links"),
+) -> Fieldset:
+    requested = None
+    if fields:
+        requested = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    return Fieldset(requested or None, links)
@@ -0,0 +1,141 @@
+import re
+from datetime import date, datetime
+
+from fastapi import HTTPException, Query, Request
+from sqlalchemy import Date, DateTime, Integer, PrimaryKeyConstraint, String, UniqueConstraint
+
+FILTER_PARAM = re.compile(r"^filter\[(?P<field>\w+)\](?:\[(?P<op>\w+)\])?$")
+
+OPERATORS = {
+    "eq": lambda column, value: column == value,
+    "ne": lambda column, value: column != value,
+    "lt": lambda column, value: column < value,
+    "lte": lambda column, value: column <= value,
+    "gt": lambda column, value: column > value,
+    "gte": lambda column, value: column >= value,
+    "in": lambda column, value: column.in_(value),
+    "prefix": lambda column, value: column.startswith(value, autoescape=True),
+}
+
+
+def index_keys(model) -> list[list[str]]:
+    """Column names of each primary key, unique constraint and index of a model's table, in key order."""
+    table = model.__table__
+    keys = [constraint for constraint in table.constraints
+            if isinstance(constraint, (PrimaryKeyConstraint, UniqueConstraint))]
+    return [[column.name for column in key.columns] for key in [*keys, *table.indexes] if key.columns]
+
+
+def covered(model, equal: set[str], ranged: set[str], ordered: list[str]) -> bool:
+    """
+    Whether one index can serve a query as a whole: the filtered columns, with
+    at most one of them compared by range, form a leftmost prefix of the
+    index, and any sort columns come next in index order, starting from the
+    range column if there is one.
+    """
+    if len(ranged) > 1:
+        return False
+    filtered = equal | ranged
+    for columns in index_keys(model):
+        if set(columns[:len(filtered)]) != filtered:
+            continue
+        if not ordered:
+            return True
+        following = columns[len(filtered) - 1:] if ranged else columns[len(filtered):]
+        if ranged and following[0] not in ranged:
+            continue
+        if following[:len(ordered)] == ordered:
+            return True
+    return False
+
+
+def coerce(column, raw: str):
+    try:
+        if isinstance(column.type, Integer):
+            return int(raw)
+        if isinstance(column.type, DateTime):
+            return datetime.fromisoformat(raw)
+        if isinstance(column.type, Date):
+            return date.fromisoformat(raw)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid value '{raw}' for {column.name}")
+    return raw
+
+
+class ListQuery:
+    """Filters and sort order parsed from `filter[field][op]=value` and `sort=-field` parameters."""
+
+    def __init__(self, filters: list[tuple[str, str, str]] | None = None, sort: list[str] | None = None):
+        self.filters = filters or []
+        self.sort = sort or []
+
+    def _column(self, model, name: str, purpose: str):
+        table = model.__table__
+        if name not in table.columns:
+            raise HTTPException(status_code=400, detail=f"Unknown {purpose} field: {name}")
+        return getattr(model, table.columns[name].key)
+
+    def _check_covered(self, model):
+        equal = {name for name, op, _ in self.filters if op == "eq"}
+        ranged = {name for name, op, _ in self.filters if op != "eq"} - equal
+        # Sorting on a column filtered to a single value leaves the order unchanged
+        ordered = []
+        for term in self.sort:
+            name = term.lstrip("-")
+            if name not in equal and name not in ordered:
+                ordered.append(name)
+        if not covered(model, equal, ranged, ordered):
+            fields = ", ".join(dict.fromkeys([name for name, _, _ in self.filters] + ordered))
+            raise HTTPException(status_code=400, detail=f"No index covers filtering and sorting on: {fields}")
+
+    def apply(self, query, model):
+        for name, _, _ in self.filters:
+            self._column(model, name, "filter")
+        for term in self.sort:
+            self._column(model, term.lstrip("-"), "sort")
+        if self.filters or self.sort:
+            self._check_covered(model)
+
+        # Values are always passed as bound parameters, never interpolated into SQL
+        for name, op, raw in self.filters:
+            column = self._column(model, name, "filter")
+            if op == "in":
+                value = [coerce(column, item) for item in raw.split(",")]
+            elif op == "prefix":
+                if not isinstance(column.type, String):
+                    raise HTTPException(status_code=400, detail=f"Prefix filter requires a text field: {name}")
+                value = raw
+            else:
+                value = coerce(column, raw)
+            query = query.filter(OPERATORS[op](column, value))
+
+        order_by = []
+        for term in self.sort:
+            name = term.lstrip("-")
+            column = self._column(model, name, "sort")
+            order_by.append(column.desc() if term.startswith("-") else column.asc())
+        if order_by:
+            # Tie-break on the primary key so offset pagination stays stable
+            order_by += [column.asc() for column in model.__table__.primary_key.columns]
+            query = query.order_by(*order_by)
+        return query
+
+
+def get_list_query(
+    request: Request,
+    sort: str | None = Query(None, description="Comma-separated fields to sort by, prefix with '-' for descending"),
+) -> ListQuery:
+    filters = []
+    for key, value in request.query_params.multi_items():
+        if not key.startswith("filter"):
+            continue
+        match = FILTER_PARAM.match(key)
+        if match is None:
+            raise HTTPException(status_code=400, detail=f"Malformed filter parameter: {key}")
+        op = match.group("op") or "eq"
+        if op not in OPERATORS:
+            raise HTTPException(status_code=400, detail=f"Unsupported filter operator: {op}")
+        filters.append((match.group("field"), op, value))
+
+    terms = [term.strip() for term in sort.split(",") if term.strip()] if sort else []
+    return ListQuery(filters, terms)
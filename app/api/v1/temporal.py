@@ -0,0 +1,55 @@
+from datetime import date
+
+from fastapi import HTTPException, Query
+from sqlalchemy import or_
+
+
+class ActiveWindow:
+    """
+    Date window a dated row must overlap, parsed from `as_of=` or `active_between=`.
+
+    A missing start_date means "since forever" and a missing end_date "still
+    active"; both bounds are inclusive.
+    """
+
+    def __init__(self, start: date | None = None, end: date | None = None):
+        self.start = start
+        self.end = end
+
+    def __bool__(self):
+        return self.start is not None
+
+    def apply(self, query, model):
+        if not self:
+            return query
+        return query.filter(
+            or_(model.start_date.is_(None), model.start_date <= self.end),
+            or_(model.end_date.is_(None), model.end_date >= self.start),
+        )
+
+
+def _parse_date(raw: str, name: str) -> date:
+    try:
+        return date.fromisoformat(raw.strip())
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid date '{raw}' for {name}")
+
+
+def get_active_window(
+    as_of: str | None = Query(None, description="Only rows active on this date (YYYY-MM-DD)"),
+    active_between: str | None = Query(None, description="Only rows active at any point in 'start,end'"),
+) -> ActiveWindow:
+    if as_of is not None and active_between is not None:
+        raise HTTPException(status_code=400, detail="Use either as_of or active_between, not both")
+    if as_of is not None:
+        day = _parse_date(as_of, "as_of")
+        return ActiveWindow(day, day)
+    if active_between is not None:
+        bounds = active_between.split(",")
+        if len(bounds) != 2:
+            raise HTTPException(status_code=400, detail="active_between must be 'start,end'")
+        start, end = (_parse_date(bound, "active_between") for bound in bounds)
+        if start > end:
+            raise HTTPException(status_code=400, detail="active_between start must not be after end")
+        return ActiveWindow(start, end)
+    return ActiveWindow()
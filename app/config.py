@@ -9,8 +9,61 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     USERS_DB_FILE: str = "users.json"
     DATABASE_URL: str = "sqlite:///./rolodex_data.db"  # default local dev
+    # Serve the core party endpoints from async handlers on an AsyncSession (aiosqlite/asyncpg)
+    DB_ASYNC_ENABLED: bool = False
+    # Worker threads for sync endpoints; each can hold one connection, so the pool defaults to the same size
+    THREADPOOL_SIZE: int = 40
+    DB_POOL_SIZE: int | None = None  # None follows THREADPOOL_SIZE
+    DB_MAX_OVERFLOW: int = 10  # extra connections for background tasks and bursts beyond the pool
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a free connection before failing
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced; -1 never
+    DB_POOL_PRE_PING: bool = True  # test connections on checkout so dropped ones are replaced transparently
+    # WAL, pragmas and BEGIN IMMEDIATE writers on SQLite connections (see app/db/sqlite.py)
+    SQLITE_PERFORMANCE_PROFILE: bool = True
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # durable across crashes in WAL mode; a power cut can lose the last commits
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456  # bytes of the database file memory-mapped for reads
+    SQLITE_CACHE_SIZE_KIB: int = 65536  # page cache per connection
+    # Read replicas for GET requests; empty sends everything to DATABASE_URL
+    REPLICA_DATABASE_URLS: list[str] = []
+    REPLICA_STICKY_SECONDS: float = 5.0  # after a write, that client's reads stay on the primary this long
+    # Group concurrent person creates and updates into shared transactions (see app/services/write_coalescer.py)
+    WRITE_COALESCING_ENABLED: bool = False
+    WRITE_COALESCING_WINDOW_MS: float = 2.0  # how long the first write in a batch waits for others to join
+    WRITE_COALESCING_MAX_BATCH: int = 200  # writes per transaction
+    # Idempotency-Key support on these POST paths (see app/middleware/idempotency.py)
+    IDEMPOTENCY_PATHS: list[str] = ["/persons/", "/organisations/", "/external-identifiers/"]
+    IDEMPOTENCY_STORE: str = "database"  # or "redis"
+    IDEMPOTENCY_TTL_SECONDS: int = 86400  # how long a completed response is replayed
+    IDEMPOTENCY_LOCK_SECONDS: int = 60  # a running request older than this is assumed lost and its key freed
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0  # a concurrent duplicate waits this long for the first before a 409
+    BATCH_MAX_REQUESTS: int = 50  # sub-requests per POST /batch
+    BATCH_READ_CONCURRENCY: int = 10  # GETs of one batch in flight at once, each on its own pooled session
+    BATCH_ITEM_TIMEOUT_SECONDS: float = 30.0  # a sub-request still running after this gets a 504
+    # Adaptive concurrency limits with separate read and write budgets (see app/middleware/admission.py)
+    ADMISSION_CONTROL_ENABLED: bool = False
+    ADMISSION_READ_LIMIT: int = 32  # most reads in flight; the adaptive limit moves between the minimum and this
+    ADMISSION_WRITE_LIMIT: int = 8  # raised to WRITE_COALESCING_MAX_BATCH while coalescing, whose writes hold no thread
+    ADMISSION_MIN_LIMIT: int = 2
+    ADMISSION_QUEUE_TIMEOUT_MS: float = 250.0  # how long a request over the limit waits for a slot before a 503
+    ADMISSION_POOL_WAIT_TARGET_MS: float = 10.0  # mean connection checkout wait above this counts as congestion
+    ADMISSION_LATENCY_TOLERANCE: float = 2.0  # median latency above this multiple of the baseline counts as congestion
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+    # Long-lived streams and long polls, and /batch whose sub-requests are admitted one by one
+    ADMISSION_EXEMPT_PATHS: list[str] = ["/health", "/events", "/changes", "/batch"]
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # bytes; smaller responses are sent uncompressed
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    GRAPH_INDEX_ENABLED: bool = False  # in-process relationship graph for path/component queries
+    # Relationship types maintained in the closure table; from_party is the child of to_party
+    HIERARCHY_RELATIONSHIP_TYPES: list[str] = ["subsidiary_of"]
+    EVENT_STREAM_BUFFER_SIZE: int = 1000  # events queued per push client before it is disconnected
+    EVENT_STREAM_DISCOVERY_INTERVAL: float = 30.0  # seconds between scans for new outbox streams
+    CHANGE_FEED_POLL_INTERVAL: float = 0.5  # seconds between outbox checks while a /changes request long-polls
+    # Outbox readers hold back events this young, so ids committed out of order are not skipped; ignored on SQLite
+    OUTBOX_SETTLE_SECONDS: float = 2.0
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,453 @@
+"""
+Versioned schema migrations, applied with `python -m app.manage_db upgrade`.
+
+Each migration is written out explicitly rather than derived from the models,
+so it keeps doing the same thing as the models move on. Steps check what
+already exists, so databases built by `create` (or by hand) upgrade cleanly.
+The applied versions are recorded in the schema_migrations table.
+"""
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import (
+    JSON, Column, Date, DateTime, Float, ForeignKey, Index, Integer, LargeBinary, MetaData, String, Table,
+    UniqueConstraint, delete, func, insert, inspect, select, text,
+)
+from sqlalchemy.engine import Connection, Engine
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", String(20), primary_key=True),
+    Column("description", String(200), nullable=False),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+@dataclass
+class Migration:
+    version: str
+    description: str
+    upgrade: Callable[[Connection], None]
+    downgrade: Callable[[Connection], None]
+
+
+def index_state(conn: Connection, name: str, table: str) -> str | None:
+    """'valid', 'invalid' (a failed concurrent build on Postgres) or None when missing."""
+    if conn.dialect.name == "postgresql":
+        valid = conn.execute(text(
+            "SELECT i.indisvalid FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+            "WHERE c.relname = :name AND c.relkind = 'i'"
+        ), {"name": name}).scalar()
+        return None if valid is None else ("valid" if valid else "invalid")
+    names = {index["name"] for index in inspect(conn).get_indexes(table)}
+    return "valid" if name in names else None
+
+
+def create_index(conn: Connection, name: str, table: str, columns: list[str], unique: bool = False):
+    """Create an index unless it exists; on Postgres without locking out writes to the table."""
+    state = index_state(conn, name, table)
+    if state == "valid":
+        return
+    quote = conn.dialect.identifier_preparer.quote
+    concurrently = ""
+    if conn.dialect.name == "postgresql":
+        # A concurrent build that failed leaves an invalid index behind, rebuild it
+        if state == "invalid":
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {quote(name)}"))
+        concurrently = "CONCURRENTLY "
+    conn.execute(text(
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX {concurrently}{quote(name)} "
+        f"ON {quote(table)} ({', '.join(quote(column) for column in columns)})"
+    ))
+
+
+def drop_index(conn: Connection, name: str, table: str):
+    if index_state(conn, name, table) is None:
+        return
+    quote = conn.dialect.identifier_preparer.quote
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {quote(name)}"))
+    elif conn.dialect.name == "mysql":
+        conn.execute(text(f"DROP INDEX {quote(name)} ON {quote(table)}"))
+    else:
+        conn.execute(text(f"DROP INDEX {quote(name)}"))
+
+
+# The schema as it stood before versioned migrations, frozen here so 0001 keeps
+# creating exactly this whatever the models become
+frozen = MetaData()
+
+parties = Table(
+    "parties", frozen,
+    Column("party_id", Integer, primary_key=True, index=True),
+    Column("party_type", String(50), nullable=False),
+    Column("display_name", String(100), nullable=False),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+)
+
+persons = Table(
+    "persons", frozen,
+    Column("party_id", Integer, ForeignKey("parties.party_id"), primary_key=True),
+    Column("first_name", String(50), nullable=False),
+    Column("last_name", String(50), nullable=False),
+    Column("date_of_birth", Date, nullable=True),
+    Column("email", String(100), unique=True, nullable=False),
+    Column("phone_primary", String(20), nullable=False),
+    Column("phone_secondary", String(20), nullable=True),
+)
+
+organisations = Table(
+    "organisations", frozen,
+    Column("party_id", Integer, ForeignKey("parties.party_id"), primary_key=True),
+    Column("organisation_name", String(100), nullable=False),
+    Column("organisation_type", String(50), nullable=False),
+    Column("registration_number", String(50), nullable=True),
+    Column("email", String(100), nullable=False),
+    Column("phone_primary", String(20), nullable=False),
+    Column("phone_secondary", String(20), nullable=True),
+)
+
+addresses = Table(
+    "addresses", frozen,
+    Column("address_id", Integer, primary_key=True, index=True),
+    Column("address_line_1", String(100), nullable=False),
+    Column("address_line_2", String(100), nullable=True),
+    Column("city", String(50), nullable=False),
+    Column("region", String(50), nullable=True),
+    Column("postal_code", String(20), nullable=False),
+    Column("country", String(50), nullable=False),
+    Column("address_type", String(20), nullable=False),
+)
+
+party_addresses = Table(
+    "party_addresses", frozen,
+    Column("party_id", Integer, ForeignKey("parties.party_id"), primary_key=True),
+    Column("address_id", Integer, ForeignKey("addresses.address_id"), primary_key=True),
+)
+
+party_relationships = Table(
+    "party_relationships", frozen,
+    Column("relationship_id", Integer, primary_key=True, index=True),
+    Column("from_party_id", Integer, ForeignKey("parties.party_id"), nullable=False),
+    Column("to_party_id", Integer, ForeignKey("parties.party_id"), nullable=False),
+    Column("relationship_type", String(50), nullable=False),
+    Column("start_date", Date, nullable=True),
+    Column("end_date", Date, nullable=True),
+    Column("notes", String(250), nullable=True),
+)
+
+external_identifiers = Table(
+    "external_identifiers", frozen,
+    Column("external_identifier_id", Integer, primary_key=True, index=True),
+    Column("party_id", Integer, ForeignKey("parties.party_id", ondelete="CASCADE"), nullable=False),
+    Column("system_name", String(100), nullable=False, index=True),
+    Column("external_id", String(255), nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("updated_at", DateTime(timezone=True), server_default=func.now()),
+    UniqueConstraint("party_id", "system_name", name="uq_party_system"),
+)
+
+outbox_events = Table(
+    "outbox_events", frozen,
+    Column("event_id", Integer, primary_key=True, index=True),
+    Column("event_type", String(50), nullable=False),
+    Column("payload", JSON, nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("processed_at", DateTime(timezone=True), nullable=True),
+)
+
+BASELINE_TABLES = [
+    parties, persons, organisations, addresses, party_addresses, party_relationships, external_identifiers,
+    outbox_events,
+]
+
+
+def initial_upgrade(conn: Connection):
+    frozen.create_all(bind=conn, tables=BASELINE_TABLES)
+
+
+def initial_downgrade(conn: Connection):
+    frozen.drop_all(bind=conn, tables=BASELINE_TABLES)
+
+
+# (name, table, columns) of indexes on foreign keys and hot lookup paths
+LOOKUP_INDEXES = [
+    ("ix_party_relationships_from_party_dates", "party_relationships", ["from_party_id", "start_date", "end_date"]),
+    ("ix_party_relationships_to_party_dates", "party_relationships", ["to_party_id", "start_date", "end_date"]),
+    ("ix_party_relationships_dates", "party_relationships", ["start_date", "end_date"]),
+    ("ix_party_addresses_address_id", "party_addresses", ["address_id"]),
+    ("ix_outbox_events_processed_at_created_at", "outbox_events", ["processed_at", "created_at"]),
+    ("ix_parties_party_type_updated_at", "parties", ["party_type", "updated_at"]),
+    ("ix_persons_last_name_first_name", "persons", ["last_name", "first_name"]),
+    ("ix_organisations_organisation_type", "organisations", ["organisation_type"]),
+    ("ix_addresses_postal_code_city", "addresses", ["postal_code", "city"]),
+]
+
+
+def lookup_indexes_upgrade(conn: Connection):
+    for name, table, columns in LOOKUP_INDEXES:
+        create_index(conn, name, table, columns)
+
+
+def lookup_indexes_downgrade(conn: Connection):
+    for name, table, _ in reversed(LOOKUP_INDEXES):
+        drop_index(conn, name, table)
+
+
+def column_names(conn: Connection, table: str) -> set[str]:
+    return {column["name"] for column in inspect(conn).get_columns(table)}
+
+
+def add_column(conn: Connection, table: str, column: Column):
+    """Add a nullable column unless it exists."""
+    if column.name in column_names(conn, table):
+        return
+    quote = conn.dialect.identifier_preparer.quote
+    conn.execute(text(
+        f"ALTER TABLE {quote(table)} ADD COLUMN {quote(column.name)} {column.type.compile(dialect=conn.dialect)}"
+    ))
+
+
+def drop_column(conn: Connection, table: str, name: str):
+    if name not in column_names(conn, table):
+        return
+    quote = conn.dialect.identifier_preparer.quote
+    conn.execute(text(f"ALTER TABLE {quote(table)} DROP COLUMN {quote(name)}"))
+
+
+def unique_constraint_names(conn: Connection, table: str) -> set[str]:
+    return {constraint["name"] for constraint in inspect(conn).get_unique_constraints(table)}
+
+
+import_checkpoints = Table(
+    "import_checkpoints", frozen,
+    Column("name", String(200), primary_key=True),
+    Column("source", String(500), nullable=False),
+    Column("position", Integer, nullable=False),
+    Column("imported", Integer, nullable=False),
+    Column("rejected", Integer, nullable=False),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+)
+
+
+def import_checkpoints_upgrade(conn: Connection):
+    import_checkpoints.create(conn, checkfirst=True)
+
+
+def import_checkpoints_downgrade(conn: Connection):
+    import_checkpoints.drop(conn, checkfirst=True)
+
+
+idempotency_keys = Table(
+    "idempotency_keys", frozen,
+    Column("key", String(64), primary_key=True),
+    Column("fingerprint", String(64), nullable=False),
+    Column("status_code", Integer, nullable=True),
+    Column("headers", JSON, nullable=True),
+    Column("body", LargeBinary, nullable=True),
+    Column("created_at", DateTime),
+    Column("expires_at", DateTime, nullable=False),
+    Index("ix_idempotency_keys_expires_at", "expires_at"),
+)
+
+
+def idempotency_keys_upgrade(conn: Connection):
+    idempotency_keys.create(conn, checkfirst=True)
+
+
+def idempotency_keys_downgrade(conn: Connection):
+    idempotency_keys.drop(conn, checkfirst=True)
+
+
+def external_id_lookup_upgrade(conn: Connection):
+    # A unique index rather than a constraint, which SQLite cannot add to an existing table
+    if "uq_system_external_id" not in unique_constraint_names(conn, "external_identifiers"):
+        create_index(conn, "uq_system_external_id", "external_identifiers", ["system_name", "external_id"],
+                     unique=True)
+    # Lookups by system_name are served by the leading column of the unique index
+    drop_index(conn, "ix_external_identifiers_system_name", "external_identifiers")
+
+
+def external_id_lookup_downgrade(conn: Connection):
+    create_index(conn, "ix_external_identifiers_system_name", "external_identifiers", ["system_name"])
+    drop_index(conn, "uq_system_external_id", "external_identifiers")
+
+
+# The search index is dialect specific; other dialects search display names with LIKE
+SEARCH_DDL = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS party_search USING fts5("
+        "display_name, person_names, emails, organisation, addresses, "
+        "tokenize = 'unicode61 remove_diacritics 2')",
+    ],
+    "postgresql": [
+        "CREATE TABLE IF NOT EXISTS party_search ("
+        "party_id INTEGER PRIMARY KEY REFERENCES parties(party_id) ON DELETE CASCADE, "
+        "display_name TEXT, person_names TEXT, emails TEXT, organisation TEXT, addresses TEXT, "
+        "document tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple', coalesce(display_name, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(person_names, '') || ' ' || coalesce(organisation, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(emails, '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(addresses, '')), 'C')"
+        ") STORED)",
+        "CREATE INDEX IF NOT EXISTS ix_party_search_document ON party_search USING GIN (document)",
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE INDEX IF NOT EXISTS ix_party_search_display_name_trgm "
+        "ON party_search USING GIN (display_name gin_trgm_ops)",
+    ],
+}
+
+
+def party_search_upgrade(conn: Connection):
+    # Filled by `python -m app.manage_db reindex-search`
+    for statement in SEARCH_DDL.get(conn.dialect.name, []):
+        conn.execute(text(statement))
+
+
+def party_search_downgrade(conn: Connection):
+    if conn.dialect.name in SEARCH_DDL:
+        conn.execute(text("DROP TABLE IF EXISTS party_search"))
+
+
+party_hierarchy = Table(
+    "party_hierarchy", frozen,
+    Column("relationship_type", String(50), primary_key=True),
+    Column("ancestor_id", Integer, ForeignKey("parties.party_id", ondelete="CASCADE"), primary_key=True),
+    Column("descendant_id", Integer, ForeignKey("parties.party_id", ondelete="CASCADE"), primary_key=True),
+    Column("depth", Integer, primary_key=True),
+    Column("path_count", Integer, nullable=False),
+)
+
+
+def party_hierarchy_upgrade(conn: Connection):
+    # Filled by `python -m app.manage_db rebuild-hierarchy`
+    party_hierarchy.create(conn, checkfirst=True)
+    create_index(conn, "ix_party_hierarchy_descendant", "party_hierarchy",
+                 ["relationship_type", "descendant_id", "depth"])
+
+
+def party_hierarchy_downgrade(conn: Connection):
+    party_hierarchy.drop(conn, checkfirst=True)
+
+
+duplicate_candidates = Table(
+    "duplicate_candidates", frozen,
+    Column("candidate_id", Integer, primary_key=True, index=True),
+    Column("party_type", String(50), nullable=False),
+    Column("party_id", Integer, ForeignKey("parties.party_id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("duplicate_party_id", Integer, ForeignKey("parties.party_id", ondelete="CASCADE"), nullable=False,
+           index=True),
+    Column("score", Float, nullable=False),
+    Column("matched_on", String(100), nullable=False),
+    Column("detected_at", DateTime(timezone=True), server_default=func.now()),
+    UniqueConstraint("party_id", "duplicate_party_id", name="uq_duplicate_pair"),
+    Index("ix_duplicate_candidates_party_type_score", "party_type", "score"),
+)
+
+
+def duplicate_candidates_upgrade(conn: Connection):
+    duplicate_candidates.create(conn, checkfirst=True)
+
+
+def duplicate_candidates_downgrade(conn: Connection):
+    duplicate_candidates.drop(conn, checkfirst=True)
+
+
+def address_hashes_upgrade(conn: Connection):
+    # Existing rows keep a NULL hash until `python -m app.manage_db dedupe-addresses` folds and hashes them
+    add_column(conn, "addresses", Column("address_hash", String(64), nullable=True))
+    create_index(conn, "ix_addresses_address_hash", "addresses", ["address_hash"], unique=True)
+
+
+def address_hashes_downgrade(conn: Connection):
+    drop_index(conn, "ix_addresses_address_hash", "addresses")
+    drop_column(conn, "addresses", "address_hash")
+
+
+MIGRATIONS = [
+    Migration("0001", "Initial schema", initial_upgrade, initial_downgrade),
+    Migration("0002", "Index foreign keys and lookup paths", lookup_indexes_upgrade, lookup_indexes_downgrade),
+    Migration("0003", "Bulk import checkpoints", import_checkpoints_upgrade, import_checkpoints_downgrade),
+    Migration("0004", "Idempotency keys", idempotency_keys_upgrade, idempotency_keys_downgrade),
+    Migration("0005", "Unique external identifiers per system", external_id_lookup_upgrade,
+              external_id_lookup_downgrade),
+    Migration("0006", "Party search index", party_search_upgrade, party_search_downgrade),
+    Migration("0007", "Party hierarchy closure table", party_hierarchy_upgrade, party_hierarchy_downgrade),
+    Migration("0008", "Duplicate candidates", duplicate_candidates_upgrade, duplicate_candidates_downgrade),
+    Migration("0009", "Address content hashes", address_hashes_upgrade, address_hashes_downgrade),
+]
+
+HEAD = MIGRATIONS[-1].version
+BASE = "base"
+
+
+def applied_versions(engine: Engine) -> list[str]:
+    with engine.connect() as conn:
+        if not inspect(conn).has_table(schema_migrations.name):
+            return []
+        return list(conn.execute(select(schema_migrations.c.version).order_by(schema_migrations.c.version)).scalars())
+
+
+def current(engine: Engine) -> str | None:
+    versions = applied_versions(engine)
+    return versions[-1] if versions else None
+
+
+def _run(engine: Engine, migration: Migration, upgrading: bool):
+    step = migration.upgrade if upgrading else migration.downgrade
+    if engine.dialect.name == "postgresql":
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            step(conn)
+        with engine.begin() as conn:
+            _record(conn, migration, upgrading)
+    else:
+        with engine.begin() as conn:
+            step(conn)
+            _record(conn, migration, upgrading)
+
+
+def _record(conn: Connection, migration: Migration, upgrading: bool):
+    schema_migrations.create(conn, checkfirst=True)
+    if upgrading:
+        conn.execute(insert(schema_migrations).values(version=migration.version, description=migration.description))
+    else:
+        conn.execute(delete(schema_migrations).where(schema_migrations.c.version == migration.version))
+
+
+def _check_version(version: str, allow_base: bool = False):
+    if not (allow_base and version == BASE) and version not in {migration.version for migration in MIGRATIONS}:
+        raise ValueError(f"Unknown migration version {version}")
+
+
+def upgrade(engine: Engine, target: str = HEAD) -> list[Migration]:
+    """Apply the migrations after the current version up to target; returns those applied."""
+    _check_version(target)
+    applied = set(applied_versions(engine))
+    pending = [m for m in MIGRATIONS if m.version not in applied and m.version <= target]
+    for migration in pending:
+        _run(engine, migration, upgrading=True)
+    return pending
+
+
+def downgrade(engine: Engine, target: str) -> list[Migration]:
+    """Revert applied migrations newer than target ('base' reverts all); returns those reverted."""
+    _check_version(target, allow_base=True)
+    applied = set(applied_versions(engine))
+    reverting = [m for m in reversed(MIGRATIONS) if m.version in applied and (target == BASE or m.version > target)]
+    for migration in reverting:
+        _run(engine, migration, upgrading=False)
+    return reverting
+
+
+def stamp(engine: Engine, target: str = HEAD):
+    """Record migrations up to target as applied without running them, for a schema built by create_all."""
+    _check_version(target)
+    applied = set(applied_versions(engine))
+    with engine.begin() as conn:
+        for migration in MIGRATIONS:
+            if migration.version <= target and migration.version not in applied:
+                _record(conn, migration, upgrading=True)
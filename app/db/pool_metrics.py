@@ -0,0 +1,103 @@
+import contextvars
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class CheckoutTimer:
+    """Checkout wait times and timeouts of one pool; recent waits are kept for percentiles."""
+
+    def __init__(self, window: int = 1024):
+        self.lock = threading.Lock()
+        self.recent: deque[float] = deque(maxlen=window)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def observe(self, seconds: float, timed_out: bool = False):
+        with self.lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self.recent.append(seconds)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            recent = sorted(self.recent)
+            checkouts, timeouts, total, longest = self.checkouts, self.timeouts, self.wait_total, self.wait_max
+
+        def percentile(p):
+            return recent[min(len(recent) - 1, int(p * len(recent)))] if recent else 0.0
+
+        return {
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "wait_seconds_total": round(total, 6),
+            "wait_seconds_max": round(longest, 6),
+            "wait_seconds_p50": round(percentile(0.5), 6),
+            "wait_seconds_p95": round(percentile(0.95), 6),
+            "wait_seconds_p99": round(percentile(0.99), 6),
+        }
+
+
+# Set per request by admission control to collect that request's checkout waits
+checkout_waits: contextvars.ContextVar[list[float] | None] = contextvars.ContextVar("checkout_waits", default=None)
+
+
+class TimedCheckoutMixin:
+    # _do_get is where QueuePool blocks for a free connection, so its duration is the wait
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except exc.TimeoutError:
+            self._observe(time.perf_counter() - start, timed_out=True)
+            raise
+        self._observe(time.perf_counter() - start)
+        return entry
+
+    def _observe(self, seconds: float, timed_out: bool = False):
+        self.checkout_timer.observe(seconds, timed_out)
+        waits = checkout_waits.get()
+        if waits is not None:
+            waits.append(seconds)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.checkout_timer = self.checkout_timer
+        return pool
+
+
+class InstrumentedQueuePool(TimedCheckoutMixin, QueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_timer = CheckoutTimer()
+
+
+class InstrumentedAsyncQueuePool(TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_timer = CheckoutTimer()
+
+
+def pool_stats(pool) -> dict:
+    """Saturation gauges of a pool: configured size, connections in use, overflow in use and checkout waits."""
+    stats = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_in": pool.checkedin(),
+            "in_use": pool.checkedout(),
+            # overflow() counts down from -size while the pool fills, only the positive part is overflow
+            "overflow_in_use": max(pool.overflow(), 0),
+        })
+    timer = getattr(pool, "checkout_timer", None)
+    if timer is not None:
+        stats.update(timer.snapshot())
+    return stats
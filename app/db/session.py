@@ -1,8 +1,18 @@
-from sqlalchemy import create_engine
+import contextvars
+import itertools
+import threading
+import time
+
+from fastapi import Request
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.engine.url import make_url
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.dml import UpdateBase
 from app.config import settings
+from app.db.pool_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+from app.db.sqlite import IMMEDIATE, apply_sqlite_profile
 
 DATABASE_URL = settings.DATABASE_URL
 
@@ -12,6 +22,167 @@ url = make_url(DATABASE_URL)
 if url.drivername.startswith("sqlite"):
     connect_args = {"check_same_thread": False}
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+def pool_options(url, poolclass) -> dict:
+    # In-memory SQLite lives in a single connection, its pool is not sized
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE or settings.THREADPOOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+class RoutingSession(Session):
+    """
+    A session that reads from a replica when opened read_only, and otherwise
+    (or once it has written anything) uses the primary. A session stays on the
+    one replica it picked first so its reads see a single consistent snapshot.
+    """
+
+    def __init__(self, bind=None, *, primary=None, replicas=(), read_only=False, **kwargs):
+        super().__init__(bind=primary or bind, **kwargs)
+        self.replicas = replicas
+        self.read_only = read_only
+        self.replica = None
+        self.wrote = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if isinstance(clause, UpdateBase):
+            self.wrote = True
+        if not self.read_only or self.wrote or self._flushing or not self.replicas:
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        if self.replica is None:
+            self.replica = next_replica(self.replicas)
+        return self.replica
+
+@event.listens_for(RoutingSession, "after_flush")
+def mark_written(session, flush_context):
+    session.wrote = True
+
+replica_counter = itertools.count()
+
+def next_replica(replicas):
+    # Round robin, skipping past a replica whose pool is exhausted while another has room
+    start = next(replica_counter)
+    ordered = [replicas[(start + i) % len(replicas)] for i in range(len(replicas))]
+    for replica in ordered:
+        pool = replica.pool
+        if not isinstance(pool, QueuePool) or pool.checkedout() < pool.size() + pool._max_overflow:
+            return replica
+    return ordered[0]
+
+class RecentWriters:
+    """Clients that wrote within the last `window` seconds, whose reads stay on the primary."""
+
+    def __init__(self, window: float):
+        self.window = window
+        self.lock = threading.Lock()
+        self.writes: dict[str, float] = {}
+
+    def record(self, client: str):
+        now = time.monotonic()
+        with self.lock:
+            self.writes[client] = now
+            if len(self.writes) > 10000:
+                self.writes = {key: at for key, at in self.writes.items() if now - at < self.window}
+
+    def is_recent(self, client: str) -> bool:
+        at = self.writes.get(client)
+        return at is not None and time.monotonic() - at < self.window
+
+recent_writers = RecentWriters(settings.REPLICA_STICKY_SECONDS)
+
+def client_key(request: Request) -> str:
+    return request.headers.get("authorization") or (request.client.host if request.client else "")
+
+def reads_from_replica(request: Request) -> bool:
+    return request.method in ("GET", "HEAD") and not recent_writers.is_recent(client_key(request))
+
+def takes_write_lock(request: Request) -> bool:
+    # A recent writer's GETs move to the primary for freshness, not to queue for the SQLite write lock
+    return request.method not in ("GET", "HEAD")
+
+def tune(engine):
+    if engine.url.get_backend_name() == "sqlite" and settings.SQLITE_PERFORMANCE_PROFILE:
+        apply_sqlite_profile(engine)
+    return engine
+
+engine = tune(create_engine(DATABASE_URL, connect_args=connect_args, **pool_options(url, InstrumentedQueuePool)))
+# The same pool, for sessions that write; on SQLite their transactions take the write lock up front
+write_engine = engine.execution_options(**{IMMEDIATE: True})
+replica_engines = [
+    tune(create_engine(replica_url, connect_args=connect_args, **pool_options(make_url(replica_url), InstrumentedQueuePool)))
+    for replica_url in settings.REPLICA_DATABASE_URLS
+]
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
\ No newline at end of file
+WriteSessionLocal = sessionmaker(autoflush=False, bind=write_engine)
+RoutingSessionLocal = sessionmaker(class_=RoutingSession, autoflush=False, replicas=replica_engines)
+Base = declarative_base()
+
+# Set by POST /batch around its writes, which then run one after another on this session
+shared_session: contextvars.ContextVar[Session | None] = contextvars.ContextVar("shared_session", default=None)
+
+def get_db(request: Request):
+    """Session for one request: GETs read from a replica unless the client has just written."""
+    shared = shared_session.get()
+    if shared is not None:
+        yield shared
+        return
+    read_only = reads_from_replica(request)
+    db = RoutingSessionLocal(read_only=read_only, primary=write_engine if takes_write_lock(request) else engine)
+    try:
+        yield db
+    finally:
+        if db.wrote:
+            recent_writers.record(client_key(request))
+        db.close()
+
+# Async drivers for DB_ASYNC_ENABLED, keyed by backend name
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+def async_url(database_url: str):
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+async_engine = None
+async_replica_engines = []
+AsyncSessionLocal = None
+if settings.DB_ASYNC_ENABLED:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        async_url(DATABASE_URL), **pool_options(url, InstrumentedAsyncQueuePool)
+    )
+    tune(async_engine.sync_engine)
+    async_write_engine = async_engine.sync_engine.execution_options(**{IMMEDIATE: True})
+    async_replica_engines = [
+        create_async_engine(async_url(replica_url), **pool_options(make_url(replica_url), InstrumentedAsyncQueuePool))
+        for replica_url in settings.REPLICA_DATABASE_URLS
+    ]
+    for replica in async_replica_engines:
+        tune(replica.sync_engine)
+    # Objects stay readable after commit; an expired attribute would need IO to reload
+    AsyncSessionLocal = async_sessionmaker(
+        sync_session_class=RoutingSession, autoflush=False, expire_on_commit=False,
+        replicas=[e.sync_engine for e in async_replica_engines],
+    )
+
+async def get_async_db(request: Request):
+    read_only = reads_from_replica(request)
+    primary = async_write_engine if takes_write_lock(request) else async_engine.sync_engine
+    async with AsyncSessionLocal(read_only=read_only, primary=primary) as db:
+        try:
+            yield db
+        finally:
+            if db.sync_session.wrote:
+                recent_writers.record(client_key(request))
\ No newline at end of file
@@ -0,0 +1,44 @@
+from sqlalchemy import event
+
+from app.config import settings
+
+# Execution option marking a connection whose transactions will write
+IMMEDIATE = "sqlite_begin_immediate"
+
+
+def pragmas() -> list[str]:
+    return [
+        "journal_mode=WAL",
+        f"synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        f"mmap_size={settings.SQLITE_MMAP_SIZE}",
+        # Negative cache_size is in KiB rather than pages
+        f"cache_size=-{settings.SQLITE_CACHE_SIZE_KIB}",
+        "temp_store=MEMORY",
+    ]
+
+
+def apply_sqlite_profile(engine):
+    """
+    Tune every new connection of a SQLite engine for concurrent use. WAL lets
+    readers run alongside the single writer, and busy_timeout makes a blocked
+    writer wait instead of failing with "database is locked".
+
+    Writers are serialized with BEGIN IMMEDIATE: a transaction on a connection
+    with the IMMEDIATE execution option takes the write lock when it starts.
+    A deferred transaction that reads first and writes later can hit a
+    conflict that waiting cannot resolve, and SQLite then fails it at once.
+    Read-only transactions keep a plain BEGIN and never wait for writers.
+    """
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        # The driver would otherwise issue its own deferred BEGIN; SQLAlchemy emits it below instead
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas():
+            cursor.execute(f"PRAGMA {pragma}")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def on_begin(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE" if conn.get_execution_options().get(IMMEDIATE) else "BEGIN")
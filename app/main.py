@@ -5,17 +5,31 @@ from datetime import datetime
 from threading import Thread
 
 import yaml
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.openapi.utils import get_openapi
 from fastapi.responses import PlainTextResponse
 
-from app.db.session import SessionLocal, engine, Base
+from app.config import settings
+from app.db.session import SessionLocal, WriteSessionLocal, engine, Base
+from app.middleware.admission import AdmissionControlMiddleware, admission_limiters
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.idempotency import IdempotencyMiddleware
+from app.middleware.negotiation import ContentNegotiationMiddleware, NegotiatedResponse
 from app.models.outbox_event import OutboxEvent
 from app.routes import auth, health
+from app.services.autocomplete import autocomplete_index
 from app.services.event_publisher import publish_event
+from app.services.event_stream import event_broadcaster
+from app.services.graph_index import graph_index
+from app.services.idempotency import idempotency_store
+from app.services.write_coalescer import write_coalescer
 
 
 from app.api.v1.endpoints import (
+    batch,
+    changes,
+    events,
     parties,
     persons,
     organisations,
@@ -29,6 +43,15 @@ logging.basicConfig(level=logging.INFO)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Sync endpoints run on anyio worker threads, each holding at most one pooled connection
+    to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+    pool_capacity = (settings.DB_POOL_SIZE or settings.THREADPOOL_SIZE) + settings.DB_MAX_OVERFLOW
+    if pool_capacity < settings.THREADPOOL_SIZE:
+        logging.warning(
+            f"Connection pool capacity ({pool_capacity}) is below THREADPOOL_SIZE ({settings.THREADPOOL_SIZE}); "
+            "requests will queue for connections"
+        )
+
     # Start external identifier consumer thread
     def run_consumer():
         import asyncio
@@ -37,13 +60,23 @@ async def lifespan(app: FastAPI):
     Thread(target=run_consumer, daemon=True).start()
     logging.info("Started external identifier consumer thread")
 
+    def load_indexes():
+        db = SessionLocal()
+        try:
+            autocomplete_index.load(db)
+            if settings.GRAPH_INDEX_ENABLED:
+                graph_index.load(db)
+        finally:
+            db.close()
+    await asyncio.to_thread(load_indexes)
+
     stop_event = asyncio.Event()
 
     async def process_outbox():
         while not stop_event.is_set():
             await asyncio.sleep(5)
             logging.info("Checking outbox for new events...")
-            db = SessionLocal()
+            db = WriteSessionLocal()
             try:
                 unprocessed_events = (
                     db.query(OutboxEvent)
@@ -59,6 +92,12 @@ async def lifespan(app: FastAPI):
 
             except Exception as e:
                 logging.error(f"Error processing outbox: {e}")
+            try:
+                autocomplete_index.refresh_from_outbox(db)
+                if settings.GRAPH_INDEX_ENABLED:
+                    graph_index.refresh_from_outbox(db)
+            except Exception as e:
+                logging.error(f"Error refreshing in-memory indexes: {e}")
             finally:
                 db.close()
 
@@ -66,18 +105,53 @@ async def lifespan(app: FastAPI):
     yield
     stop_event.set()
     await task
+    await event_broadcaster.stop()
+    await asyncio.to_thread(write_coalescer.stop)
 
 app = FastAPI(
     title="Rolodex Data Product API",
     lifespan=lifespan,
     description="API for Rolodex Data Product prototype",
-    version="0.3.0"
+    version="0.3.0",
+    default_response_class=NegotiatedResponse
 )
 
+# Innermost, so replayed responses keep the negotiated encoding and are still compressed
+app.add_middleware(
+    IdempotencyMiddleware,
+    store=idempotency_store,
+    paths=settings.IDEMPOTENCY_PATHS,
+    wait_seconds=settings.IDEMPOTENCY_WAIT_SECONDS,
+)
+app.add_middleware(ContentNegotiationMiddleware)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+if settings.ADMISSION_CONTROL_ENABLED:
+    # Outermost, so a shed request costs no body parsing, compression or database work
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        limiters=admission_limiters,
+        exempt_paths=settings.ADMISSION_EXEMPT_PATHS,
+        retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+    )
+
 # Add auth route
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(health.router)
 # Include API endpoints
+if settings.DB_ASYNC_ENABLED:
+    # Registered first so these handlers take precedence over their sync equivalents
+    from app.api.v1.async_endpoints import organisations as async_organisations
+    from app.api.v1.async_endpoints import parties as async_parties
+    from app.api.v1.async_endpoints import persons as async_persons
+
+    app.include_router(async_parties.router, prefix="/parties", tags=["Parties"])
+    app.include_router(async_persons.router, prefix="/persons", tags=["Persons"])
+    app.include_router(async_organisations.router, prefix="/organisations", tags=["Organisations"])
 app.include_router(parties.router, prefix="/parties", tags=["Parties"])
 app.include_router(persons.router, prefix="/persons", tags=["Persons"])
 app.include_router(organisations.router, prefix="/organisations", tags=["Organisations"])
@@ -85,6 +159,9 @@ app.include_router(addresses.router, prefix="/addresses", tags=["Addresses"])
 app.include_router(party_addresses.router, prefix="/party-addresses", tags=["Party Addresses"])
 app.include_router(party_relationships.router, prefix="/party-relationships", tags=["Party Relationships"])
 app.include_router(external_identifiers.router, prefix="/external-identifiers", tags=["External Identifiers"])
+app.include_router(changes.router, prefix="/changes", tags=["Changes"])
+app.include_router(events.router, prefix="/events", tags=["Events"])
+app.include_router(batch.router, prefix="/batch", tags=["Batch"])
 
 @app.get("/openapi.yaml", include_in_schema=False)
 async def openapi_yaml():
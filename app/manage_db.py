@@ -1,6 +1,14 @@
+import json
+
 import click
 import app.models
-from app.db.session import engine, Base
+from app.db import migrations
+from app.db.session import SessionLocal, WriteSessionLocal, engine, Base
+from app.services import hierarchy
+from app.services.address_normalization import deduplicate_addresses
+from app.services.bulk_import import FORMATS, SCHEMAS, import_parties
+from app.services.dedup import find_duplicates as run_find_duplicates
+from app.services.party_search import rebuild_index
 
 @click.group()
 def cli():
@@ -9,15 +17,141 @@ def cli():
 
 @cli.command()
 def create():
-    """Create all database tables."""
+    """Create all database tables at the latest migration version."""
     Base.metadata.create_all(bind=engine)
-    click.echo("Created database tables.")
+    migrations.stamp(engine)
+    click.echo(f"Created database tables at version {migrations.HEAD}.")
 
 @cli.command()
 def drop():
     """Drop all database tables."""
     Base.metadata.drop_all(bind=engine)
+    migrations.schema_migrations.drop(bind=engine, checkfirst=True)
     click.echo("Dropped database tables.")
 
+@cli.command()
+@click.option("--to", "target", default=migrations.HEAD, show_default=True, help="Version to upgrade to.")
+def upgrade(target):
+    """Apply pending schema migrations."""
+    try:
+        applied = migrations.upgrade(engine, target)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--to")
+    for migration in applied:
+        click.echo(f"Applied {migration.version}: {migration.description}")
+    click.echo(f"Database at version {migrations.current(engine)}.")
+
+@cli.command()
+@click.option("--to", "target", required=True, help="Version to downgrade to, or 'base' to revert everything.")
+def downgrade(target):
+    """Revert schema migrations newer than a version."""
+    try:
+        reverted = migrations.downgrade(engine, target)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--to")
+    for migration in reverted:
+        click.echo(f"Reverted {migration.version}: {migration.description}")
+    click.echo(f"Database at version {migrations.current(engine) or migrations.BASE}.")
+
+@cli.command()
+def current():
+    """Show the schema migration version of the database."""
+    version = migrations.current(engine)
+    click.echo(version or f"{migrations.BASE} (no migrations applied)")
+
+@cli.command("reindex-search")
+@click.option("--batch-size", default=5000, show_default=True, help="Parties indexed per transaction.")
+def reindex_search(batch_size):
+    """Rebuild the party full-text search index."""
+    db = SessionLocal()
+    try:
+        indexed = rebuild_index(db, batch_size=batch_size)
+    finally:
+        db.close()
+    click.echo(f"Indexed {indexed} parties.")
+
+@cli.command("rebuild-hierarchy")
+def rebuild_hierarchy():
+    """Rebuild the organisation hierarchy closure table from party relationships."""
+    db = SessionLocal()
+    try:
+        count = hierarchy.rebuild(db)
+    finally:
+        db.close()
+    click.echo(f"Rebuilt hierarchy from {count} relationships.")
+
+@cli.command("find-duplicates")
+@click.option("--party-type", type=click.Choice(["person", "organisation"]), multiple=True,
+              help="Party types to check (default: both).")
+@click.option("--min-score", default=0.6, show_default=True, help="Lowest score stored as a candidate.")
+@click.option("--max-block-size", default=50, show_default=True, help="Skip blocking keys shared by more parties.")
+def find_duplicates(party_type, min_score, max_block_size):
+    """Detect likely duplicate parties and store them for GET /parties/duplicates."""
+    db = SessionLocal()
+    try:
+        for each_type in party_type or ("person", "organisation"):
+            stats = run_find_duplicates(db, each_type, min_score=min_score, max_block_size=max_block_size)
+            click.echo(
+                f"{each_type}: {stats['duplicates']} candidates from {stats['pairs_compared']} pairs "
+                f"in {stats['blocks']} blocks ({stats['oversized_blocks']} oversized blocks skipped)."
+            )
+    finally:
+        db.close()
+
+@cli.command("dedupe-addresses")
+@click.option("--batch-size", default=5000, show_default=True, help="Addresses canonicalized per flush.")
+def dedupe_addresses(batch_size):
+    """Canonicalize stored addresses and fold duplicates into one row each."""
+    db = SessionLocal()
+    try:
+        hashed, removed = deduplicate_addresses(db, batch_size=batch_size)
+    finally:
+        db.close()
+    click.echo(f"Canonicalized {hashed} addresses, removed {removed} duplicates.")
+
+@cli.command("import")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "input_format", type=click.Choice(FORMATS),
+              help="Input format (default: from the file extension).")
+@click.option("--party-type", type=click.Choice(list(SCHEMAS)), help="Party type of rows without a party_type field.")
+@click.option("--chunk-size", default=10000, show_default=True, help="Rows validated and committed together.")
+@click.option("--workers", default=1, show_default=True, help="Processes validating chunks ahead of the writer.")
+@click.option("--outbox/--no-outbox", default=False, show_default=True,
+              help="Write a PersonCreated/OrganisationCreated outbox event per imported party.")
+@click.option("--checkpoint", help="Name under which progress is saved; rerunning with it resumes the import.")
+@click.option("--rejects", type=click.Path(dir_okay=False, writable=True), help="Write rejected rows here as NDJSON.")
+def import_command(path, input_format, party_type, chunk_size, workers, outbox, checkpoint, rejects):
+    """Bulk load persons and organisations (with their addresses) from a CSV or NDJSON file."""
+    input_format = input_format or ("ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv")
+    rejects_file = open(rejects, "a", encoding="utf-8") if rejects else None
+
+    shown = 0
+
+    def on_reject(reject):
+        nonlocal shown
+        if rejects_file:
+            rejects_file.write(json.dumps(reject) + "\n")
+        elif shown < 10:
+            shown += 1
+            click.echo(f"Rejected line {reject['line']}: {'; '.join(reject['errors'])}", err=True)
+
+    db = WriteSessionLocal()
+    try:
+        with open(path, newline="", encoding="utf-8") as stream:
+            stats = import_parties(
+                db, stream, input_format, default_party_type=party_type, chunk_size=chunk_size,
+                workers=workers, outbox=outbox, checkpoint=checkpoint, source=path, on_reject=on_reject,
+            )
+    finally:
+        db.close()
+        if rejects_file:
+            rejects_file.close()
+    if stats["resumed_at"]:
+        click.echo(f"Resumed after {stats['resumed_at']} rows.")
+    click.echo(
+        f"Imported {stats['imported']} parties from {stats['rows']} rows ({stats['rejected']} rejected) "
+        f"in {stats['seconds']:.1f}s, {stats['rows_per_second']:.0f} rows/s."
+    )
+
 if __name__ == '__main__':
     cli()
\ No newline at end of file
@@ -0,0 +1,186 @@
+# app/middleware/admission.py
+import asyncio
+import time
+from collections import deque
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+from app.db.pool_metrics import checkout_waits
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit for one class of requests, adjusted by AIMD.
+
+    Completed requests report their latency and connection checkout wait. At
+    the end of each window the limit is cut by backoff when the mean checkout
+    wait passed pool_wait_target or the median latency went above
+    latency_tolerance times the baseline (the lowest median seen, allowed to
+    drift up 5% a window). Otherwise it grows by one if requests had to queue.
+
+    Over the limit, a request waits up to queue_timeout for a slot; a queue as
+    long as the limit, or a wait that times out, sheds it. Runs on the event
+    loop only, so it needs no locks.
+    """
+
+    def __init__(self, name: str, max_limit: int, min_limit: int = 2, queue_timeout: float = 0.25,
+                 pool_wait_target: float = 0.01, latency_tolerance: float = 2.0, backoff: float = 0.9,
+                 window: float = 0.5, min_samples: int = 10):
+        self.name = name
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.limit = float(max_limit)
+        self.queue_timeout = queue_timeout
+        self.pool_wait_target = pool_wait_target
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+        self.window = window
+        self.min_samples = min_samples
+        self.in_flight = 0
+        self.waiters: deque[asyncio.Future] = deque()
+        self.queued_in_window = False
+        self.samples: list[tuple[float, float]] = []
+        self.window_started = time.monotonic()
+        self.baseline: float | None = None
+        self.stats = {"admitted": 0, "queued": 0, "shed": 0}
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting briefly if the class is at its limit; False means shed the request."""
+        if self.in_flight < int(self.limit) and not self.waiters:
+            self.in_flight += 1
+            self.stats["admitted"] += 1
+            return True
+        self.queued_in_window = True
+        if len(self.waiters) >= int(self.limit):
+            self.stats["shed"] += 1
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.append(future)
+        self.stats["queued"] += 1
+        try:
+            await asyncio.wait([future], timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            # The client went away while queued; give back a slot handed over meanwhile
+            if future.done():
+                self._free_slot()
+            else:
+                future.cancel()
+                self.waiters.remove(future)
+            raise
+        if future.done():
+            # A finishing request handed its slot over
+            self.stats["admitted"] += 1
+            return True
+        future.cancel()
+        self.waiters.remove(future)
+        self.stats["shed"] += 1
+        return False
+
+    def release(self, latency: float, pool_wait: float):
+        self._free_slot()
+        self.samples.append((latency, pool_wait))
+        now = time.monotonic()
+        if now - self.window_started >= self.window and len(self.samples) >= self.min_samples:
+            self._adjust()
+            self.samples, self.queued_in_window, self.window_started = [], False, now
+
+    def _free_slot(self):
+        # Hand the slot straight to the oldest waiter unless the limit has dropped below the requests in flight
+        if self.in_flight <= int(self.limit):
+            while self.waiters:
+                waiter = self.waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(True)
+                    return
+        self.in_flight -= 1
+
+    def _adjust(self):
+        latencies = sorted(latency for latency, _ in self.samples)
+        median = latencies[len(latencies) // 2]
+        pool_wait = sum(wait for _, wait in self.samples) / len(self.samples)
+        self.baseline = median if self.baseline is None else min(median, self.baseline * 1.05)
+        if pool_wait > self.pool_wait_target or median > self.latency_tolerance * self.baseline:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+        elif self.queued_in_window:
+            self.limit = min(self.max_limit, self.limit + 1)
+            # Admit waiters into the room the increase made
+            while self.in_flight < int(self.limit) and self.waiters:
+                waiter = self.waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(True)
+                    self.in_flight += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "max_limit": self.max_limit,
+            "in_flight": self.in_flight,
+            "waiting": len(self.waiters),
+            "baseline_latency_ms": round(self.baseline * 1000, 3) if self.baseline is not None else None,
+            **self.stats,
+        }
+
+
+class AdmissionControlMiddleware:
+    """
+    Admit requests through the read or write limiter by method; shed the ones
+    that cannot get a slot with a 503 and Retry-After instead of letting them
+    pile up on the threadpool and the connection pool.
+    """
+
+    def __init__(self, app: ASGIApp, limiters: dict[str, AdaptiveLimiter], exempt_paths: list[str],
+                 retry_after: int = 1) -> None:
+        self.app = app
+        self.limiters = limiters
+        self.exempt_paths = tuple(exempt_paths)
+        self.retry_after = retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiters["read" if scope["method"] in READ_METHODS else "write"]
+        if not await limiter.acquire():
+            response = JSONResponse(
+                {"detail": "Server is busy, retry later"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        waits: list[float] = []
+        token = checkout_waits.set(waits)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            checkout_waits.reset(token)
+            limiter.release(time.perf_counter() - start, sum(waits))
+
+
+def build_limiters() -> dict[str, AdaptiveLimiter]:
+    options = {
+        "min_limit": settings.ADMISSION_MIN_LIMIT,
+        "queue_timeout": settings.ADMISSION_QUEUE_TIMEOUT_MS / 1000,
+        "pool_wait_target": settings.ADMISSION_POOL_WAIT_TARGET_MS / 1000,
+        "latency_tolerance": settings.ADMISSION_LATENCY_TOLERANCE,
+    }
+    # More sync requests in flight than pooled connections would only queue in the pool
+    pool_capacity = (settings.DB_POOL_SIZE or settings.THREADPOOL_SIZE) + settings.DB_MAX_OVERFLOW
+    write_limit = min(settings.ADMISSION_WRITE_LIMIT, pool_capacity)
+    if settings.WRITE_COALESCING_ENABLED:
+        write_limit = max(write_limit, settings.WRITE_COALESCING_MAX_BATCH)
+    return {
+        "read": AdaptiveLimiter("read", min(settings.ADMISSION_READ_LIMIT, pool_capacity), **options),
+        "write": AdaptiveLimiter("write", write_limit, **options),
+    }
+
+
+admission_limiters = build_limiters()
@@ -0,0 +1,153 @@
+# app/middleware/idempotency.py
+import asyncio
+import hashlib
+import time
+
+from fastapi import HTTPException
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.middleware.negotiation import NegotiatedResponse
+from app.routes.auth import credentials_from_token
+from app.services.idempotency import StoredResponse
+
+HEADER = "idempotency-key"
+MAX_KEY_LENGTH = 255
+
+
+def _sha256(*parts: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(hashlib.sha256(part).digest())
+    return digest.hexdigest()
+
+
+def key_owner(scope: Scope) -> str:
+    """Who a key belongs to: the token's user, so it survives a new token, else the client address."""
+    request = Request(scope)
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            return "user:" + str(credentials_from_token(token).subject["username"])
+        except (HTTPException, KeyError, TypeError):
+            pass
+    return "client:" + (request.client.host if request.client else "")
+
+
+async def read_body(receive: Receive) -> bytes:
+    chunks, more_body = [], True
+    while more_body:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        more_body = message.get("more_body", False)
+    return b"".join(chunks)
+
+
+class IdempotencyMiddleware:
+    """
+    Make POSTs carrying an Idempotency-Key header safe to retry.
+
+    The first request with a key runs as usual and its response is stored.
+    A retry with the same key and the same request gets the stored response
+    back, marked Idempotent-Replayed, without reaching the endpoint. A
+    duplicate that arrives while the first is still running waits for its
+    response, up to wait_seconds, then gets a 409. Reusing a key for a
+    different request is a 422. Keys are scoped to the authenticated user, or
+    to the client address for requests without a valid token. The Accept
+    header is part of the request, so a retry asking for another encoding is
+    a different request rather than a replay of the first one's body.
+
+    Server errors are not stored, so a request that failed with a 5xx can be
+    retried with the same key.
+    """
+
+    def __init__(self, app: ASGIApp, store, paths: list[str], wait_seconds: float = 10.0) -> None:
+        self.app = app
+        self.store = store
+        self.paths = set(paths)
+        self.wait_seconds = wait_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        idempotency_key = Headers(scope=scope).get(HEADER)
+        if idempotency_key is None:
+            await self.app(scope, receive, send)
+            return
+        if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+            response = NegotiatedResponse(
+                {"detail": f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"}, status_code=400
+            )
+            await response(scope, receive, send)
+            return
+
+        body = await read_body(receive)
+        key = _sha256(key_owner(scope).encode(), idempotency_key.encode())
+        # Responses are stored after content negotiation, so the encoding asked for is part of the request
+        accept = Headers(scope=scope).get("accept", "").encode("latin-1")
+        fingerprint = _sha256(scope["method"].encode(), scope["path"].encode(), scope["query_string"], accept, body)
+
+        stored = await self.store.reserve(key, fingerprint)
+        deadline = time.monotonic() + self.wait_seconds
+        while stored is not None and stored.status_code is None and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            # Reserving again also takes over a key whose lock expired with its request
+            stored = await self.store.reserve(key, fingerprint)
+
+        if stored is not None:
+            if stored.fingerprint != fingerprint:
+                response = NegotiatedResponse(
+                    {"detail": "Idempotency-Key was already used for a different request"}, status_code=422
+                )
+            elif stored.status_code is None:
+                response = NegotiatedResponse(
+                    {"detail": "A request with this Idempotency-Key is still in progress"}, status_code=409
+                )
+            else:
+                await self.replay(stored, send)
+                return
+            await response(scope, receive, send)
+            return
+
+        await self.run(scope, receive, send, key, fingerprint, body)
+
+    async def run(self, scope: Scope, receive: Receive, send: Send, key: str, fingerprint: str, body: bytes):
+        sent_body = False
+
+        async def receive_body() -> Message:
+            nonlocal sent_body
+            if not sent_body:
+                sent_body = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        response = StoredResponse(fingerprint=fingerprint, headers=[])
+        chunks = []
+
+        async def capture(message: Message):
+            if message["type"] == "http.response.start":
+                response.status_code = message["status"]
+                response.headers = [[name.decode("latin-1"), value.decode("latin-1")]
+                                    for name, value in message.get("headers", [])]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_body, capture)
+        except BaseException:
+            await self.store.release(key)
+            raise
+        if response.status_code is None or response.status_code >= 500:
+            await self.store.release(key)
+            return
+        response.body = b"".join(chunks)
+        await self.store.complete(key, response)
+
+    async def replay(self, stored: StoredResponse, send: Send):
+        headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in stored.headers]
+        headers.append((b"idempotent-replayed", b"true"))
+        await send({"type": "http.response.start", "status": stored.status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": stored.body})
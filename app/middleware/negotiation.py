@@ -0,0 +1,86 @@
+# app/middleware/negotiation.py
+import contextvars
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from starlette.background import BackgroundTask
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.middleware.compression import parse_qualities
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+CBOR_MEDIA_TYPE = "application/cbor"
+
+negotiated_media_type: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "negotiated_media_type", default=JSON_MEDIA_TYPE
+)
+
+
+def _encoders() -> dict[str, Any]:
+    encoders = {JSON_MEDIA_TYPE: None}
+    if msgpack is not None:
+        encoders[MSGPACK_MEDIA_TYPE] = lambda content: msgpack.packb(content, use_bin_type=True)
+        encoders["application/x-msgpack"] = encoders[MSGPACK_MEDIA_TYPE]
+    if cbor2 is not None:
+        encoders[CBOR_MEDIA_TYPE] = cbor2.dumps
+    return encoders
+
+
+ENCODERS = _encoders()
+
+
+def choose_media_type(accept: str) -> str:
+    qualities = parse_qualities(accept)
+    best, best_q = JSON_MEDIA_TYPE, qualities.get(JSON_MEDIA_TYPE, 0.0)
+    for media_type in ENCODERS:
+        q = qualities.get(media_type, 0.0)
+        if q > best_q:
+            best, best_q = media_type, q
+    return best
+
+
+class NegotiatedResponse(JSONResponse):
+    """JSON response that switches to a binary encoding when the client asked for one."""
+
+    # Spelled out rather than *args: FastAPI reads the status_code default from this signature for OpenAPI
+    def __init__(self, content: Any, status_code: int = 200, headers: dict[str, str] | None = None,
+                 media_type: str | None = None, background: BackgroundTask | None = None) -> None:
+        self.media_type = negotiated_media_type.get()
+        super().__init__(content, status_code, headers, media_type, background)
+        self.headers.add_vary_header("Accept")
+
+    def render(self, content: Any) -> bytes:
+        encoder = ENCODERS.get(self.media_type)
+        if encoder is None:
+            return super().render(content)
+        return encoder(content)
+
+
+class ContentNegotiationMiddleware:
+    """Record the preferred response media type from the Accept header for NegotiatedResponse."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = negotiated_media_type.set(choose_media_type(Headers(scope=scope).get("Accept", "")))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            negotiated_media_type.reset(token)
@@ -1,8 +1,13 @@
 from .address import Address
+from .duplicate_candidate import DuplicateCandidate
 from .external_identifier import ExternalIdentifier
+from .idempotency_key import IdempotencyKey
+from .import_checkpoint import ImportCheckpoint
 from .organisation import Organisation
 from .outbox_event import OutboxEvent
 from .party import Party
 from .party_address import PartyAddress
+from .party_hierarchy import PartyHierarchy
 from .party_relationship import PartyRelationship
+from .party_search import SEARCH_TABLE
 from .person import Person
\ No newline at end of file
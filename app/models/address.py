@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Index, Integer, String
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 
@@ -13,6 +13,12 @@ class Address(Base):
     postal_code = Column(String(20), nullable=False)
     country = Column(String(50), nullable=False)
     address_type = Column(String(20), nullable=False)
+    # SHA-256 of the canonical form, see services.address_normalization
+    address_hash = Column(String(64), nullable=True, unique=True, index=True)
+
+    __table_args__ = (
+        Index("ix_addresses_postal_code_city", "postal_code", "city"),
+    )
 
     parties = relationship(
         "Party",
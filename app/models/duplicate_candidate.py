@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+class DuplicateCandidate(Base):
+    __tablename__ = "duplicate_candidates"
+
+    candidate_id = Column(Integer, primary_key=True, index=True)
+    party_type = Column(String(50), nullable=False)
+    # The lower party ID is always stored first so each pair appears once
+    party_id = Column(Integer, ForeignKey("parties.party_id", ondelete="CASCADE"), nullable=False, index=True)
+    duplicate_party_id = Column(Integer, ForeignKey("parties.party_id", ondelete="CASCADE"), nullable=False, index=True)
+    score = Column(Float, nullable=False)
+    matched_on = Column(String(100), nullable=False)
+    detected_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("party_id", "duplicate_party_id", name="uq_duplicate_pair"),
+        Index("ix_duplicate_candidates_party_type_score", "party_type", "score"),
+    )
@@ -14,13 +14,14 @@ class ExternalIdentifier(Base):
         nullable=False,
     )
 
-    system_name = Column(String(100), nullable=False, index=True)
+    system_name = Column(String(100), nullable=False)
     external_id = Column(String(255), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     __table_args__ = (
         UniqueConstraint('party_id', 'system_name', name='uq_party_system'),
+        UniqueConstraint('system_name', 'external_id', name='uq_system_external_id'),
     )
 
     party = relationship("Party", back_populates="external_identifiers")
\ No newline at end of file
@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, LargeBinary, String
+from app.db.session import Base
+
+class IdempotencyKey(Base):
+    """A client's Idempotency-Key: locked while its request runs, then holding the response to replay."""
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(64), primary_key=True)  # sha256 of the client and its key
+    fingerprint = Column(String(64), nullable=False)  # sha256 of the request the key was first used with
+    status_code = Column(Integer, nullable=True)  # None while the first request is still running
+    headers = Column(JSON, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    # The lock's expiry while running, the stored response's once complete
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
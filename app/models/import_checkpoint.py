@@ -0,0 +1,16 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, String
+from app.db.session import Base
+
+class ImportCheckpoint(Base):
+    """Progress of a named bulk import, committed with each chunk so a rerun resumes after it."""
+    __tablename__ = "import_checkpoints"
+
+    name = Column(String(200), primary_key=True)
+    source = Column(String(500), nullable=False)
+    position = Column(Integer, nullable=False, default=0)  # input rows consumed
+    imported = Column(Integer, nullable=False, default=0)
+    rejected = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
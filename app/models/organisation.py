@@ -7,7 +7,7 @@ class Organisation(Base):
 
     party_id = Column(Integer, ForeignKey("parties.party_id"), primary_key=True)
     organisation_name = Column(String(100), nullable=False)
-    organisation_type = Column(String(50), nullable=False)
+    organisation_type = Column(String(50), nullable=False, index=True)
     registration_number = Column(String(50), nullable=True)
     email = Column(String(100), nullable=False)
     phone_primary = Column(String(20), nullable=False)
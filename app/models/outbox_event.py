@@ -1,5 +1,5 @@
 # app/models/outbox_event.py
-from sqlalchemy import Column, Integer, String, DateTime, JSON, func
+from sqlalchemy import Column, Integer, String, DateTime, Index, JSON, func
 from app.db.session import Base
 
 class OutboxEvent(Base):
@@ -9,4 +9,9 @@ class OutboxEvent(Base):
     event_type = Column(String(50), nullable=False)
     payload = Column(JSON, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    processed_at = Column(DateTime(timezone=True), nullable=True)
\ No newline at end of file
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # The relay polls for unprocessed events in creation order
+        Index("ix_outbox_events_processed_at_created_at", "processed_at", "created_at"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.session import Base
@@ -12,6 +12,10 @@ class Party(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_parties_party_type_updated_at", "party_type", "updated_at"),
+    )
+
     person = relationship("Person", uselist=False, back_populates="party")
     organisation = relationship("Organisation", uselist=False, back_populates="party")
     addresses = relationship(
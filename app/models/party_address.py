@@ -1,8 +1,13 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, Index
 from app.db.session import Base
 
 class PartyAddress(Base):
     __tablename__ = "party_addresses"
 
     party_id = Column(Integer, ForeignKey("parties.party_id"), primary_key=True)
-    address_id = Column(Integer, ForeignKey("addresses.address_id"), primary_key=True)
\ No newline at end of file
+    address_id = Column(Integer, ForeignKey("addresses.address_id"), primary_key=True)
+
+    __table_args__ = (
+        # The primary key leads with party_id; this serves address-to-party lookups
+        Index("ix_party_addresses_address_id", "address_id"),
+    )
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
+from app.db.session import Base
+
+class PartyHierarchy(Base):
+    """
+    Closure table over hierarchical PartyRelationship types.
+
+    One row per (ancestor, descendant, depth) reachable through relationships of
+    relationship_type, with path_count recording how many distinct paths of that
+    length exist so deleting one edge of a diamond keeps the other path.
+    """
+    __tablename__ = "party_hierarchy"
+
+    relationship_type = Column(String(50), primary_key=True)
+    ancestor_id = Column(Integer, ForeignKey("parties.party_id", ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey("parties.party_id", ondelete="CASCADE"), primary_key=True)
+    depth = Column(Integer, primary_key=True)
+    path_count = Column(Integer, nullable=False, default=1)
+
+    __table_args__ = (
+        Index("ix_party_hierarchy_descendant", "relationship_type", "descendant_id", "depth"),
+    )
@@ -1,9 +1,16 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 
 class PartyRelationship(Base):
     __tablename__ = "party_relationships"
+    __table_args__ = (
+        # Party lookups lead with the party ID and then range-scan the dates
+        # for as-of queries; the bare date index serves the unscoped list
+        Index("ix_party_relationships_from_party_dates", "from_party_id", "start_date", "end_date"),
+        Index("ix_party_relationships_to_party_dates", "to_party_id", "start_date", "end_date"),
+        Index("ix_party_relationships_dates", "start_date", "end_date"),
+    )
 
     relationship_id = Column(Integer, primary_key=True, index=True)
     from_party_id = Column(Integer, ForeignKey("parties.party_id"), nullable=False)
@@ -14,4 +21,4 @@ class PartyRelationship(Base):
     notes = Column(String(250), nullable=True)
 
     from_party = relationship("Party", foreign_keys=[from_party_id], back_populates="relationships_from")
-    to_party = relationship("Party", foreign_keys=[to_party_id], back_populates="relationships_to")
\ No newline at end of file
+    to_party = relationship("Party", foreign_keys=[to_party_id], back_populates="relationships_to")
@@ -0,0 +1,52 @@
+# app/models/party_search.py
+#
+# The search index is dialect specific, so it is created with DDL hooks on the
+# shared metadata rather than as a mapped table:
+#   - SQLite: an FTS5 virtual table keyed by rowid = party_id
+#   - Postgres: a plain table with a generated, weighted tsvector (GIN indexed)
+#     and a pg_trgm index on display_name for fuzzy matches
+from sqlalchemy import DDL, event
+
+from app.db.session import Base
+
+SEARCH_TABLE = "party_search"
+SEARCH_COLUMNS = ("display_name", "person_names", "emails", "organisation", "addresses")
+
+sqlite_ddl = [
+    DDL(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS party_search USING fts5("
+        "display_name, person_names, emails, organisation, addresses, "
+        "tokenize = 'unicode61 remove_diacritics 2')"
+    ).execute_if(dialect="sqlite"),
+]
+
+postgresql_ddl = [
+    DDL(
+        "CREATE TABLE IF NOT EXISTS party_search ("
+        "party_id INTEGER PRIMARY KEY REFERENCES parties(party_id) ON DELETE CASCADE, "
+        "display_name TEXT, person_names TEXT, emails TEXT, organisation TEXT, addresses TEXT, "
+        "document tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple', coalesce(display_name, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(person_names, '') || ' ' || coalesce(organisation, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(emails, '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(addresses, '')), 'C')"
+        ") STORED)"
+    ).execute_if(dialect="postgresql"),
+    DDL(
+        "CREATE INDEX IF NOT EXISTS ix_party_search_document ON party_search USING GIN (document)"
+    ).execute_if(dialect="postgresql"),
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+    DDL(
+        "CREATE INDEX IF NOT EXISTS ix_party_search_display_name_trgm "
+        "ON party_search USING GIN (display_name gin_trgm_ops)"
+    ).execute_if(dialect="postgresql"),
+]
+
+for ddl in sqlite_ddl + postgresql_ddl:
+    event.listen(Base.metadata, "after_create", ddl)
+
+event.listen(
+    Base.metadata,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS party_search").execute_if(dialect=("sqlite", "postgresql")),
+)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 
@@ -13,4 +13,8 @@ class Person(Base):
     phone_primary = Column(String(20), nullable=False)
     phone_secondary = Column(String(20), nullable=True)
 
+    __table_args__ = (
+        Index("ix_persons_last_name_first_name", "last_name", "first_name"),
+    )
+
     party = relationship("Party", back_populates="person")
\ No newline at end of file
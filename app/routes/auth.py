@@ -2,6 +2,7 @@ from datetime import timedelta
 
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi_jwt import JwtAccessBearer, JwtAuthorizationCredentials
+from fastapi_jwt.jwt_backends.abstract_backend import BackendException
 from pydantic import BaseModel
 
 from app.auth.auth import authenticate_user
@@ -25,6 +26,18 @@ def require_roles(credentials: JwtAuthorizationCredentials, required_roles: list
     if not set(required_roles).intersection(user_roles):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
+def credentials_from_token(token: str | None) -> JwtAuthorizationCredentials:
+    """Decode a bearer token outside of a request, e.g. one passed to a WebSocket as ?token=."""
+    if not token:
+        raise HTTPException(status_code=401, detail="Credentials are not provided")
+    try:
+        payload = auth_scheme.jwt_backend.decode(token, auth_scheme.secret_key)
+    except BackendException as e:
+        raise HTTPException(status_code=401, detail=str(e))
+    if not payload:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return JwtAuthorizationCredentials(payload["subject"], payload.get("jti"))
+
 @router.post("/login")
 def login(login_req: LoginRequest):
     auth_user = authenticate_user(login_req.username, login_req.password)
@@ -1,8 +1,38 @@
 # app/routes/health.py
+from anyio import to_thread
 from fastapi import APIRouter
 
+from app.db.pool_metrics import pool_stats
+from app.db.session import async_engine, async_replica_engines, engine, replica_engines
+from app.middleware.admission import admission_limiters
+
 router = APIRouter()
 
 @router.get("/health", tags=["health"])
 def health_check():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+@router.get("/health/db-pool", tags=["health"])
+async def db_pool_stats():
+    """Connection pool saturation next to the worker threads competing for it."""
+    limiter = to_thread.current_default_thread_limiter()
+    stats = {
+        "threadpool": {
+            "size": limiter.total_tokens,
+            "in_use": limiter.borrowed_tokens,
+            "waiting": limiter.statistics().tasks_waiting,
+        },
+        "pool": pool_stats(engine.pool),
+    }
+    if replica_engines:
+        stats["replica_pools"] = [pool_stats(replica.pool) for replica in replica_engines]
+    if async_engine is not None:
+        stats["async_pool"] = pool_stats(async_engine.pool)
+    if async_replica_engines:
+        stats["async_replica_pools"] = [pool_stats(replica.pool) for replica in async_replica_engines]
+    return stats
+
+@router.get("/health/admission", tags=["health"])
+async def admission_stats():
+    """Current adaptive limits, requests in flight and waiting, and how many were shed, per request class."""
+    return {name: limiter.snapshot() for name, limiter in admission_limiters.items()}
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, Optional
+
+class ChangeRead(BaseModel):
+    event_id: int
+    event_type: str
+    payload: dict[str, Any]
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+class DuplicateCandidateRead(BaseModel):
+    candidate_id: int
+    party_type: str
+    party_id: int
+    duplicate_party_id: int
+    score: float
+    matched_on: str
+    detected_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
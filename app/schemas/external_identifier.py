@@ -1,6 +1,6 @@
 from datetime import datetime
 from pydantic import ConfigDict
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 class ExternalIdentifierBase(BaseModel):
     party_id: int
@@ -18,3 +18,13 @@ class ExternalIdentifierRead(ExternalIdentifierBase):
     external_id: str
     last_synced: datetime | None = None
     created_at: datetime
+
+class ExternalIdentifierKey(BaseModel):
+    system_name: str
+    external_id: str
+
+class ExternalIdentifierResolveRequest(BaseModel):
+    identifiers: list[ExternalIdentifierKey] = Field(..., max_length=10000)
+
+class ExternalIdentifierResolution(ExternalIdentifierKey):
+    party_id: int | None = None
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Literal
 
@@ -15,4 +15,12 @@ class PartyRead(PartyBase):
     updated_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class PartyCompletion(BaseModel):
+    party_id: int
+    party_type: str
+    display_name: str
+
+class PartyMergeRequest(BaseModel):
+    loser_ids: list[int] = Field(min_length=1, max_length=1000)
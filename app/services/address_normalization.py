@@ -0,0 +1,137 @@
+import hashlib
+import re
+
+from sqlalchemy import and_, delete, exists, or_, update
+from sqlalchemy.orm import Session, aliased
+
+from app.models.address import Address
+from app.models.party_address import PartyAddress
+from app.services.party_search import reindex_parties
+
+# Fields that identify an address; address_type is included so a home and a
+# business use of the same building stay separate rows
+HASHED_FIELDS = ("address_line_1", "address_line_2", "city", "region", "postal_code", "country", "address_type")
+
+COUNTRY_CODES = {
+    "gb": "GB", "gbr": "GB", "uk": "GB", "united kingdom": "GB", "great britain": "GB",
+    "england": "GB", "scotland": "GB", "wales": "GB", "northern ireland": "GB",
+    "ie": "IE", "irl": "IE", "ireland": "IE", "republic of ireland": "IE",
+    "us": "US", "usa": "US", "united states": "US", "united states of america": "US",
+    "ca": "CA", "can": "CA", "canada": "CA",
+    "au": "AU", "aus": "AU", "australia": "AU",
+    "nz": "NZ", "nzl": "NZ", "new zealand": "NZ",
+    "fr": "FR", "fra": "FR", "france": "FR",
+    "de": "DE", "deu": "DE", "germany": "DE", "deutschland": "DE",
+    "nl": "NL", "nld": "NL", "netherlands": "NL", "the netherlands": "NL", "holland": "NL",
+    "be": "BE", "bel": "BE", "belgium": "BE",
+    "es": "ES", "esp": "ES", "spain": "ES",
+    "it": "IT", "ita": "IT", "italy": "IT",
+}
+
+WHITESPACE = re.compile(r"\s+")
+GB_POSTCODE = re.compile(r"^([A-Z]{1,2}\d[A-Z\d]?)(\d[A-Z]{2})$")
+US_ZIP = re.compile(r"^(\d{5})-?(\d{4})?$")
+
+
+def collapse(value: str | None) -> str | None:
+    if value is None:
+        return None
+    value = WHITESPACE.sub(" ", value).strip(" ,")
+    return value or None
+
+
+def country_code(country: str) -> str:
+    key = collapse(country).casefold().replace(".", "")
+    if key in COUNTRY_CODES:
+        return COUNTRY_CODES[key]
+    return key.upper() if len(key) == 2 else collapse(country)
+
+
+def postal_code(code: str, country: str) -> str:
+    code = collapse(code).upper()
+    compact = code.replace(" ", "")
+    if country == "GB":
+        match = GB_POSTCODE.match(compact)
+        if match:
+            return f"{match.group(1)} {match.group(2)}"
+    elif country == "US":
+        match = US_ZIP.match(compact)
+        if match:
+            return "-".join(filter(None, match.groups()))
+    return code
+
+
+def canonicalize(address: dict) -> dict:
+    """Address fields in canonical form: collapsed whitespace, ISO country code, formatted postal code."""
+    canonical = {field: collapse(value) if isinstance(value, str) else value for field, value in address.items()}
+    canonical["country"] = country_code(address["country"])
+    canonical["postal_code"] = postal_code(address["postal_code"], canonical["country"])
+    return canonical
+
+
+def content_hash(canonical: dict) -> str:
+    # Case only differs in presentation, so it is folded out of the hash
+    parts = [(canonical.get(field) or "").casefold() for field in HASHED_FIELDS]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def deduplicate_addresses(db: Session, batch_size: int = 5000) -> tuple[int, int]:
+    """
+    Canonicalize and hash every address, then fold duplicates into the oldest
+    row of each hash. Returns (addresses hashed, duplicates removed).
+    """
+    hashed, last_id = 0, 0
+    while True:
+        addresses = (
+            db.query(Address).filter(Address.address_id > last_id)
+            .order_by(Address.address_id).limit(batch_size).all()
+        )
+        if not addresses:
+            break
+        for address in addresses:
+            canonical = canonicalize({field: getattr(address, field) for field in HASHED_FIELDS})
+            for field, value in canonical.items():
+                setattr(address, field, value)
+        # Hashes are unique, so they are only assigned below once each group's keeper is known
+        db.flush()
+        hashed += len(addresses)
+        last_id = addresses[-1].address_id
+    db.commit()
+
+    keepers = {}
+    for address_id, *fields in db.query(Address.address_id, *(getattr(Address, f) for f in HASHED_FIELDS)) \
+            .order_by(Address.address_id):
+        keepers.setdefault(content_hash(dict(zip(HASHED_FIELDS, fields))), []).append(address_id)
+
+    removed = 0
+    for address_ids in keepers.values():
+        if len(address_ids) > 1:
+            removed += _fold_into(db, address_ids[0], address_ids[1:])
+    hashes = [{"address_id": address_ids[0], "address_hash": digest} for digest, address_ids in keepers.items()]
+    for start in range(0, len(hashes), batch_size):
+        db.execute(update(Address), hashes[start:start + batch_size])
+    db.commit()
+    return hashed, removed
+
+
+def _fold_into(db: Session, keeper: int, duplicates: list[int]) -> int:
+    party_ids = [party_id for (party_id,) in
+                 db.query(PartyAddress.party_id).filter(PartyAddress.address_id.in_(duplicates)).distinct()]
+    # Drop links the keeper already has (or that another duplicate links first), move the rest
+    other = aliased(PartyAddress)
+    options = {"synchronize_session": False}
+    db.execute(delete(PartyAddress).where(
+        PartyAddress.address_id.in_(duplicates),
+        exists().where(
+            other.party_id == PartyAddress.party_id,
+            or_(
+                other.address_id == keeper,
+                and_(other.address_id.in_(duplicates), other.address_id < PartyAddress.address_id),
+            ),
+        ),
+    ), execution_options=options)
+    db.execute(update(PartyAddress).where(PartyAddress.address_id.in_(duplicates)).values(address_id=keeper),
+               execution_options=options)
+    removed = db.execute(delete(Address).where(Address.address_id.in_(duplicates)), execution_options=options).rowcount
+    reindex_parties(db, party_ids)
+    return removed
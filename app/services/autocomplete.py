@@ -0,0 +1,188 @@
+import heapq
+import logging
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left
+
+from sqlalchemy.orm import Session
+
+from app.models.party import Party
+from app.services.outbox_reader import latest_event_id, read_events_since
+
+logging.basicConfig(level=logging.INFO)
+
+PARTY_TYPES = {
+    "Person": "person",
+    "Organisation": "organisation",
+}
+
+
+def normalize(name: str) -> str:
+    """Case-fold, strip accents and collapse whitespace so 'Zoë  Ball' matches 'zoe b'."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+
+def completion_keys(display_name: str) -> list[str]:
+    # Index the full name and every word-start inside it, so 'clark' finds 'Jeremy Clarkson'
+    words = normalize(display_name).split(" ")
+    return list(dict.fromkeys(" ".join(words[i:]) for i in range(len(words)) if words[i]))
+
+
+class SortedPrefixArray:
+    """Sorted array of completion keys with a parallel array of party IDs."""
+
+    def __init__(self):
+        self.keys: list[str] = []
+        self.party_ids = array("q")
+
+    def load(self, pairs):
+        pairs = sorted(pairs)
+        self.keys = [key for key, _ in pairs]
+        self.party_ids = array("q", (party_id for _, party_id in pairs))
+
+    def add(self, key: str, party_id: int):
+        position = bisect_left(self.keys, key)
+        # Keep (key, party_id) ordering so removal can find the exact slot
+        while position < len(self.keys) and self.keys[position] == key and self.party_ids[position] < party_id:
+            position += 1
+        self.keys.insert(position, key)
+        self.party_ids.insert(position, party_id)
+
+    def remove(self, key: str, party_id: int):
+        position = bisect_left(self.keys, key)
+        while position < len(self.keys) and self.keys[position] == key:
+            if self.party_ids[position] == party_id:
+                del self.keys[position]
+                del self.party_ids[position]
+                return
+            position += 1
+
+    def scan(self, prefix: str):
+        position = bisect_left(self.keys, prefix)
+        while position < len(self.keys) and self.keys[position].startswith(prefix):
+            yield self.keys[position], self.party_ids[position]
+            position += 1
+
+    def __len__(self):
+        return len(self.keys)
+
+
+class AutocompleteIndex:
+    """In-memory prefix index over Party.display_name, one sorted array per party_type."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.arrays: dict[str, SortedPrefixArray] = {}
+        self.entries: dict[int, tuple[str, str]] = {}
+        self.cursor = 0
+        self.loaded = False
+
+    def load(self, db: Session, batch_size: int = 10000):
+        pairs: dict[str, list[tuple[str, int]]] = {}
+        entries = {}
+        # Read the cursor first so events written while loading are replayed, not lost
+        cursor = latest_event_id(db)
+        rows = (
+            db.query(Party.party_id, Party.party_type, Party.display_name)
+            .execution_options(yield_per=batch_size)
+        )
+        for party_id, party_type, display_name in rows:
+            entries[party_id] = (display_name, party_type)
+            pairs.setdefault(party_type, []).extend((key, party_id) for key in completion_keys(display_name))
+
+        arrays = {}
+        for party_type, type_pairs in pairs.items():
+            arrays[party_type] = SortedPrefixArray()
+            arrays[party_type].load(type_pairs)
+
+        with self.lock:
+            self.arrays, self.entries, self.cursor, self.loaded = arrays, entries, cursor, True
+        logging.info(f"Loaded autocomplete index with {len(entries)} parties")
+
+    def ensure_loaded(self, db: Session):
+        if not self.loaded:
+            self.load(db)
+
+    def upsert(self, party_id: int, party_type: str, display_name: str):
+        with self.lock:
+            self.remove(party_id)
+            sorted_array = self.arrays.setdefault(party_type, SortedPrefixArray())
+            for key in completion_keys(display_name):
+                sorted_array.add(key, party_id)
+            self.entries[party_id] = (display_name, party_type)
+
+    def remove(self, party_id: int):
+        with self.lock:
+            entry = self.entries.pop(party_id, None)
+            if entry is None:
+                return
+            display_name, party_type = entry
+            for key in completion_keys(display_name):
+                self.arrays[party_type].remove(key, party_id)
+
+    def apply_event(self, event_type: str, payload: dict):
+        if event_type == "PartiesMerged":
+            for party_id in payload["merged_party_ids"]:
+                self.remove(int(party_id))
+            return
+        for prefix, party_type in PARTY_TYPES.items():
+            if not event_type.startswith(prefix):
+                continue
+            action = event_type[len(prefix):]
+            party_id = int(payload["party_id"])
+            if action == "Deleted":
+                self.remove(party_id)
+            elif action in ("Created", "Updated"):
+                if party_type == "person":
+                    display_name = f"{payload['first_name']} {payload['last_name']}"
+                else:
+                    display_name = payload["organisation_name"]
+                self.upsert(party_id, party_type, display_name)
+
+    def refresh_from_outbox(self, db: Session, batch_size: int = 1000) -> int:
+        """Apply outbox events written since the last refresh, whoever published them."""
+        if not self.loaded:
+            self.load(db)
+            return 0
+        events = read_events_since(db, self.cursor, batch_size)
+        for event_id, event_type, payload in events:
+            try:
+                self.apply_event(event_type, payload)
+            except (KeyError, TypeError, ValueError) as e:
+                logging.warning(f"Skipping outbox event {event_id} for autocomplete: {e}")
+            self.cursor = event_id
+        return len(events)
+
+    def complete(self, prefix: str, limit: int = 10, party_type: str | None = None) -> list[tuple[int, str, str]]:
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        with self.lock:
+            if party_type is not None:
+                sources = [self.arrays[party_type].scan(prefix)] if party_type in self.arrays else []
+            else:
+                sources = [sorted_array.scan(prefix) for sorted_array in self.arrays.values()]
+            results, seen = [], set()
+            for _, party_id in heapq.merge(*sources):
+                if party_id in seen:
+                    continue
+                seen.add(party_id)
+                display_name, entry_type = self.entries[party_id]
+                results.append((party_id, display_name, entry_type))
+                if len(results) >= limit:
+                    break
+            return results
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "parties": len(self.entries),
+                "keys": sum(len(sorted_array) for sorted_array in self.arrays.values()),
+                "cursor": self.cursor,
+            }
+
+
+autocomplete_index = AutocompleteIndex()
@@ -0,0 +1,315 @@
+import csv
+import io
+import json
+import logging
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+from typing import Iterator, NamedTuple
+
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.models.address import Address
+from app.models.import_checkpoint import ImportCheckpoint
+from app.models.organisation import Organisation
+from app.models.outbox_event import OutboxEvent
+from app.models.party import Party
+from app.models.party_address import PartyAddress
+from app.models.person import Person
+from app.schemas.address import AddressCreate
+from app.schemas.organisation import OrganisationCreate
+from app.schemas.person import PersonCreate
+from app.services.address_normalization import canonicalize, content_hash
+from app.models.party_search import SEARCH_COLUMNS
+from app.services.party_search import write_documents
+
+logging.basicConfig(level=logging.INFO)
+
+FORMATS = ("csv", "ndjson")
+SCHEMAS = {
+    "person": PersonCreate,
+    "organisation": OrganisationCreate,
+}
+ADDRESS_FIELDS = tuple(AddressCreate.model_fields)
+
+
+class Record(NamedTuple):
+    """A validated input row: the party's fields plus its canonical addresses keyed by hash."""
+    line: int
+    party_type: str
+    fields: dict
+    addresses: dict[str, dict]
+
+
+def read_rows(stream, format: str) -> Iterator[tuple[int, dict]]:
+    """(line number, row) pairs; empty CSV cells become None."""
+    if format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, {key: value if value != "" else None for key, value in row.items()}
+    else:
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_number, row if isinstance(row, dict) else None
+
+
+def chunked(rows, size: int):
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def validate_chunk(chunk: list[tuple[int, dict]], default_party_type: str | None) -> tuple[list[Record], list[dict]]:
+    """
+    Validate rows with the API's create schemas and canonicalize their
+    addresses. Runs in worker processes, so it only takes and returns plain data.
+    """
+    records, rejects = [], []
+    for line, row in chunk:
+        if row is None:
+            rejects.append({"line": line, "errors": ["Not a JSON object"]})
+            continue
+        party_type = row.pop("party_type", None) or default_party_type
+        schema = SCHEMAS.get(party_type)
+        if schema is None:
+            rejects.append({"line": line, "errors": [f"Unknown party_type {party_type!r}"]})
+            continue
+        addresses = row.pop("addresses", None)
+        if addresses is None:
+            # A flat row (every CSV row) carries at most one address in the address columns
+            flat = {field: row.pop(field, None) for field in ADDRESS_FIELDS}
+            addresses = [flat] if any(flat.values()) else []
+        try:
+            fields = schema.model_validate(row).model_dump()
+            canonical = [canonicalize(AddressCreate.model_validate(address).model_dump()) for address in addresses]
+        except ValidationError as e:
+            rejects.append({"line": line, "errors": [
+                f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors()
+            ]})
+            continue
+        records.append(Record(line, party_type, fields, {content_hash(address): address for address in canonical}))
+    return records, rejects
+
+
+def validated_chunks(chunks, default_party_type: str | None, workers: int):
+    """validate_chunk over the chunks in input order, spread over worker processes when workers > 1."""
+    if workers <= 1:
+        for chunk in chunks:
+            yield len(chunk), validate_chunk(chunk, default_party_type)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Keep a bounded number of chunks in flight so memory does not grow with the input
+        pending = deque()
+        for chunk in chunks:
+            pending.append((len(chunk), executor.submit(validate_chunk, chunk, default_party_type)))
+            if len(pending) >= workers * 2:
+                size, future = pending.popleft()
+                yield size, future.result()
+        while pending:
+            size, future = pending.popleft()
+            yield size, future.result()
+
+
+def _dialect(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+
+def allocate_ids(db: Session, model, count: int) -> list[int]:
+    """Primary keys for count new rows, reserved inside the current write transaction."""
+    if count == 0:
+        return []
+    column = model.__mapper__.primary_key[0]
+    if _dialect(db) == "postgresql":
+        sequence = f"pg_get_serial_sequence('{model.__tablename__}', '{column.name}')"
+        return list(db.execute(
+            text(f"SELECT nextval({sequence}) FROM generate_series(1, :count)"), {"count": count}
+        ).scalars())
+    # Elsewhere the import's write transaction holds the database's write lock (BEGIN IMMEDIATE on SQLite)
+    start = db.execute(select(func.coalesce(func.max(column), 0))).scalar() + 1
+    return list(range(start, start + count))
+
+
+PLACEHOLDERS = {"qmark": "?", "format": "%s", "pyformat": "%s"}
+
+
+def bulk_insert(db: Session, model, rows: list[dict]):
+    """Insert rows with COPY on Postgres (psycopg2) and the driver's executemany elsewhere."""
+    if not rows:
+        return
+    table = model.__table__
+    connection = db.connection()
+    dialect = connection.dialect
+    if dialect.name == "postgresql" and dialect.driver == "psycopg2":
+        columns = list(rows[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            # \N is COPY's NULL marker, so NULL stays distinct from an empty string
+            writer.writerow(["\\N" if row[column] is None else row[column] for column in columns])
+        buffer.seek(0)
+        cursor = connection.connection.dbapi_connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer
+            )
+        finally:
+            cursor.close()
+    elif dialect.paramstyle in PLACEHOLDERS:
+        # Straight to cursor.executemany with the columns' own bind processing,
+        # skipping the per-row parameter handling of a Core insert
+        columns = list(rows[0])
+        processors = [table.c[column].type.bind_processor(dialect) for column in columns]
+        params = [
+            tuple(process(row[column]) if process else row[column] for column, process in zip(columns, processors))
+            for row in rows
+        ]
+        placeholders = ", ".join([PLACEHOLDERS[dialect.paramstyle]] * len(columns))
+        connection.exec_driver_sql(f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({placeholders})", params)
+    else:
+        db.execute(insert(table), rows)
+
+
+def _lookup(db: Session, key, value, keys) -> dict:
+    """{key: value} for the stored rows whose key is in keys, queried in slices to stay under bind limits."""
+    keys = list(keys)
+    found = {}
+    for start in range(0, len(keys), 5000):
+        found.update(db.execute(select(key, value).where(key.in_(keys[start:start + 5000]))).all())
+    return found
+
+
+def write_chunk(db: Session, records: list[Record], outbox: bool) -> tuple[int, list[dict]]:
+    """
+    Insert one chunk of validated records in the current transaction. Rows whose
+    person email already exists, in the database or earlier in the chunk, are
+    returned as rejects. Returns (parties imported, rejects).
+    """
+    rejects = []
+    emails = {record.fields["email"] for record in records if record.party_type == "person"}
+    taken = set(_lookup(db, Person.email, Person.party_id, emails))
+    accepted = []
+    for record in records:
+        if record.party_type == "person":
+            if record.fields["email"] in taken:
+                rejects.append({"line": record.line, "errors": [f"email: {record.fields['email']} already exists"]})
+                continue
+            taken.add(record.fields["email"])
+        accepted.append(record)
+
+    party_ids = allocate_ids(db, Party, len(accepted))
+    now = datetime.utcnow()
+    parties, persons, organisations, events = [], [], [], []
+    for party_id, record in zip(party_ids, accepted):
+        fields = record.fields
+        if record.party_type == "person":
+            display_name = f"{fields['first_name']} {fields['last_name']}"
+            persons.append({"party_id": party_id, **fields})
+            payload = {"party_id": party_id, "first_name": fields["first_name"],
+                       "last_name": fields["last_name"], "email": fields["email"]}
+        else:
+            display_name = fields["organisation_name"]
+            organisations.append({"party_id": party_id, **fields})
+            payload = {"party_id": party_id, "organisation_name": fields["organisation_name"]}
+        parties.append({"party_id": party_id, "party_type": record.party_type, "display_name": display_name,
+                        "created_at": now, "updated_at": now})
+        if outbox:
+            events.append({"event_type": f"{record.party_type.capitalize()}Created", "payload": payload})
+
+    # Addresses are shared by content hash, with rows already stored and across the chunk
+    hashes = {digest: address for record in accepted for digest, address in record.addresses.items()}
+    address_ids = _lookup(db, Address.address_hash, Address.address_id, hashes)
+    new_hashes = [digest for digest in hashes if digest not in address_ids]
+    addresses = []
+    for address_id, digest in zip(allocate_ids(db, Address, len(new_hashes)), new_hashes):
+        address_ids[digest] = address_id
+        addresses.append({"address_id": address_id, "address_hash": digest,
+                          **{field: hashes[digest].get(field) for field in ADDRESS_FIELDS}})
+    links = [
+        {"party_id": party_id, "address_id": address_ids[digest]}
+        for party_id, record in zip(party_ids, accepted) for digest in record.addresses
+    ]
+
+    bulk_insert(db, Party, parties)
+    bulk_insert(db, Person, persons)
+    bulk_insert(db, Organisation, organisations)
+    bulk_insert(db, Address, addresses)
+    bulk_insert(db, PartyAddress, links)
+    if events:
+        db.execute(insert(OutboxEvent), events)
+    write_documents(db, search_documents(parties, accepted), replace=False)
+    return len(accepted), rejects
+
+
+def search_documents(parties: list[dict], records: list[Record]) -> dict[int, dict]:
+    # The same documents party_search.build_documents would read back, built from the rows in hand
+    documents = {}
+    for party, record in zip(parties, records):
+        fields = record.fields
+        document = dict.fromkeys(SEARCH_COLUMNS, "")
+        document["display_name"] = party["display_name"]
+        document["emails"] = fields["email"]
+        if record.party_type == "person":
+            document["person_names"] = f"{fields['first_name']} {fields['last_name']}"
+        else:
+            document["organisation"] = " ".join(
+                filter(None, [fields["organisation_name"], fields["registration_number"]])
+            )
+        document["addresses"] = "".join(
+            f" {address['city']} {address['postal_code']}" for address in record.addresses.values()
+        )
+        documents[party["party_id"]] = document
+    return documents
+
+
+def import_parties(db: Session, stream, format: str, default_party_type: str | None = None,
+                   chunk_size: int = 10000, workers: int = 1, outbox: bool = False,
+                   checkpoint: str | None = None, source: str = "", on_reject=None) -> dict:
+    """
+    Stream rows from an open file into the database, one transaction per chunk.
+
+    With a checkpoint name, the count of input rows consumed is stored in
+    import_checkpoints in the same transaction as each chunk, and a later run
+    with that name skips the rows already done, so an interrupted import
+    resumes where it stopped without duplicates.
+    """
+    state = db.get(ImportCheckpoint, checkpoint) if checkpoint else None
+    if checkpoint and state is None:
+        state = ImportCheckpoint(name=checkpoint, source=source, position=0, imported=0, rejected=0)
+        db.add(state)
+        db.commit()
+    skip = state.position if state else 0
+    rows = islice(read_rows(stream, format), skip, None)
+
+    stats = {"resumed_at": skip, "rows": 0, "imported": 0, "rejected": 0}
+    started = time.perf_counter()
+    for size, (records, rejects) in validated_chunks(chunked(rows, chunk_size), default_party_type, workers):
+        imported, duplicates = write_chunk(db, records, outbox)
+        rejects += duplicates
+        if state is not None:
+            state.position += size
+            state.imported += imported
+            state.rejected += len(rejects)
+            state.updated_at = datetime.utcnow()
+        db.commit()
+
+        stats["rows"] += size
+        stats["imported"] += imported
+        stats["rejected"] += len(rejects)
+        if on_reject:
+            for reject in rejects:
+                on_reject(reject)
+        elapsed = time.perf_counter() - started
+        logging.info(f"Imported {stats['imported']} of {stats['rows']} rows ({stats['rows'] / elapsed:.0f} rows/s)")
+
+    stats["seconds"] = time.perf_counter() - started
+    stats["rows_per_second"] = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
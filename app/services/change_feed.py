@@ -0,0 +1,43 @@
+from sqlalchemy.orm import Session
+
+from app.models.outbox_event import OutboxEvent
+from app.services.outbox_reader import settled
+
+# Payload keys that name the parties an event is about
+PARTY_KEYS = ("party_id", "from_party_id", "to_party_id")
+
+
+def event_party_ids(payload: dict) -> set[int]:
+    party_ids = {int(payload[key]) for key in PARTY_KEYS if payload.get(key) is not None}
+    party_ids.update(int(party_id) for party_id in payload.get("merged_party_ids", ()))
+    return party_ids
+
+
+def matches(event_type: str, payload: dict, event_types: set[str] | None = None, party_id: int | None = None) -> bool:
+    if event_types and event_type not in event_types:
+        return False
+    if party_id is not None and party_id not in event_party_ids(payload):
+        return False
+    return True
+
+
+def read_changes(db: Session, cursor: int, limit: int = 100, event_types: set[str] | None = None,
+                 party_id: int | None = None):
+    """
+    Outbox events after cursor in event_id order, as (events, next_cursor).
+
+    The event type filter runs in SQL; the party filter runs on the scanned
+    batch, so next_cursor can move past events that were filtered out and a
+    caller always makes progress proportional to the changes, not the tables.
+    Events only appear once settled, so the cursor never passes an id a
+    transaction still in flight will commit.
+    """
+    query = db.query(OutboxEvent).filter(OutboxEvent.event_id > cursor)
+    if event_types:
+        query = query.filter(OutboxEvent.event_type.in_(event_types))
+    query = settled(db, query, cursor)
+    scanned = query.order_by(OutboxEvent.event_id).limit(limit).all()
+    if not scanned:
+        return [], cursor
+    events = [event for event in scanned if matches(event.event_type, event.payload, None, party_id)]
+    return events, scanned[-1].event_id
@@ -0,0 +1,276 @@
+import logging
+import re
+from itertools import combinations
+from typing import NamedTuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.duplicate_candidate import DuplicateCandidate
+from app.models.organisation import Organisation
+from app.models.person import Person
+from app.services.autocomplete import normalize
+
+logging.basicConfig(level=logging.INFO)
+
+NON_DIGITS = re.compile(r"\D")
+NON_WORD = re.compile(r"[^\w ]")
+
+LEGAL_SUFFIXES = {
+    "ltd", "limited", "plc", "llp", "llc", "inc", "incorporated", "corp", "corporation",
+    "co", "company", "gmbh", "sa", "bv",
+}
+
+SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+# Weights of (name similarity, same email, same identifier, shared phone) per party type;
+# the identifier is the date of birth for people and the registration number for organisations
+WEIGHTS = {
+    "person": (0.55, 0.15, 0.15, 0.15),
+    "organisation": (0.55, 0.1, 0.2, 0.15),
+}
+
+
+def normalize_email(email: str | None) -> str | None:
+    if not email:
+        return None
+    local, _, domain = email.strip().lower().partition("@")
+    local = local.split("+", 1)[0]
+    if domain in ("gmail.com", "googlemail.com"):
+        local, domain = local.replace(".", ""), "gmail.com"
+    return f"{local}@{domain}" if local and domain else None
+
+
+def phone_suffix(phone: str | None, length: int = 8) -> str | None:
+    # Compare the subscriber end of the number so '+44 7700 900123' matches '07700900123'
+    digits = NON_DIGITS.sub("", phone or "")
+    return digits[-length:] if len(digits) >= length else None
+
+
+def soundex(name: str) -> str | None:
+    letters = [char for char in normalize(name) if "a" <= char <= "z"]
+    if not letters:
+        return None
+    code, previous = letters[0].upper(), SOUNDEX_CODES.get(letters[0])
+    for letter in letters[1:]:
+        digit = SOUNDEX_CODES.get(letter)
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # Vowels separate repeated codes, h and w do not
+        if letter not in "hw":
+            previous = digit
+    return code.ljust(4, "0")
+
+
+def organisation_name_key(name: str | None) -> str | None:
+    if not name:
+        return None
+    words = [word for word in NON_WORD.sub(" ", normalize(name)).split() if word not in LEGAL_SUFFIXES]
+    return " ".join(words) or None
+
+
+def registration_key(number: str | None) -> str | None:
+    key = NON_WORD.sub("", normalize(number or "")).replace(" ", "")
+    return key or None
+
+
+def trigrams(text: str) -> frozenset:
+    padded = f"  {normalize(text)} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def name_similarity(a: frozenset, b: frozenset) -> float:
+    """Sorensen-Dice coefficient over character trigrams."""
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def _email_keys(email):
+    return [normalize_email(email)]
+
+
+def _phone_keys(*phones):
+    return [phone_suffix(phone) for phone in phones]
+
+
+def _surname_dob_keys(last_name, date_of_birth):
+    return [f"{soundex(last_name)}|{date_of_birth.isoformat()}"] if date_of_birth else []
+
+
+def _organisation_name_keys(name):
+    return [organisation_name_key(name)]
+
+
+def _registration_keys(number):
+    return [registration_key(number)]
+
+
+# (block name, columns read, function from those column values to blocking keys)
+BLOCKERS = {
+    "person": [
+        ("email", (Person.email,), _email_keys),
+        ("surname_dob", (Person.last_name, Person.date_of_birth), _surname_dob_keys),
+        ("phone", (Person.phone_primary, Person.phone_secondary), _phone_keys),
+    ],
+    "organisation": [
+        ("email", (Organisation.email,), _email_keys),
+        ("name", (Organisation.organisation_name,), _organisation_name_keys),
+        ("registration", (Organisation.registration_number,), _registration_keys),
+        ("phone", (Organisation.phone_primary, Organisation.phone_secondary), _phone_keys),
+    ],
+}
+
+MODELS = {
+    "person": Person,
+    "organisation": Organisation,
+}
+
+
+class Profile(NamedTuple):
+    grams: frozenset
+    email: str | None
+    identifier: str | None
+    phones: frozenset
+
+
+def _person_profile(first_name, last_name, email, date_of_birth, phone_primary, phone_secondary) -> Profile:
+    return Profile(
+        trigrams(f"{first_name} {last_name}"),
+        normalize_email(email),
+        date_of_birth.isoformat() if date_of_birth else None,
+        frozenset(filter(None, _phone_keys(phone_primary, phone_secondary))),
+    )
+
+
+def _organisation_profile(organisation_name, email, registration_number, phone_primary, phone_secondary) -> Profile:
+    return Profile(
+        trigrams(organisation_name_key(organisation_name) or organisation_name),
+        normalize_email(email),
+        registration_key(registration_number),
+        frozenset(filter(None, _phone_keys(phone_primary, phone_secondary))),
+    )
+
+
+PROFILES = {
+    "person": (
+        (Person.first_name, Person.last_name, Person.email, Person.date_of_birth,
+         Person.phone_primary, Person.phone_secondary),
+        _person_profile,
+    ),
+    "organisation": (
+        (Organisation.organisation_name, Organisation.email, Organisation.registration_number,
+         Organisation.phone_primary, Organisation.phone_secondary),
+        _organisation_profile,
+    ),
+}
+
+
+def candidate_pairs(db: Session, party_type: str, max_block_size: int = 50, batch_size: int = 50000):
+    """
+    Pairs of party IDs sharing at least one blocking key, with the names of the
+    blocks they share. Each blocker streams only its own columns and its key map
+    is dropped before the next one runs, so memory is bounded by one key per party.
+    Blocks larger than max_block_size are skipped: a key shared by that many
+    parties (a switchboard number, info@ mailboxes) is not evidence of anything.
+    """
+    model = MODELS[party_type]
+    pairs: dict[tuple[int, int], set[str]] = {}
+    stats = {"blocks": 0, "oversized_blocks": 0}
+    for name, columns, keys_of in BLOCKERS[party_type]:
+        # Singleton blocks are the vast majority, so hold a bare ID until a second member arrives
+        blocks: dict[str, int | list[int]] = {}
+        rows = db.query(model.party_id, *columns).execution_options(yield_per=batch_size)
+        for party_id, *values in rows:
+            for key in set(keys_of(*values)):
+                if key is None:
+                    continue
+                members = blocks.get(key)
+                if members is None:
+                    blocks[key] = party_id
+                elif isinstance(members, int):
+                    blocks[key] = [members, party_id]
+                else:
+                    members.append(party_id)
+
+        for members in blocks.values():
+            if isinstance(members, int):
+                continue
+            stats["blocks"] += 1
+            if len(members) > max_block_size:
+                stats["oversized_blocks"] += 1
+                continue
+            for pair in combinations(sorted(members), 2):
+                pairs.setdefault(pair, set()).add(name)
+        del blocks
+        logging.info(f"Blocked {party_type} parties on {name}: {len(pairs)} candidate pairs so far")
+    return pairs, stats
+
+
+def load_profiles(db: Session, party_type: str, party_ids, chunk_size: int = 5000) -> dict[int, Profile]:
+    model = MODELS[party_type]
+    columns, build = PROFILES[party_type]
+    party_ids = sorted(party_ids)
+    profiles = {}
+    for start in range(0, len(party_ids), chunk_size):
+        rows = db.query(model.party_id, *columns).filter(model.party_id.in_(party_ids[start:start + chunk_size]))
+        for party_id, *values in rows:
+            profiles[party_id] = build(*values)
+    return profiles
+
+
+def score_pair(a: Profile, b: Profile, weights: tuple[float, float, float, float]) -> float:
+    name_weight, email_weight, identifier_weight, phone_weight = weights
+    score = name_weight * name_similarity(a.grams, b.grams)
+    if a.email and a.email == b.email:
+        score += email_weight
+    if a.identifier and b.identifier:
+        if a.identifier == b.identifier:
+            score += identifier_weight
+        else:
+            # Conflicting birth dates or registration numbers outweigh a similar name
+            score *= 0.5
+    if a.phones & b.phones:
+        score += phone_weight
+    return round(score, 4)
+
+
+def find_duplicates(db: Session, party_type: str, min_score: float = 0.6, max_block_size: int = 50,
+                    batch_size: int = 5000) -> dict:
+    """Block, score and store the duplicate candidates of one party type, replacing the previous run."""
+    pairs, stats = candidate_pairs(db, party_type, max_block_size)
+    profiles = load_profiles(db, party_type, {party_id for pair in pairs for party_id in pair})
+    weights = WEIGHTS[party_type]
+
+    candidates = []
+    for (party_id, duplicate_party_id), blocks in pairs.items():
+        a, b = profiles.get(party_id), profiles.get(duplicate_party_id)
+        if a is None or b is None:
+            continue
+        score = score_pair(a, b, weights)
+        if score >= min_score:
+            candidates.append({
+                "party_type": party_type,
+                "party_id": party_id,
+                "duplicate_party_id": duplicate_party_id,
+                "score": score,
+                "matched_on": ",".join(sorted(blocks)),
+            })
+
+    db.query(DuplicateCandidate).filter(DuplicateCandidate.party_type == party_type).delete(synchronize_session=False)
+    for start in range(0, len(candidates), batch_size):
+        db.execute(insert(DuplicateCandidate), candidates[start:start + batch_size])
+    db.commit()
+
+    stats.update({"pairs_compared": len(pairs), "duplicates": len(candidates)})
+    logging.info(f"Found {len(candidates)} duplicate {party_type} candidates from {len(pairs)} pairs")
+    return stats
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import logging
+import time
+
+import redis.asyncio as redis
+
+from app.config import settings
+from app.services.change_feed import matches
+
+logging.basicConfig(level=logging.INFO)
+
+STREAM_PREFIX = "outbox:"
+
+
+class Subscriber:
+    """One connected client: its filters and a bounded queue of pending events."""
+
+    def __init__(self, event_types: set[str] | None, party_id: int | None, buffer_size: int):
+        self.event_types = event_types
+        self.party_id = party_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self.overflowed = False
+
+    def offer(self, event: tuple[str, str, dict]) -> bool:
+        """Queue an event without waiting; on a full buffer drop the backlog and signal overflow."""
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            # None tells the client loop to close the connection
+            self.queue.put_nowait(None)
+            return False
+
+
+class EventBroadcaster:
+    """
+    Fans the Redis outbox streams out to in-process subscribers.
+
+    A single task reads every outbox stream with one blocking XREAD and hands
+    each event to the subscribers whose filters match. Subscribers never
+    block the reader: a client that falls buffer_size events behind is
+    disconnected and can catch up from /changes.
+    """
+
+    def __init__(self, buffer_size: int = 1000):
+        self.buffer_size = buffer_size
+        self.subscribers: set[Subscriber] = set()
+        self.task: asyncio.Task | None = None
+        self.streams: dict[str, str] = {}
+        self.streams_refreshed = 0.0
+        self.streams_since = 0.0
+
+    def subscribe(self, event_types: set[str] | None = None, party_id: int | None = None) -> Subscriber:
+        subscriber = Subscriber(event_types, party_id, self.buffer_size)
+        self.subscribers.add(subscriber)
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self.subscribers.discard(subscriber)
+
+    def broadcast(self, event_id: str, event_type: str, payload: dict):
+        for subscriber in list(self.subscribers):
+            if not matches(event_type, payload, subscriber.event_types, subscriber.party_id):
+                continue
+            if not subscriber.offer((event_id, event_type, payload)):
+                logging.warning("Dropping event stream subscriber that fell behind")
+                self.unsubscribe(subscriber)
+
+    async def _refresh_streams(self, client: redis.Redis):
+        # New event types create new streams, so look for them now and then and
+        # read a newly found stream from the previous scan onwards
+        now = time.time()
+        start = f"{int((self.streams_since or now) * 1000)}-0"
+        async for key in client.scan_iter(match=f"{STREAM_PREFIX}*", _type="stream"):
+            self.streams.setdefault(key.decode(), start)
+        self.streams_refreshed, self.streams_since = time.monotonic(), now
+
+    async def run(self):
+        client = redis.Redis(host=settings.REDIS_HOST, port=int(settings.REDIS_PORT), db=int(settings.REDIS_DB))
+        self.streams, self.streams_refreshed, self.streams_since = {}, 0.0, 0.0
+        try:
+            while True:
+                try:
+                    if time.monotonic() - self.streams_refreshed > settings.EVENT_STREAM_DISCOVERY_INTERVAL:
+                        await self._refresh_streams(client)
+                    if not self.streams:
+                        await asyncio.sleep(1)
+                        continue
+                    entries = await client.xread(self.streams, count=500, block=1000)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logging.error(f"Error reading outbox streams: {e}")
+                    await asyncio.sleep(1)
+                    continue
+                for stream, messages in entries:
+                    stream = stream.decode()
+                    event_type = stream[len(STREAM_PREFIX):]
+                    for message_id, fields in messages:
+                        self.streams[stream] = message_id.decode()
+                        try:
+                            payload = json.loads(fields[b"data"])
+                        except (KeyError, ValueError) as e:
+                            logging.warning(f"Skipping malformed event {message_id} on {stream}: {e}")
+                            continue
+                        self.broadcast(message_id.decode(), event_type, payload)
+        finally:
+            await client.aclose()
+
+    async def stop(self):
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        self.task = None
+
+
+event_broadcaster = EventBroadcaster(buffer_size=settings.EVENT_STREAM_BUFFER_SIZE)
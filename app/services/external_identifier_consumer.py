@@ -5,7 +5,7 @@ import redis
 from redis.exceptions import ResponseError
 import time
 
-from app.db.session import SessionLocal
+from app.db.session import WriteSessionLocal
 from app.models.external_identifier import ExternalIdentifier
 from app.config import settings
 
@@ -24,7 +24,7 @@ redis_client = redis.Redis(
 
 @contextmanager
 def get_db():
-    db = SessionLocal()
+    db = WriteSessionLocal()
     try:
         yield db
     finally:
@@ -0,0 +1,353 @@
+import logging
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from collections import deque
+
+from sqlalchemy.orm import Session
+
+from app.models.party_relationship import PartyRelationship
+from app.services.outbox_reader import latest_event_id, read_events_since
+
+logging.basicConfig(level=logging.INFO)
+
+# Rebuild the CSR arrays once this many edges are held in the delta structures
+COMPACT_THRESHOLD = 100000
+
+
+class CSRAdjacency:
+    """
+    Compressed sparse row adjacency over party IDs.
+
+    nodes is the sorted array of party IDs with at least one edge; the edges of
+    nodes[i] are targets[offsets[i]:offsets[i + 1]], with the relationship ID and
+    interned relationship type of each edge held in parallel arrays.
+    """
+
+    def __init__(self):
+        self.nodes = array("q")
+        self.offsets = array("q", [0])
+        self.targets = array("q")
+        self.relationship_ids = array("q")
+        self.type_codes = array("H")
+
+    @classmethod
+    def build(cls, edges):
+        """edges: iterable of (src, dst, relationship_id, type_code)."""
+        csr = cls()
+        edges = sorted(edges)
+        previous = None
+        for src, dst, relationship_id, type_code in edges:
+            if src != previous:
+                if previous is not None:
+                    csr.offsets.append(len(csr.targets))
+                csr.nodes.append(src)
+                previous = src
+            csr.targets.append(dst)
+            csr.relationship_ids.append(relationship_id)
+            csr.type_codes.append(type_code)
+        if previous is not None:
+            csr.offsets.append(len(csr.targets))
+        return csr
+
+    def edges_of(self, party_id: int):
+        position = bisect_left(self.nodes, party_id)
+        if position == len(self.nodes) or self.nodes[position] != party_id:
+            return
+        start, end = self.offsets[position], self.offsets[position + 1]
+        yield from zip(self.targets[start:end], self.relationship_ids[start:end], self.type_codes[start:end])
+
+    def __len__(self):
+        return len(self.targets)
+
+    def memory_bytes(self) -> int:
+        return sum(
+            values.itemsize * len(values)
+            for values in (self.nodes, self.offsets, self.targets, self.relationship_ids, self.type_codes)
+        )
+
+
+class GraphIndex:
+    """
+    In-process graph of PartyRelationship rows for traversal queries.
+
+    The bulk of the graph lives in two immutable CSR structures (outgoing and
+    incoming edges). Writes replayed from the outbox land in small delta maps
+    and a set of removed relationship IDs until compact() folds them back in.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.outgoing = CSRAdjacency()
+        self.incoming = CSRAdjacency()
+        self.added_outgoing: dict[int, list[tuple[int, int, int]]] = {}
+        self.added_incoming: dict[int, list[tuple[int, int, int]]] = {}
+        self.removed: set[int] = set()
+        self.type_names: list[str] = []
+        self.type_codes: dict[str, int] = {}
+        self.cursor = 0
+        self.loaded = False
+
+    def _type_code(self, relationship_type: str) -> int:
+        code = self.type_codes.get(relationship_type)
+        if code is None:
+            code = len(self.type_names)
+            self.type_names.append(relationship_type)
+            self.type_codes[relationship_type] = code
+        return code
+
+    def load(self, db: Session, batch_size: int = 50000):
+        cursor = latest_event_id(db)
+        rows = (
+            db.query(
+                PartyRelationship.from_party_id,
+                PartyRelationship.to_party_id,
+                PartyRelationship.relationship_id,
+                PartyRelationship.relationship_type,
+            )
+            .execution_options(yield_per=batch_size)
+        )
+        with self.lock:
+            self.type_names, self.type_codes = [], {}
+            edges = [(src, dst, relationship_id, self._type_code(relationship_type))
+                     for src, dst, relationship_id, relationship_type in rows]
+            self._rebuild(edges)
+            self.cursor, self.loaded = cursor, True
+        logging.info(f"Loaded graph index with {len(edges)} relationships")
+
+    def _rebuild(self, edges):
+        self.outgoing = CSRAdjacency.build(edges)
+        self.incoming = CSRAdjacency.build((dst, src, relationship_id, code) for src, dst, relationship_id, code in edges)
+        self.added_outgoing, self.added_incoming, self.removed = {}, {}, set()
+
+    def ensure_loaded(self, db: Session):
+        if not self.loaded:
+            self.load(db)
+
+    def _current_edges(self):
+        for src in set(self.outgoing.nodes).union(self.added_outgoing):
+            for dst, relationship_id, code in self.neighbours(src, "outgoing"):
+                yield src, dst, relationship_id, code
+
+    def compact(self):
+        with self.lock:
+            self._rebuild(list(self._current_edges()))
+
+    def _in_csr(self, relationship_id: int, from_party_id: int) -> bool:
+        return any(edge[1] == relationship_id for edge in self.outgoing.edges_of(from_party_id))
+
+    def add_relationship(self, relationship_id: int, from_party_id: int, to_party_id: int, relationship_type: str):
+        with self.lock:
+            # Events replayed after a load may describe edges the load already saw
+            if self._in_csr(relationship_id, from_party_id) and relationship_id not in self.removed:
+                return
+            if any(edge[1] == relationship_id for edge in self.added_outgoing.get(from_party_id, ())):
+                return
+            code = self._type_code(relationship_type)
+            self.added_outgoing.setdefault(from_party_id, []).append((to_party_id, relationship_id, code))
+            self.added_incoming.setdefault(to_party_id, []).append((from_party_id, relationship_id, code))
+            if len(self.removed) + sum(map(len, self.added_outgoing.values())) > COMPACT_THRESHOLD:
+                self.compact()
+
+    def remove_relationship(self, relationship_id: int, from_party_id: int, to_party_id: int):
+        with self.lock:
+            for added, party_id in ((self.added_outgoing, from_party_id), (self.added_incoming, to_party_id)):
+                if party_id in added:
+                    added[party_id] = [edge for edge in added[party_id] if edge[1] != relationship_id]
+            if self._in_csr(relationship_id, from_party_id):
+                self.removed.add(relationship_id)
+
+    def remove_party(self, party_id: int):
+        with self.lock:
+            for other, relationship_id, _ in list(self.neighbours(party_id, "outgoing")):
+                self.remove_relationship(relationship_id, party_id, other)
+            for other, relationship_id, _ in list(self.neighbours(party_id, "incoming")):
+                self.remove_relationship(relationship_id, other, party_id)
+
+    def merge_parties(self, survivor_id: int, loser_ids: list[int], deleted_ids: set[int]):
+        """Re-point the edges of merged parties at the survivor, mirroring parties.merge."""
+        group = {survivor_id, *loser_ids}
+        with self.lock:
+            edges = {}
+            for party_id in group:
+                for other, relationship_id, code in self.neighbours(party_id, "outgoing"):
+                    edges[relationship_id] = (party_id, other, code)
+                for other, relationship_id, code in self.neighbours(party_id, "incoming"):
+                    edges[relationship_id] = (other, party_id, code)
+            for relationship_id, (src, dst, code) in edges.items():
+                self.remove_relationship(relationship_id, src, dst)
+            for relationship_id, (src, dst, code) in edges.items():
+                if relationship_id in deleted_ids:
+                    continue
+                src = survivor_id if src in group else src
+                dst = survivor_id if dst in group else dst
+                self.add_relationship(relationship_id, src, dst, self.type_names[code])
+
+    def apply_event(self, event_type: str, payload: dict):
+        if event_type == "PartyRelationshipCreated":
+            self.add_relationship(
+                int(payload["relationship_id"]),
+                int(payload["from_party_id"]),
+                int(payload["to_party_id"]),
+                payload["relationship_type"],
+            )
+        elif event_type == "PartyRelationshipDeleted":
+            self.remove_relationship(
+                int(payload["relationship_id"]),
+                int(payload["from_party_id"]),
+                int(payload["to_party_id"]),
+            )
+        elif event_type == "PartiesMerged":
+            self.merge_parties(
+                int(payload["party_id"]),
+                [int(party_id) for party_id in payload["merged_party_ids"]],
+                {int(relationship_id) for relationship_id in payload["deleted_relationship_ids"]},
+            )
+        elif event_type in ("PersonDeleted", "OrganisationDeleted"):
+            # Relationships removed by the ORM cascade emit no events of their own
+            self.remove_party(int(payload["party_id"]))
+
+    def refresh_from_outbox(self, db: Session, batch_size: int = 1000) -> int:
+        if not self.loaded:
+            self.load(db)
+            return 0
+        events = read_events_since(db, self.cursor, batch_size)
+        with self.lock:
+            for event_id, event_type, payload in events:
+                try:
+                    self.apply_event(event_type, payload)
+                except (KeyError, TypeError, ValueError) as e:
+                    logging.warning(f"Skipping outbox event {event_id} for graph index: {e}")
+                self.cursor = event_id
+        return len(events)
+
+    def neighbours(self, party_id: int, direction: str = "both", type_codes: set[int] | None = None):
+        """Yield (neighbour, relationship_id, type_code) for the live edges of party_id."""
+        sources = []
+        if direction in ("outgoing", "both"):
+            sources.append((self.outgoing, self.added_outgoing))
+        if direction in ("incoming", "both"):
+            sources.append((self.incoming, self.added_incoming))
+        for csr, added in sources:
+            for edge in csr.edges_of(party_id):
+                if edge[1] not in self.removed and (type_codes is None or edge[2] in type_codes):
+                    yield edge
+            for edge in added.get(party_id, ()):
+                if type_codes is None or edge[2] in type_codes:
+                    yield edge
+
+    def codes_for(self, types: list[str] | None) -> set[int] | None:
+        if not types:
+            return None
+        return {self.type_codes[t] for t in types if t in self.type_codes}
+
+    def k_hop(self, party_id: int, k: int, direction: str = "both", types: list[str] | None = None, limit: int = 10000):
+        """Breadth-first neighbourhood: ({party_id: hop}, truncated)."""
+        with self.lock:
+            codes = self.codes_for(types)
+            distances = {party_id: 0}
+            frontier = [party_id]
+            for hop in range(1, k + 1):
+                next_frontier = []
+                for node in frontier:
+                    for neighbour, _, _ in self.neighbours(node, direction, codes):
+                        if neighbour in distances:
+                            continue
+                        if len(distances) >= limit:
+                            return distances, True
+                        distances[neighbour] = hop
+                        next_frontier.append(neighbour)
+                frontier = next_frontier
+                if not frontier:
+                    break
+            return distances, False
+
+    def shortest_path(self, source: int, target: int, direction: str = "both",
+                      types: list[str] | None = None, max_depth: int = 6):
+        """
+        Bidirectional BFS. Returns (party_ids, relationship_ids) along the path,
+        or None when target is not reachable within max_depth hops.
+        """
+        if source == target:
+            return [source], []
+        reverse = {"outgoing": "incoming", "incoming": "outgoing"}.get(direction, "both")
+        with self.lock:
+            codes = self.codes_for(types)
+            forward = {source: None}
+            backward = {target: None}
+            forward_frontier, backward_frontier = [source], [target]
+            for _ in range(max_depth):
+                # Expand the smaller side each round
+                expand_forward = len(forward_frontier) <= len(backward_frontier)
+                if expand_forward:
+                    frontier, parents, others, step = forward_frontier, forward, backward, direction
+                else:
+                    frontier, parents, others, step = backward_frontier, backward, forward, reverse
+                next_frontier = []
+                for node in frontier:
+                    for neighbour, relationship_id, _ in self.neighbours(node, step, codes):
+                        if neighbour in parents:
+                            continue
+                        parents[neighbour] = (node, relationship_id)
+                        if neighbour in others:
+                            return self._join_paths(neighbour, forward, backward)
+                        next_frontier.append(neighbour)
+                if not next_frontier:
+                    return None
+                if expand_forward:
+                    forward_frontier = next_frontier
+                else:
+                    backward_frontier = next_frontier
+            return None
+
+    @staticmethod
+    def _join_paths(meeting: int, forward: dict, backward: dict):
+        party_ids, relationship_ids = [meeting], []
+        node = meeting
+        while forward[node] is not None:
+            node, relationship_id = forward[node]
+            party_ids.insert(0, node)
+            relationship_ids.insert(0, relationship_id)
+        node = meeting
+        while backward[node] is not None:
+            node, relationship_id = backward[node]
+            party_ids.append(node)
+            relationship_ids.append(relationship_id)
+        return party_ids, relationship_ids
+
+    def component(self, party_id: int, limit: int = 10000):
+        """Weakly connected component containing party_id: (members, truncated)."""
+        with self.lock:
+            seen = {party_id}
+            queue = deque([party_id])
+            while queue:
+                node = queue.popleft()
+                for neighbour, _, _ in self.neighbours(node, "both"):
+                    if neighbour not in seen:
+                        if len(seen) >= limit:
+                            return seen, True
+                        seen.add(neighbour)
+                        queue.append(neighbour)
+            return seen, False
+
+    def stats(self) -> dict:
+        with self.lock:
+            delta_edges = sum(map(len, self.added_outgoing.values()))
+            csr_bytes = self.outgoing.memory_bytes() + self.incoming.memory_bytes()
+            delta_bytes = (
+                sys.getsizeof(self.added_outgoing) + sys.getsizeof(self.added_incoming)
+                + sys.getsizeof(self.removed) + delta_edges * 2 * 120
+            )
+            return {
+                "loaded": self.loaded,
+                "relationships": len(self.outgoing) + delta_edges - len(self.removed),
+                "pending_delta": delta_edges + len(self.removed),
+                "relationship_types": len(self.type_names),
+                "csr_bytes": csr_bytes,
+                "delta_bytes_estimate": delta_bytes,
+                "cursor": self.cursor,
+            }
+
+
+graph_index = GraphIndex()
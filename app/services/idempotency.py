@@ -0,0 +1,133 @@
+import asyncio
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+import redis.asyncio as redis
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+
+from app.config import settings
+from app.db.session import WriteSessionLocal
+from app.models.idempotency_key import IdempotencyKey
+
+
+@dataclass
+class StoredResponse:
+    """What a store holds for a key; status_code is None while the first request is still running."""
+    fingerprint: str
+    status_code: int | None = None
+    headers: list[list[str]] | None = None
+    body: bytes | None = None
+
+
+class DatabaseIdempotencyStore:
+    """
+    Keys in the idempotency_keys table. The primary key is the lock: the first
+    request inserts the row, a concurrent duplicate's insert fails and it reads
+    the row instead.
+    """
+
+    def __init__(self, session_factory=WriteSessionLocal, ttl: int = 86400, lock_seconds: int = 60):
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self.lock_seconds = lock_seconds
+
+    async def reserve(self, key: str, fingerprint: str) -> StoredResponse | None:
+        """Lock key for a new request and return None, or return what is already stored for it."""
+        return await asyncio.to_thread(self._reserve, key, fingerprint)
+
+    async def complete(self, key: str, response: StoredResponse):
+        await asyncio.to_thread(self._complete, key, response)
+
+    async def release(self, key: str):
+        await asyncio.to_thread(self._release, key)
+
+    def _reserve(self, key: str, fingerprint: str) -> StoredResponse | None:
+        now = datetime.utcnow()
+        with self.session_factory() as db:
+            record = db.get(IdempotencyKey, key)
+            if record is not None and record.expires_at <= now:
+                db.delete(record)
+                db.flush()
+                record = None
+            if record is None:
+                db.add(IdempotencyKey(
+                    key=key, fingerprint=fingerprint, expires_at=now + timedelta(seconds=self.lock_seconds)
+                ))
+                try:
+                    db.commit()
+                    return None
+                except IntegrityError:
+                    # A concurrent duplicate took the key first
+                    db.rollback()
+                    record = db.get(IdempotencyKey, key)
+                    if record is None:
+                        return StoredResponse(fingerprint=fingerprint)
+            return StoredResponse(record.fingerprint, record.status_code, record.headers, record.body)
+
+    def _complete(self, key: str, response: StoredResponse):
+        now = datetime.utcnow()
+        with self.session_factory() as db:
+            record = db.get(IdempotencyKey, key)
+            if record is None:
+                record = IdempotencyKey(key=key, fingerprint=response.fingerprint)
+                db.add(record)
+            record.status_code = response.status_code
+            record.headers = response.headers
+            record.body = response.body
+            record.expires_at = now + timedelta(seconds=self.ttl)
+            db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < now))
+            db.commit()
+
+    def _release(self, key: str):
+        with self.session_factory() as db:
+            db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key))
+            db.commit()
+
+
+class RedisIdempotencyStore:
+    """Keys in Redis, locked with SET NX and expired by Redis itself."""
+
+    def __init__(self, client: redis.Redis, ttl: int = 86400, lock_seconds: int = 60, prefix: str = "idempotency:"):
+        self.client = client
+        self.ttl = ttl
+        self.lock_seconds = lock_seconds
+        self.prefix = prefix
+
+    async def reserve(self, key: str, fingerprint: str) -> StoredResponse | None:
+        name = self.prefix + key
+        if await self.client.set(name, json.dumps({"fingerprint": fingerprint}), nx=True, ex=self.lock_seconds):
+            return None
+        value = await self.client.get(name)
+        if value is None:
+            # Expired between the two calls, the next poll takes it
+            return StoredResponse(fingerprint=fingerprint)
+        stored = json.loads(value)
+        body = stored.get("body")
+        return StoredResponse(
+            stored["fingerprint"], stored.get("status_code"), stored.get("headers"),
+            base64.b64decode(body) if body is not None else None,
+        )
+
+    async def complete(self, key: str, response: StoredResponse):
+        await self.client.set(self.prefix + key, json.dumps({
+            "fingerprint": response.fingerprint,
+            "status_code": response.status_code,
+            "headers": response.headers,
+            "body": base64.b64encode(response.body).decode(),
+        }), ex=self.ttl)
+
+    async def release(self, key: str):
+        await self.client.delete(self.prefix + key)
+
+
+def build_store():
+    if settings.IDEMPOTENCY_STORE == "redis":
+        client = redis.Redis(host=settings.REDIS_HOST, port=int(settings.REDIS_PORT), db=int(settings.REDIS_DB))
+        return RedisIdempotencyStore(client, settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_LOCK_SECONDS)
+    return DatabaseIdempotencyStore(WriteSessionLocal, settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_LOCK_SECONDS)
+
+
+idempotency_store = build_store()
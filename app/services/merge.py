@@ -0,0 +1,148 @@
+from datetime import datetime
+
+from sqlalchemy import and_, delete, exists, or_, update
+from sqlalchemy.orm import Session, aliased
+
+from app.config import settings
+from app.models.duplicate_candidate import DuplicateCandidate
+from app.models.external_identifier import ExternalIdentifier
+from app.models.organisation import Organisation
+from app.models.outbox_event import OutboxEvent
+from app.models.party import Party
+from app.models.party_address import PartyAddress
+from app.models.party_relationship import PartyRelationship
+from app.models.person import Person
+from app.services import hierarchy
+from app.services.party_search import reindex_party, remove_parties
+
+
+class MergeConflict(Exception):
+    """The merge would leave the data inconsistent, e.g. a cycle in an organisation hierarchy."""
+
+
+def _execute(db: Session, statement) -> int:
+    # The merge reloads what it needs afterwards, skip the ORM session sync
+    return db.execute(statement, execution_options={"synchronize_session": False}).rowcount
+
+
+def _repoint(db: Session, model, key: str, survivor_id: int, loser_ids: list[int]) -> tuple[int, int]:
+    """
+    Move rows of a per-party table from the losers to the survivor, dropping the
+    rows that would collide on (party_id, key): those the survivor already has,
+    and all but the lowest loser's copy. Returns (moved, dropped).
+    """
+    other = aliased(model)
+    dropped = _execute(db, delete(model).where(
+        model.party_id.in_(loser_ids),
+        exists().where(
+            getattr(other, key) == getattr(model, key),
+            or_(
+                other.party_id == survivor_id,
+                and_(other.party_id.in_(loser_ids), other.party_id < model.party_id),
+            ),
+        ),
+    ))
+    moved = _execute(db, update(model).where(model.party_id.in_(loser_ids)).values(party_id=survivor_id))
+    return moved, dropped
+
+
+def _merge_relationships(db: Session, survivor_id: int, loser_ids: list[int]) -> dict:
+    group = [survivor_id, *loser_ids]
+    touches_group = or_(PartyRelationship.from_party_id.in_(group), PartyRelationship.to_party_id.in_(group))
+
+    # Take hierarchical edges of the group out of the closure table while their
+    # endpoints are still the old ones; the surviving ones are re-added below
+    hierarchical = db.query(PartyRelationship).filter(
+        touches_group,
+        PartyRelationship.relationship_type.in_(settings.HIERARCHY_RELATIONSHIP_TYPES),
+    ).all()
+    for relationship in hierarchical:
+        hierarchy.remove_relationship(db, relationship)
+
+    # Relationships between merged parties would become self-loops
+    internal_ids = [relationship_id for (relationship_id,) in db.query(PartyRelationship.relationship_id).filter(
+        PartyRelationship.from_party_id.in_(group), PartyRelationship.to_party_id.in_(group)
+    )]
+    if internal_ids:
+        _execute(db, delete(PartyRelationship).where(PartyRelationship.relationship_id.in_(internal_ids)))
+
+    moved = _execute(db, update(PartyRelationship).where(PartyRelationship.from_party_id.in_(loser_ids))
+                     .values(from_party_id=survivor_id))
+    moved += _execute(db, update(PartyRelationship).where(PartyRelationship.to_party_id.in_(loser_ids))
+                      .values(to_party_id=survivor_id))
+
+    # Keep the oldest of relationships that now say the same thing
+    other = aliased(PartyRelationship)
+    duplicate_ids = [relationship_id for (relationship_id,) in db.query(PartyRelationship.relationship_id).filter(
+        or_(PartyRelationship.from_party_id == survivor_id, PartyRelationship.to_party_id == survivor_id),
+        exists().where(
+            other.from_party_id == PartyRelationship.from_party_id,
+            other.to_party_id == PartyRelationship.to_party_id,
+            other.relationship_type == PartyRelationship.relationship_type,
+            other.start_date.is_not_distinct_from(PartyRelationship.start_date),
+            other.end_date.is_not_distinct_from(PartyRelationship.end_date),
+            other.relationship_id < PartyRelationship.relationship_id,
+        ),
+    )]
+    if duplicate_ids:
+        _execute(db, delete(PartyRelationship).where(PartyRelationship.relationship_id.in_(duplicate_ids)))
+
+    deleted_ids = set(internal_ids) | set(duplicate_ids)
+    surviving = [relationship.relationship_id for relationship in hierarchical
+                 if relationship.relationship_id not in deleted_ids]
+    if surviving:
+        for relationship in (
+            db.query(PartyRelationship).filter(PartyRelationship.relationship_id.in_(surviving))
+            .populate_existing().order_by(PartyRelationship.relationship_id)
+        ):
+            if hierarchy.creates_cycle(db, relationship.relationship_type,
+                                       relationship.from_party_id, relationship.to_party_id):
+                raise MergeConflict("Merge would create a cycle in the hierarchy")
+            hierarchy.add_relationship(db, relationship)
+
+    return {
+        "relationships_moved": moved - len(duplicate_ids),
+        "relationships_deleted": len(deleted_ids),
+        "deleted_relationship_ids": sorted(deleted_ids),
+    }
+
+
+def merge_parties(db: Session, survivor: Party, loser_ids: list[int]) -> dict:
+    """
+    Fold the loser parties into the survivor in the current transaction: their
+    addresses, relationships and external identifiers move across with
+    set-based statements, then the losers are deleted and one PartiesMerged
+    outbox event is added. The caller commits, or rolls back on MergeConflict.
+    """
+    survivor_id = survivor.party_id
+    loser_ids = sorted(set(loser_ids))
+
+    summary = _merge_relationships(db, survivor_id, loser_ids)
+    summary["addresses_moved"], summary["addresses_dropped"] = _repoint(
+        db, PartyAddress, "address_id", survivor_id, loser_ids
+    )
+    summary["external_identifiers_moved"], summary["external_identifiers_dropped"] = _repoint(
+        db, ExternalIdentifier, "system_name", survivor_id, loser_ids
+    )
+
+    _execute(db, delete(DuplicateCandidate).where(or_(
+        DuplicateCandidate.party_id.in_(loser_ids), DuplicateCandidate.duplicate_party_id.in_(loser_ids)
+    )))
+    _execute(db, delete(Person).where(Person.party_id.in_(loser_ids)))
+    _execute(db, delete(Organisation).where(Organisation.party_id.in_(loser_ids)))
+    _execute(db, delete(Party).where(Party.party_id.in_(loser_ids)))
+    survivor.updated_at = datetime.utcnow()
+
+    remove_parties(db, loser_ids)
+    reindex_party(db, survivor_id)
+
+    db.add(OutboxEvent(
+        event_type="PartiesMerged",
+        payload={
+            "party_id": survivor_id,
+            "party_type": survivor.party_type,
+            "merged_party_ids": loser_ids,
+            **summary,
+        },
+    ))
+    return summary
@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func
+from sqlalchemy.orm import Query, Session
+
+from app.config import settings
+from app.models.outbox_event import OutboxEvent
+
+# Dialects whose writers take the database lock in turn, so event_ids become visible in order
+SERIALIZED_WRITERS = {"sqlite"}
+
+
+def settled(db: Session, query: Query, cursor: int) -> Query:
+    """
+    Limit an event_id > cursor query to ids no late commit can still land below.
+
+    Concurrent transactions commit out of event_id order, so an id can appear
+    after a reader has moved past it. Reading stops before the first event
+    younger than OUTBOX_SETTLE_SECONDS: everything below it is assumed final,
+    which holds as long as no transaction writing outbox events runs longer.
+    """
+    if db.get_bind().dialect.name in SERIALIZED_WRITERS or settings.OUTBOX_SETTLE_SECONDS <= 0:
+        return query
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.OUTBOX_SETTLE_SECONDS)
+    unsettled = (
+        db.query(func.min(OutboxEvent.event_id))
+        .filter(OutboxEvent.event_id > cursor, OutboxEvent.created_at > cutoff)
+        .scalar()
+    )
+    return query if unsettled is None else query.filter(OutboxEvent.event_id < unsettled)
+
+
+def latest_event_id(db: Session) -> int:
+    query = settled(db, db.query(OutboxEvent.event_id), 0)
+    return query.order_by(OutboxEvent.event_id.desc()).limit(1).scalar() or 0
+
+
+def read_events_since(db: Session, cursor: int, batch_size: int = 1000):
+    """Outbox events with event_id > cursor, oldest first, independent of publishing state."""
+    query = db.query(OutboxEvent.event_id, OutboxEvent.event_type, OutboxEvent.payload) \
+        .filter(OutboxEvent.event_id > cursor)
+    return settled(db, query, cursor).order_by(OutboxEvent.event_id).limit(batch_size).all()
@@ -0,0 +1,90 @@
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.models.party_relationship import PartyRelationship
+
+def _edges(direction: str, types: list[str] | None):
+    """Relationships as (src, dst) pairs in the direction of travel."""
+    outgoing = select(
+        PartyRelationship.relationship_id,
+        PartyRelationship.from_party_id.label("src"),
+        PartyRelationship.to_party_id.label("dst"),
+    )
+    incoming = select(
+        PartyRelationship.relationship_id,
+        PartyRelationship.to_party_id.label("src"),
+        PartyRelationship.from_party_id.label("dst"),
+    )
+    if types:
+        outgoing = outgoing.where(PartyRelationship.relationship_type.in_(types))
+        incoming = incoming.where(PartyRelationship.relationship_type.in_(types))
+
+    if direction == "outgoing":
+        return outgoing.subquery("edges")
+    if direction == "incoming":
+        return incoming.subquery("edges")
+    return union_all(outgoing, incoming).subquery("edges")
+
+
+def find_network(
+    db: Session,
+    party_id: int,
+    depth: int,
+    types: list[str] | None = None,
+    direction: str = "both",
+    max_relationships: int = 500,
+):
+    """
+    Walk relationships out from party_id up to `depth` hops with one recursive query.
+
+    The walk is breadth first over (party_id, hop) rows combined with UNION,
+    so each party is expanded at most once per hop and the working set is
+    bounded by the parties in reach times the depth, cycles included.
+    Returns (rows, truncated) where rows are (PartyRelationship, hop) ordered
+    by hop, each relationship at the hop it is first taken.
+    """
+    edges = _edges(direction, types)
+
+    network = select(
+        literal(party_id).label("party_id"),
+        literal(0).label("hop"),
+    ).cte("network", recursive=True)
+
+    network = network.union(
+        select(edges.c.dst, network.c.hop + 1)
+        .join_from(network, edges, edges.c.src == network.c.party_id)
+        .where(network.c.hop < depth - 1)
+    )
+
+    reached = (
+        select(edges.c.relationship_id, (func.min(network.c.hop) + 1).label("hop"))
+        .join_from(network, edges, edges.c.src == network.c.party_id)
+        .group_by(edges.c.relationship_id)
+        .order_by(func.min(network.c.hop), edges.c.relationship_id)
+        .limit(max_relationships + 1)
+        .subquery("reached")
+    )
+
+    rows = (
+        db.query(PartyRelationship, reached.c.hop)
+        .join(reached, reached.c.relationship_id == PartyRelationship.relationship_id)
+        .order_by(reached.c.hop, PartyRelationship.relationship_id)
+        .all()
+    )
+    truncated = len(rows) > max_relationships
+    return rows[:max_relationships], truncated
+
+
+def hop_distances(party_id: int, rows, direction: str = "both") -> dict[int, int]:
+    """Hop distance of every party touched by the walked relationships."""
+    distances = {party_id: 0}
+    for relationship, hop in rows:
+        ends = []
+        if direction in ("outgoing", "both"):
+            ends.append((relationship.from_party_id, relationship.to_party_id))
+        if direction in ("incoming", "both"):
+            ends.append((relationship.to_party_id, relationship.from_party_id))
+        for src, dst in ends:
+            if src in distances and distances[src] < hop and dst not in distances:
+                distances[dst] = distances[src] + 1
+    return distances
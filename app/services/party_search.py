@@ -0,0 +1,168 @@
+import re
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+from app.models.address import Address
+from app.models.organisation import Organisation
+from app.models.party import Party
+from app.models.party_address import PartyAddress
+from app.models.person import Person
+from app.models.party_search import SEARCH_COLUMNS
+
+TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# bm25 column weights for SQLite, in SEARCH_COLUMNS order
+SQLITE_WEIGHTS = (10.0, 8.0, 4.0, 8.0, 2.0)
+
+
+def _dialect(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+
+def build_documents(db: Session, party_ids) -> dict[int, dict]:
+    """Collect the searchable text for a batch of parties with three set-based queries."""
+    party_ids = list(party_ids)
+    if not party_ids:
+        return {}
+
+    rows = (
+        db.query(Party.party_id, Party.display_name, Person, Organisation)
+        .outerjoin(Person, Person.party_id == Party.party_id)
+        .outerjoin(Organisation, Organisation.party_id == Party.party_id)
+        .filter(Party.party_id.in_(party_ids))
+        .all()
+    )
+    documents = {}
+    for party_id, display_name, person, organisation in rows:
+        document = dict.fromkeys(SEARCH_COLUMNS, "")
+        document["display_name"] = display_name
+        if person is not None:
+            document["person_names"] = f"{person.first_name} {person.last_name}"
+            document["emails"] = person.email
+        if organisation is not None:
+            document["organisation"] = " ".join(
+                filter(None, [organisation.organisation_name, organisation.registration_number])
+            )
+            document["emails"] = organisation.email
+        documents[party_id] = document
+
+    addresses = (
+        db.query(PartyAddress.party_id, Address.city, Address.postal_code)
+        .join(Address, Address.address_id == PartyAddress.address_id)
+        .filter(PartyAddress.party_id.in_(party_ids))
+        .all()
+    )
+    for party_id, city, postal_code in addresses:
+        if party_id in documents:
+            documents[party_id]["addresses"] += f" {city} {postal_code}"
+
+    return documents
+
+
+def remove_parties(db: Session, party_ids):
+    party_ids = list(party_ids)
+    if not party_ids:
+        return
+    key = {"sqlite": "rowid", "postgresql": "party_id"}.get(_dialect(db))
+    if key is None:
+        return
+    statement = text(f"DELETE FROM party_search WHERE {key} IN :ids").bindparams(bindparam("ids", expanding=True))
+    db.execute(statement, {"ids": party_ids})
+
+
+def reindex_parties(db: Session, party_ids):
+    """Refresh the search documents of the given parties in the current transaction."""
+    party_ids = set(party_ids)
+    dialect = _dialect(db)
+    if not party_ids or dialect not in ("sqlite", "postgresql"):
+        return
+
+    # The session does not autoflush, make pending writes visible first
+    db.flush()
+    documents = build_documents(db, party_ids)
+    remove_parties(db, party_ids - documents.keys())
+    write_documents(db, documents)
+
+
+def write_documents(db: Session, documents: dict[int, dict], replace: bool = True):
+    """Store search documents built elsewhere; replace=False skips the delete for parties known to be new."""
+    dialect = _dialect(db)
+    if not documents or dialect not in ("sqlite", "postgresql"):
+        return
+    params = [{"party_id": party_id, **document} for party_id, document in documents.items()]
+    columns = ", ".join(SEARCH_COLUMNS)
+    values = ", ".join(f":{column}" for column in SEARCH_COLUMNS)
+    if dialect == "sqlite":
+        if replace:
+            remove_parties(db, documents.keys())
+        db.execute(text(f"INSERT INTO party_search (rowid, {columns}) VALUES (:party_id, {values})"), params)
+    else:
+        updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in SEARCH_COLUMNS)
+        db.execute(
+            text(
+                f"INSERT INTO party_search (party_id, {columns}) VALUES (:party_id, {values}) "
+                f"ON CONFLICT (party_id) DO UPDATE SET {updates}"
+            ),
+            params,
+        )
+
+
+def reindex_party(db: Session, party_id: int):
+    reindex_parties(db, [party_id])
+
+
+def rebuild_index(db: Session, batch_size: int = 5000) -> int:
+    """Re-create every search document, walking the parties table in primary key order."""
+    if _dialect(db) not in ("sqlite", "postgresql"):
+        return 0
+    db.execute(text("DELETE FROM party_search"))
+    indexed, last_id = 0, 0
+    while True:
+        party_ids = [
+            party_id for (party_id,) in
+            db.query(Party.party_id).filter(Party.party_id > last_id)
+            .order_by(Party.party_id).limit(batch_size).all()
+        ]
+        if not party_ids:
+            break
+        reindex_parties(db, party_ids)
+        db.commit()
+        indexed += len(party_ids)
+        last_id = party_ids[-1]
+    return indexed
+
+
+def search_parties(db: Session, q: str, limit: int = 20) -> list[int]:
+    """Return party IDs matching every term in q, best match first."""
+    tokens = TOKEN.findall(q.lower())
+    if not tokens:
+        return []
+
+    dialect = _dialect(db)
+    if dialect == "sqlite":
+        match = " ".join(f'"{token}"*' for token in tokens)
+        weights = ", ".join(str(weight) for weight in SQLITE_WEIGHTS)
+        rows = db.execute(
+            text(
+                f"SELECT rowid FROM party_search WHERE party_search MATCH :match "
+                f"ORDER BY bm25(party_search, {weights}) LIMIT :limit"
+            ),
+            {"match": match, "limit": limit},
+        )
+    elif dialect == "postgresql":
+        rows = db.execute(
+            text(
+                "SELECT party_id FROM party_search, to_tsquery('simple', :tsquery) AS query "
+                "WHERE document @@ query OR display_name % :q "
+                "ORDER BY ts_rank(document, query) + similarity(display_name, :q) DESC LIMIT :limit"
+            ),
+            {"tsquery": " & ".join(f"{token}:*" for token in tokens), "q": q, "limit": limit},
+        )
+    else:
+        rows = (
+            db.query(Party.party_id)
+            .filter(*(Party.display_name.icontains(token, autoescape=True) for token in tokens))
+            .limit(limit)
+        )
+    return [row[0] for row in rows]
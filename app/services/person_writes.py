@@ -0,0 +1,74 @@
+from collections import defaultdict
+
+from sqlalchemy.orm import Session
+
+from app.models.external_identifier import ExternalIdentifier
+from app.models.outbox_event import OutboxEvent
+from app.models.party import Party
+from app.models.person import Person
+from app.schemas.person import PersonCreate, PersonRead
+from app.services.party_search import reindex_parties
+
+
+def create_persons(db: Session, people: list[PersonCreate]) -> list[PersonRead]:
+    """Add persons with their parties, outbox events and search documents; parties go in as one multi-row insert."""
+    parties = [Party(party_type="person", display_name=f"{person.first_name} {person.last_name}") for person in people]
+    db.add_all(parties)
+    db.flush()
+
+    db_persons = [Person(party_id=party.party_id, **person.model_dump()) for party, person in zip(parties, people)]
+    db.add_all(db_persons)
+    db.add_all([
+        OutboxEvent(
+            event_type="PersonCreated",
+            payload={
+                "party_id": party.party_id,
+                "first_name": person.first_name,
+                "last_name": person.last_name,
+                "email": person.email
+            }
+        )
+        for party, person in zip(parties, people)
+    ])
+    reindex_parties(db, [party.party_id for party in parties])
+    return [PersonRead.from_orm(db_person) for db_person in db_persons]
+
+
+def update_persons(db: Session, updates: list[tuple[int, PersonCreate]]) -> list[PersonRead | None]:
+    """
+    Apply name and email updates in order, loading every person touched with
+    one query per table. Returns None in place of a person that does not exist.
+    """
+    party_ids = {party_id for party_id, _ in updates}
+    db_persons = {person.party_id: person for person in db.query(Person).filter(Person.party_id.in_(party_ids))}
+    parties = {party.party_id: party for party in db.query(Party).filter(Party.party_id.in_(db_persons))}
+    identifiers = defaultdict(list)
+    for identifier in db.query(ExternalIdentifier).filter(ExternalIdentifier.party_id.in_(db_persons)):
+        identifiers[identifier.party_id].append(
+            {"system_name": identifier.system_name, "external_id": identifier.external_id}
+        )
+
+    results = []
+    for party_id, person_update in updates:
+        db_person = db_persons.get(party_id)
+        if db_person is None:
+            results.append(None)
+            continue
+        db_person.first_name = person_update.first_name
+        db_person.last_name = person_update.last_name
+        db_person.email = person_update.email
+        if party_id in parties:
+            parties[party_id].display_name = f"{person_update.first_name} {person_update.last_name}"
+        db.add(OutboxEvent(
+            event_type="PersonUpdated",
+            payload={
+                "party_id": party_id,
+                "first_name": person_update.first_name,
+                "last_name": person_update.last_name,
+                "email": person_update.email,
+                "external_identifiers": identifiers[party_id]
+            }
+        ))
+        results.append(PersonRead.from_orm(db_person))
+    reindex_parties(db, db_persons)
+    return results
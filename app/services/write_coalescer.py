@@ -0,0 +1,139 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from itertools import groupby
+from typing import Callable
+
+from app.config import settings
+from app.db.session import WriteSessionLocal
+from app.services.person_writes import create_persons, update_persons
+
+logging.basicConfig(level=logging.INFO)
+
+
+class WriteCoalescer:
+    """
+    Group commit for single-record writes.
+
+    Callers submit an operation and wait on a future. A writer thread takes the
+    first waiting operation, collects whatever else arrives within window
+    seconds (up to max_batch), and runs them in one transaction: consecutive
+    operations of a kind go through that kind's batch function together, so N
+    creates become multi-row inserts and one commit instead of N.
+
+    If the shared transaction fails, it is rolled back and the batch replayed
+    with a savepoint per operation, so only the operations that fail get an
+    error and the rest still commit together.
+    """
+
+    def __init__(self, handlers: dict[str, Callable], session_factory=WriteSessionLocal,
+                 window: float = 0.002, max_batch: int = 200):
+        self.handlers = handlers
+        self.session_factory = session_factory
+        self.window = window
+        self.max_batch = max_batch
+        self.queue: queue.Queue = queue.Queue()
+        self.thread: threading.Thread | None = None
+        self.lock = threading.Lock()
+        self.stats = {"batches": 0, "operations": 0, "replayed_batches": 0}
+
+    def submit(self, kind: str, args) -> Future:
+        if kind not in self.handlers:
+            raise ValueError(f"No batch handler for {kind}")
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name="write-coalescer", daemon=True)
+                self.thread.start()
+        future = Future()
+        self.queue.put((kind, args, future))
+        return future
+
+    def collect(self, first) -> tuple[list, bool]:
+        batch, deadline = [first], time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                operation = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if operation is None:
+                return batch, True
+            batch.append(operation)
+        return batch, False
+
+    def run(self):
+        stopping = False
+        while not stopping:
+            first = self.queue.get()
+            if first is None:
+                break
+            batch, stopping = self.collect(first)
+            self.execute(batch)
+
+    def _apply(self, db, batch) -> list:
+        results = []
+        for kind, operations in groupby(batch, key=lambda operation: operation[0]):
+            results += self.handlers[kind](db, [args for _, args, _ in operations])
+        db.flush()
+        return results
+
+    def _apply_each(self, db, batch) -> list:
+        results = []
+        for operation in batch:
+            try:
+                with db.begin_nested():
+                    results.append(self._apply(db, [operation])[0])
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def execute(self, batch):
+        db = self.session_factory()
+        try:
+            try:
+                results = self._apply(db, batch)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                if len(batch) == 1:
+                    raise
+                logging.info(f"Replaying batch of {len(batch)} writes one by one after: {e}")
+                self.stats["replayed_batches"] += 1
+                results = self._apply_each(db, batch)
+                db.commit()
+        except Exception as e:
+            db.rollback()
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        finally:
+            db.close()
+
+        self.stats["batches"] += 1
+        self.stats["operations"] += len(batch)
+        for (_, _, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stop(self):
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive():
+                self.queue.put(None)
+                self.thread.join(timeout=5)
+            self.thread = None
+
+
+write_coalescer = WriteCoalescer(
+    handlers={
+        "person_create": create_persons,
+        "person_update": update_persons,
+    },
+    window=settings.WRITE_COALESCING_WINDOW_MS / 1000,
+    max_batch=settings.WRITE_COALESCING_MAX_BATCH,
+)
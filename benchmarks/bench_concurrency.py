@@ -0,0 +1,66 @@
+"""
+Drive concurrent requests against a running API to compare the sync and async stacks.
+
+    DB_ASYNC_ENABLED=false uvicorn app.main:app --port 8000 &
+    python -m benchmarks.bench_concurrency --url http://localhost:8000 --path /parties/1 \
+        --username alice --password secret1 --concurrency 1000 --requests 20000
+
+Run it once per DB_ASYNC_ENABLED setting. Reports throughput and latency
+percentiles; under the sync stack latency climbs once concurrency exceeds
+the threadpool size because requests queue for a worker thread.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def run(url: str, path: str, token: str, concurrency: int, total: int):
+    latencies, errors = [], 0
+    remaining = iter(range(total))
+    headers = {"Authorization": f"Bearer {token}"}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, headers=headers, limits=limits, timeout=60) as client:
+        async def worker():
+            nonlocal errors
+            for _ in remaining:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{total} requests, concurrency {concurrency}: {total / elapsed:,.0f} req/s, {errors} errors")
+    print(f"latency ms  p50 {quantiles[49] * 1000:.1f}  p95 {quantiles[94] * 1000:.1f}  "
+          f"p99 {quantiles[98] * 1000:.1f}  max {latencies[-1] * 1000:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--path", default="/parties/?limit=20")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    token = httpx.post(f"{args.url}/auth/login",
+                       json={"username": args.username, "password": args.password}).json()["access_token"]
+    asyncio.run(run(args.url, args.path, token, args.concurrency, args.requests))
+
+
+if __name__ == "__main__":
+    main()
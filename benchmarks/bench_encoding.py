@@ -0,0 +1,80 @@
+"""
+Compare response encodings for a typical /parties/ listing.
+
+    python -m benchmarks.bench_encoding --rows 1000 --repeat 50
+
+Reports encode/decode time and payload size for the JSON path the API has
+always used against MessagePack and CBOR, each with and without gzip/brotli.
+"""
+import argparse
+import gzip
+import json
+import time
+from datetime import datetime
+
+from fastapi.responses import JSONResponse
+
+from app.middleware.negotiation import ENCODERS, JSON_MEDIA_TYPE, cbor2, msgpack
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def build_payload(rows: int) -> list[dict]:
+    base_url = "http://localhost:8000"
+    now = datetime.utcnow().isoformat()
+    payload = []
+    for party_id in range(1, rows + 1):
+        payload.append({
+            "data": {
+                "party_type": "person",
+                "display_name": f"Party {party_id}",
+                "party_id": party_id,
+                "created_at": now,
+                "updated_at": now,
+            },
+            "links": [
+                {"rel": "self", "href": f"{base_url}/parties/{party_id}"},
+                {"rel": "addresses", "href": f"{base_url}/parties/{party_id}/addresses"},
+                {"rel": "relationships", "href": f"{base_url}/parties/{party_id}/relationships"},
+                {"rel": "external-identifiers", "href": f"{base_url}/parties/{party_id}/external-identifiers"},
+                {"rel": "person", "href": f"{base_url}/persons/{party_id}"},
+            ],
+        })
+    return payload
+
+
+def timed(func, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    payload = build_payload(args.rows)
+    decoders = {JSON_MEDIA_TYPE: json.loads}
+    if msgpack is not None:
+        decoders["application/msgpack"] = msgpack.unpackb
+    if cbor2 is not None:
+        decoders["application/cbor"] = cbor2.loads
+
+    print(f"{'encoding':<22}{'encode ms':>11}{'decode ms':>11}{'bytes':>10}{'gzip':>10}{'br':>10}")
+    for media_type, decoder in decoders.items():
+        encoder = ENCODERS[media_type] or JSONResponse(None).render
+        encode_ms, body = timed(lambda: encoder(payload), args.repeat)
+        decode_ms, _ = timed(lambda: decoder(body), args.repeat)
+        gzipped = len(gzip.compress(body, compresslevel=6))
+        brotlied = len(brotli.compress(body, quality=4)) if brotli is not None else "-"
+        print(f"{media_type:<22}{encode_ms:>11.2f}{decode_ms:>11.2f}{len(body):>10}{gzipped:>10}{brotlied:>10}")
+
+
+if __name__ == "__main__":
+    main()
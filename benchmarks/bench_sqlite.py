@@ -0,0 +1,131 @@
+"""
+Concurrent read/write throughput on SQLite with and without the performance profile.
+
+    python -m benchmarks.bench_sqlite --readers 4 --writers 4 --seconds 10
+
+Readers fetch a page of 100 parties, like GET /parties/. Writers follow the
+API's write path: they read a party, then insert a party and an outbox event
+and commit. Each run uses a fresh database file. Without the profile readers
+and writers block each other on the rollback journal, and lock waits show up
+as write latency; "database is locked" errors appear once a wait exceeds the
+driver's five second timeout.
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, exc, insert, select
+from sqlalchemy.orm import Session
+
+from app.db.session import Base
+from app.db.sqlite import IMMEDIATE, apply_sqlite_profile
+from app.models.outbox_event import OutboxEvent
+from app.models.party import Party
+
+
+def build_engine(path: Path, profile: bool, pool_size: int):
+    engine = create_engine(
+        f"sqlite:///{path}", connect_args={"check_same_thread": False}, pool_size=pool_size, max_overflow=0
+    )
+    if profile:
+        apply_sqlite_profile(engine)
+    Base.metadata.create_all(engine, tables=[Party.__table__, OutboxEvent.__table__])
+    return engine
+
+
+def seed(engine, rows: int):
+    with Session(engine) as db:
+        db.execute(insert(Party), [{"party_type": "person", "display_name": f"Party {i}"} for i in range(rows)])
+        db.commit()
+
+
+def run(profile: bool, readers: int, writers: int, seconds: float, rows: int) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = build_engine(Path(directory) / "bench.db", profile, readers + writers)
+        seed(engine, rows)
+        write_engine = engine.execution_options(**{IMMEDIATE: True}) if profile else engine
+        stop = threading.Event()
+        counts = {"reads": 0, "writes": 0, "read_errors": 0, "write_errors": 0}
+        write_latencies = []
+        lock = threading.Lock()
+
+        def read_loop():
+            done = errors = 0
+            while not stop.is_set():
+                try:
+                    with Session(engine) as db:
+                        db.scalars(select(Party).offset(random.randint(0, rows - 100)).limit(100)).all()
+                    done += 1
+                except exc.OperationalError:
+                    errors += 1
+            with lock:
+                counts["reads"] += done
+                counts["read_errors"] += errors
+
+        def write_loop():
+            done = errors = 0
+            latencies = []
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    with Session(write_engine) as db:
+                        db.scalar(select(Party).where(Party.party_id == random.randint(1, rows)))
+                        party = Party(party_type="person", display_name="New party")
+                        db.add(party)
+                        db.flush()
+                        db.add(OutboxEvent(event_type="PersonCreated", payload={"party_id": party.party_id}))
+                        db.commit()
+                    done += 1
+                    latencies.append(time.perf_counter() - start)
+                except exc.OperationalError:
+                    errors += 1
+            with lock:
+                counts["writes"] += done
+                counts["write_errors"] += errors
+                write_latencies.extend(latencies)
+
+        threads = [threading.Thread(target=read_loop) for _ in range(readers)]
+        threads += [threading.Thread(target=write_loop) for _ in range(writers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    write_latencies.sort()
+    p95 = write_latencies[int(0.95 * (len(write_latencies) - 1))] if write_latencies else 0.0
+    return {
+        "reads_per_second": counts["reads"] / seconds,
+        "writes_per_second": counts["writes"] / seconds,
+        "read_errors": counts["read_errors"],
+        "write_errors": counts["write_errors"],
+        "write_p50_ms": statistics.median(write_latencies) * 1000 if write_latencies else 0.0,
+        "write_p95_ms": p95 * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--rows", type=int, default=10000)
+    args = parser.parse_args()
+
+    print(f"{'profile':<10}{'reads/s':>12}{'writes/s':>12}{'read err':>10}{'write err':>11}"
+          f"{'write p50':>11}{'write p95':>11}")
+    for profile in (False, True):
+        result = run(profile, args.readers, args.writers, args.seconds, args.rows)
+        print(f"{'on' if profile else 'off':<10}{result['reads_per_second']:>12.0f}{result['writes_per_second']:>12.0f}"
+              f"{result['read_errors']:>10}{result['write_errors']:>11}"
+              f"{result['write_p50_ms']:>9.1f}ms{result['write_p95_ms']:>9.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
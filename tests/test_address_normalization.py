@@ -0,0 +1,81 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models
+from app.api.v1.endpoints import addresses
+from app.db.session import Base, get_db
+from app.models.address import Address
+from app.models.party import Party
+from app.models.party_address import PartyAddress
+from app.routes.auth import auth_scheme
+from app.services.address_normalization import canonicalize, content_hash, deduplicate_addresses
+
+
+def address(**overrides):
+    return {"address_line_1": "Diddly Squat Farm", "address_line_2": None, "city": "Chipping Norton",
+            "region": None, "postal_code": "OX7 3PE", "country": "UK", "address_type": "Business", **overrides}
+
+
+def test_canonical_forms_hash_equal():
+    messy = canonicalize(address(address_line_1="  diddly  squat FARM ", postal_code="ox73pe",
+                                 country="United Kingdom"))
+    assert messy["postal_code"] == "OX7 3PE"
+    assert messy["country"] == "GB"
+    assert content_hash(messy) == content_hash(canonicalize(address()))
+    assert content_hash(canonicalize(address(address_type="Home"))) != content_hash(canonicalize(address()))
+    assert canonicalize(address(postal_code="12345 6789", country="usa"))["postal_code"] == "12345-6789"
+
+
+def test_deduplicate_folds_links_into_oldest_row():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all([Party(party_id=i, party_type="person", display_name=f"P{i}") for i in (1, 2)])
+    db.add_all([Address(address_id=1, **address()), Address(address_id=2, **address(postal_code="ox7 3pe")),
+                Address(address_id=3, **address(address_line_1="1 Farm Road"))])
+    db.add_all([PartyAddress(party_id=1, address_id=1), PartyAddress(party_id=1, address_id=2),
+                PartyAddress(party_id=2, address_id=2)])
+    db.commit()
+
+    assert deduplicate_addresses(db) == (3, 1)
+    assert sorted(address_id for (address_id,) in db.query(Address.address_id)) == [1, 3]
+    assert sorted((pa.party_id, pa.address_id) for pa in db.query(PartyAddress)) == [(1, 1), (2, 1)]
+    assert db.query(Address).filter(Address.address_hash.is_(None)).count() == 0
+    db.close()
+
+
+def test_delete_refuses_an_address_other_parties_share():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.add_all([Party(party_id=i, party_type="person", display_name=f"P{i}") for i in (1, 2)])
+    db.add_all([Address(address_id=1, **address()), Address(address_id=2, **address(address_line_1="1 Farm Road"))])
+    db.add_all([PartyAddress(party_id=1, address_id=1), PartyAddress(party_id=2, address_id=1),
+                PartyAddress(party_id=1, address_id=2)])
+    db.commit()
+
+    def get_test_db():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    api = FastAPI()
+    api.include_router(addresses.router, prefix="/addresses")
+    api.dependency_overrides[get_db] = get_test_db
+    token = auth_scheme.create_access_token(subject={"username": "kaleb", "roles": ["user"]})
+    client = TestClient(api, headers={"Authorization": f"Bearer {token}"})
+
+    assert client.delete("/addresses/1").status_code == 409
+    assert client.delete("/addresses/2").status_code == 200
+    db.expire_all()
+    assert sorted(address_id for (address_id,) in db.query(Address.address_id)) == [1]
+    # No link is left pointing at the deleted row
+    assert sorted((pa.party_id, pa.address_id) for pa in db.query(PartyAddress)) == [(1, 1), (2, 1)]
+    db.close()
@@ -0,0 +1,66 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from app.middleware.admission import AdaptiveLimiter, AdmissionControlMiddleware
+
+
+def test_limiter_queues_then_sheds_and_adapts():
+    async def scenario():
+        limiter = AdaptiveLimiter("read", max_limit=2, min_limit=1, queue_timeout=0.05, window=0, min_samples=1)
+        assert await limiter.acquire() and await limiter.acquire()
+
+        # The third waits and takes the slot a finishing request hands over
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        limiter.release(0.01, 0.0)
+        assert await waiting
+        # With no slot freed, the next one is shed once its wait times out
+        assert not await limiter.acquire()
+        assert limiter.stats == {"admitted": 3, "queued": 2, "shed": 1}
+
+        # Slow connection checkouts shrink the limit, within the minimum
+        for _ in range(5):
+            limiter.release(0.01, 0.5)
+            limiter.in_flight += 1
+        assert int(limiter.limit) == 1
+        # Healthy windows where requests queued grow it back
+        for _ in range(3):
+            limiter.queued_in_window = True
+            limiter.release(0.01, 0.0)
+            limiter.in_flight += 1
+        assert int(limiter.limit) == 2
+
+    asyncio.run(scenario())
+
+
+def test_overload_is_shed_with_retry_after_per_class():
+    app = FastAPI()
+
+    @app.get("/items/")
+    async def read_items():
+        await asyncio.sleep(0.2)
+        return []
+
+    @app.post("/items/")
+    async def create_item():
+        return {}
+
+    limiters = {
+        "read": AdaptiveLimiter("read", max_limit=1, queue_timeout=0.05),
+        "write": AdaptiveLimiter("write", max_limit=1, queue_timeout=0.05),
+    }
+    app.add_middleware(AdmissionControlMiddleware, limiters=limiters, exempt_paths=["/health"], retry_after=2)
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://testserver") as client:
+            reads = await asyncio.gather(client.get("/items/"), client.get("/items/"), client.post("/items/"))
+        return reads
+
+    first, second, write = asyncio.run(scenario())
+    assert sorted([first.status_code, second.status_code]) == [200, 503]
+    shed = first if first.status_code == 503 else second
+    assert shed.headers["retry-after"] == "2"
+    # Writes have their own budget, so the busy reads did not block this one
+    assert write.status_code == 200
@@ -0,0 +1,93 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+import app.models
+from app.api.v1.async_endpoints import persons
+from app.config import settings
+from app.db import session
+from app.db.session import Base, RoutingSession, async_url, recent_writers
+from app.db.sqlite import apply_sqlite_profile
+from app.models.outbox_event import OutboxEvent
+from app.routes.auth import auth_scheme
+from app.services.person_writes import create_persons, update_persons
+from app.services.write_coalescer import WriteCoalescer
+
+
+def test_async_url_swaps_in_the_async_driver():
+    assert str(async_url("sqlite:///./rolodex_data.db")) == "sqlite+aiosqlite:///./rolodex_data.db"
+    assert async_url("postgresql://rolodex@db/rolodex").drivername == "postgresql+asyncpg"
+    with pytest.raises(ValueError):
+        async_url("oracle://rolodex@db/rolodex")
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    engine = create_engine(url)
+    apply_sqlite_profile(engine)
+    Base.metadata.create_all(engine)
+    # What the module sets up when DB_ASYNC_ENABLED is on at import
+    async_engine = create_async_engine(async_url(url), poolclass=NullPool)
+    monkeypatch.setattr(session, "async_engine", async_engine)
+    monkeypatch.setattr(session, "async_write_engine", async_engine.sync_engine, raising=False)
+    monkeypatch.setattr(session, "AsyncSessionLocal", async_sessionmaker(
+        sync_session_class=RoutingSession, autoflush=False, expire_on_commit=False, replicas=[],
+    ))
+    yield engine
+    engine.dispose()
+
+
+def make_client(name):
+    api = FastAPI()
+    api.include_router(persons.router, prefix="/persons")
+    token = auth_scheme.create_access_token(subject={"username": name, "roles": ["user"]})
+    return TestClient(api, headers={"Authorization": f"Bearer {token}"})
+
+
+def person(first_name, email):
+    return {"first_name": first_name, "last_name": "Cooper", "email": email, "phone_primary": "0123"}
+
+
+def test_async_person_endpoints_round_trip(database):
+    client = make_client("kaleb")
+    created = client.post("/persons/", json=person("Kaleb", "kaleb@diddlysquat.co.uk"))
+    assert created.status_code == 200
+    party_id = created.json()["data"]["party_id"]
+    # get_async_db records the write so this client's reads stay on the primary
+    assert recent_writers.is_recent(client.headers["authorization"])
+
+    assert client.get(f"/persons/{party_id}").json()["data"]["first_name"] == "Kaleb"
+    updated = client.put(f"/persons/persons/{party_id}", json=person("Charlie", "charlie@diddlysquat.co.uk"))
+    assert updated.json()["data"]["first_name"] == "Charlie"
+    assert [p["data"]["email"] for p in client.get("/persons/").json()] == ["charlie@diddlysquat.co.uk"]
+
+    assert client.delete(f"/persons/persons/{party_id}").status_code == 204
+    assert client.get(f"/persons/{party_id}").status_code == 404
+    with sessionmaker(bind=database)() as db:
+        assert list(db.scalars(select(OutboxEvent.event_type).order_by(OutboxEvent.event_id))) == \
+            ["PersonCreated", "PersonUpdated", "PersonDeleted"]
+
+
+def test_async_person_writes_go_through_the_coalescer(database, monkeypatch):
+    coalescer = WriteCoalescer(
+        handlers={"person_create": create_persons, "person_update": update_persons},
+        session_factory=sessionmaker(bind=database, autoflush=False),
+        window=0.01,
+    )
+    monkeypatch.setattr(settings, "WRITE_COALESCING_ENABLED", True)
+    monkeypatch.setattr(persons, "write_coalescer", coalescer)
+    client = make_client("gerald")
+    try:
+        party_id = client.post("/persons/", json=person("Gerald", "gerald@diddlysquat.co.uk")).json()["data"]["party_id"]
+        updated = client.put(f"/persons/persons/{party_id}", json=person("Gerald", "gerald@farm.co.uk"))
+        assert updated.json()["data"]["email"] == "gerald@farm.co.uk"
+        assert client.put("/persons/persons/999", json=person("Nobody", "nobody@farm.co.uk")).status_code == 404
+    finally:
+        coalescer.stop()
+    assert coalescer.stats["operations"] == 3
+    assert recent_writers.is_recent(client.headers["authorization"])
@@ -0,0 +1,43 @@
+from app.services.autocomplete import AutocompleteIndex, completion_keys, normalize
+
+
+def build_index():
+    index = AutocompleteIndex()
+    index.loaded = True
+    index.upsert(1, "person", "Jeremy Clarkson")
+    index.upsert(2, "person", "Kaleb Cooper")
+    index.upsert(3, "organisation", "Diddly Squat Farm")
+    index.upsert(4, "person", "Zoë  Ball")
+    return index
+
+
+def test_normalize_and_keys():
+    assert normalize("  Zoë   BALL ") == "zoe ball"
+    assert completion_keys("Diddly Squat Farm") == ["diddly squat farm", "squat farm", "farm"]
+
+
+def test_complete_matches_any_word_start():
+    index = build_index()
+    assert [party_id for party_id, _, _ in index.complete("jer")] == [1]
+    assert [party_id for party_id, _, _ in index.complete("CLARK")] == [1]
+    assert [party_id for party_id, _, _ in index.complete("zoe b")] == [4]
+    assert index.complete("   ") == []
+
+
+def test_complete_filters_by_party_type_and_limit():
+    index = build_index()
+    index.upsert(5, "organisation", "Cooper Farms")
+    assert [party_id for party_id, _, _ in index.complete("coo")] == [2, 5]
+    assert [party_id for party_id, _, _ in index.complete("coo", party_type="person")] == [2]
+    assert len(index.complete("coo", limit=1)) == 1
+
+
+def test_events_keep_index_current():
+    index = build_index()
+    index.apply_event("PersonUpdated", {"party_id": 2, "first_name": "Gerald", "last_name": "Cooper"})
+    index.apply_event("OrganisationDeleted", {"party_id": 3})
+    index.apply_event("ExternalIdentifierCreated", {"party_id": 1})
+    assert index.complete("kaleb") == []
+    assert index.complete("gerald") == [(2, "Gerald Cooper", "person")]
+    assert index.complete("farm") == []
+    assert index.stats()["parties"] == 3
@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+from fastapi_jwt import JwtAuthorizationCredentials
+
+from app.api.v1.endpoints import batch
+from app.config import settings
+from app.db.session import get_db
+from app.routes.auth import auth_scheme, require_roles
+
+
+def make_app():
+    app = FastAPI()
+    app.include_router(batch.router, prefix="/batch")
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int, credentials: JwtAuthorizationCredentials = Depends(auth_scheme)):
+        require_roles(credentials, ["admin"] if item_id == 0 else ["user"])
+        await asyncio.sleep(5 if item_id == 99 else 0.2)
+        return {"item_id": item_id}
+
+    @app.post("/items/")
+    def create_item(item: dict, db=Depends(get_db), credentials: JwtAuthorizationCredentials = Depends(auth_scheme)):
+        require_roles(credentials, ["user"])
+        # No query runs, so the session never connects
+        return {"session": id(db), **item}
+
+    return app
+
+
+def test_batch_runs_sub_requests_with_the_callers_credentials():
+    client = TestClient(make_app())
+    token = auth_scheme.create_access_token(subject={"username": "kaleb", "roles": ["user"]})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    started = time.perf_counter()
+    response = client.post("/batch", headers=headers, json={"requests": [
+        *[{"id": str(i), "method": "GET", "path": f"/items/{i}"} for i in range(1, 6)],
+        {"id": "admin", "method": "GET", "path": "/items/0"},
+        {"id": "w1", "method": "POST", "path": "/items/", "body": {"name": "tractor"}},
+        {"id": "w2", "method": "POST", "path": "/items/", "body": {"name": "trailer"},
+         "headers": {"Authorization": "Bearer forged"}},
+        {"id": "nested", "method": "POST", "path": "/batch", "body": {"requests": []}},
+    ]})
+    elapsed = time.perf_counter() - started
+    assert response.status_code == 200
+    responses = {item["id"]: item for item in response.json()["responses"]}
+
+    assert [responses[str(i)]["body"] for i in range(1, 6)] == [{"item_id": i} for i in range(1, 6)]
+    # The six reads overlap instead of taking 0.2s each
+    assert elapsed < 1.0
+    assert responses["admin"]["status"] == 403
+    # The writes share one session, and a sub-request cannot swap in other credentials
+    assert responses["w1"]["status"] == responses["w2"]["status"] == 200
+    assert responses["w1"]["body"]["session"] == responses["w2"]["body"]["session"]
+    assert responses["nested"]["status"] == 400
+
+    assert client.post("/batch", json={"requests": []}).status_code == 401
+
+
+def test_batch_refuses_streams_and_long_polls_and_times_out_slow_items(monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_ITEM_TIMEOUT_SECONDS", 0.5)
+    client = TestClient(make_app())
+    token = auth_scheme.create_access_token(subject={"username": "kaleb", "roles": ["user"]})
+
+    response = client.post("/batch", headers={"Authorization": f"Bearer {token}"}, json={"requests": [
+        {"id": "sse", "method": "GET", "path": "/events/stream"},
+        {"id": "poll", "method": "GET", "path": "/changes/?since=0&wait=30"},
+        {"id": "no-wait", "method": "GET", "path": "/changes/?since=0&wait=0"},
+        {"id": "slow", "method": "GET", "path": "/items/99"},
+        {"id": "fast", "method": "GET", "path": "/items/1"},
+    ]})
+    responses = {item["id"]: item for item in response.json()["responses"]}
+    assert responses["sse"]["status"] == responses["poll"]["status"] == 400
+    # Not mounted here, but let through to the application
+    assert responses["no-wait"]["status"] == 404
+    assert responses["slow"]["status"] == 504
+    assert responses["slow"]["body"] == {"detail": "Sub-request timed out"}
+    assert responses["fast"]["body"] == {"item_id": 1}
@@ -0,0 +1,69 @@
+import io
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app.db.session import Base
+from app.models.address import Address
+from app.models.import_checkpoint import ImportCheckpoint
+from app.models.organisation import Organisation
+from app.models.party_address import PartyAddress
+from app.models.person import Person
+from app.services.bulk_import import import_parties
+from app.services.party_search import search_parties
+
+CSV = """party_type,first_name,last_name,email,phone_primary,address_line_1,city,postal_code,country,address_type
+person,Jeremy,Clarkson,jeremy@diddlysquat.co.uk,0123,Diddly Squat Farm,Chipping Norton,ox75qa,UK,business
+person,Kaleb,Cooper,kaleb@diddlysquat.co.uk,0456,Diddly  Squat Farm,Chipping Norton,OX7 5QA,United Kingdom,business
+person,Lisa,Hogan,not-an-email,0789,,,,,
+person,Jeremy,Clone,jeremy@diddlysquat.co.uk,0123,,,,,
+"""
+
+NDJSON = """{"organisation_name": "Diddly Squat Ltd", "organisation_type": "Farm", "email": "shop@diddlysquat.co.uk", "phone_primary": "1", "addresses": [{"address_line_1": "Diddly Squat Farm", "city": "Chipping Norton", "postal_code": "OX7 5QA", "country": "GB", "address_type": "business"}]}
+not json
+"""
+
+
+def make_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'import.db'}")
+    Base.metadata.create_all(engine)
+    return Session(engine)
+
+
+def count(db, model):
+    return db.scalar(select(func.count()).select_from(model))
+
+
+def test_import_validates_rejects_and_shares_addresses(tmp_path):
+    db = make_session(tmp_path)
+    rejects = []
+    stats = import_parties(db, io.StringIO(CSV), "csv", chunk_size=2, on_reject=rejects.append)
+    assert (stats["rows"], stats["imported"], stats["rejected"]) == (4, 2, 2)
+    assert [reject["line"] for reject in rejects] == [4, 5]
+    assert "already exists" in rejects[1]["errors"][0]
+
+    stats = import_parties(db, io.StringIO(NDJSON), "ndjson", default_party_type="organisation")
+    assert (stats["imported"], stats["rejected"]) == (1, 1)
+
+    assert count(db, Person) == 2 and count(db, Organisation) == 1
+    # Both spellings of the farm's address canonicalize to one row, linked to every party
+    assert count(db, Address) == 1
+    assert count(db, PartyAddress) == 3
+    assert len(search_parties(db, "cooper")) == 1
+    db.close()
+
+
+def test_checkpoint_resumes_after_committed_rows(tmp_path):
+    db = make_session(tmp_path)
+    stats = import_parties(db, io.StringIO(CSV), "csv", chunk_size=2, checkpoint="farm", source="farm.csv")
+    assert stats["resumed_at"] == 0
+    checkpoint = db.get(ImportCheckpoint, "farm")
+    assert (checkpoint.position, checkpoint.imported, checkpoint.rejected) == (4, 2, 2)
+
+    # Pretend the run stopped after the first chunk: the rerun picks up at row 3
+    checkpoint.position, checkpoint.imported, checkpoint.rejected = 2, 2, 0
+    db.commit()
+    stats = import_parties(db, io.StringIO(CSV), "csv", chunk_size=2, checkpoint="farm")
+    assert (stats["resumed_at"], stats["rows"], stats["imported"], stats["rejected"]) == (2, 2, 0, 2)
+    assert count(db, Person) == 2
+    db.close()
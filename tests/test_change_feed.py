@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models
+from app.db.session import Base
+from app.models.outbox_event import OutboxEvent
+from app.services import outbox_reader
+from app.services.change_feed import read_changes
+from app.services.outbox_reader import latest_event_id, read_events_since
+
+
+def test_read_changes_advances_past_filtered_events():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all([
+        OutboxEvent(event_type="PersonCreated", payload={"party_id": 1}),
+        OutboxEvent(event_type="PartyRelationshipCreated", payload={"from_party_id": 2, "to_party_id": 1}),
+        OutboxEvent(event_type="PersonUpdated", payload={"party_id": 3}),
+        OutboxEvent(event_type="PartiesMerged", payload={"party_id": 4, "merged_party_ids": [1]}),
+    ])
+    db.commit()
+
+    events, cursor = read_changes(db, 0, limit=3, party_id=1)
+    assert [event.event_id for event in events] == [1, 2]
+    assert cursor == 3
+    events, cursor = read_changes(db, cursor, limit=3, party_id=1)
+    assert [event.event_id for event in events] == [4]
+    assert read_changes(db, cursor) == ([], 4)
+    events, _ = read_changes(db, 0, event_types={"PersonUpdated"})
+    assert [event.event_id for event in events] == [3]
+    db.close()
+
+
+def test_readers_stop_before_events_that_may_still_be_filled_in(monkeypatch):
+    # As on a database whose writers commit concurrently
+    monkeypatch.setattr(outbox_reader, "SERIALIZED_WRITERS", set())
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    old = datetime.now(timezone.utc) - timedelta(minutes=1)
+    db.add_all([
+        OutboxEvent(event_id=1, event_type="PersonCreated", payload={"party_id": 1}, created_at=old),
+        # Id 2 belongs to a transaction that has not committed; 3 committed just now, 4 long ago
+        OutboxEvent(event_id=3, event_type="PersonCreated", payload={"party_id": 3}),
+        OutboxEvent(event_id=4, event_type="PersonCreated", payload={"party_id": 4}, created_at=old),
+    ])
+    db.commit()
+
+    events, cursor = read_changes(db, 0)
+    assert [event.event_id for event in events] == [1]
+    assert cursor == 1
+    assert [event_id for event_id, _, _ in read_events_since(db, 0)] == [1]
+    assert latest_event_id(db) == 1
+
+    db.add(OutboxEvent(event_id=2, event_type="PersonCreated", payload={"party_id": 2}, created_at=old))
+    db.query(OutboxEvent).filter(OutboxEvent.event_id == 3).update({"created_at": old})
+    db.commit()
+    events, cursor = read_changes(db, cursor)
+    assert [event.event_id for event in events] == [2, 3, 4]
+    db.close()
@@ -0,0 +1,54 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models
+from app.db.session import Base
+from app.models.duplicate_candidate import DuplicateCandidate
+from app.models.party import Party
+from app.models.person import Person
+from app.services.dedup import find_duplicates, normalize_email, organisation_name_key, phone_suffix, soundex
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def add_person(db, party_id, first_name, last_name, email, phone, date_of_birth=None):
+    db.add(Party(party_id=party_id, party_type="person", display_name=f"{first_name} {last_name}"))
+    db.add(Person(party_id=party_id, first_name=first_name, last_name=last_name, email=email,
+                  phone_primary=phone, date_of_birth=date_of_birth))
+
+
+def test_blocking_keys_normalize():
+    assert normalize_email(" Jeremy.Clarkson+farm@GoogleMail.com") == "jeremyclarkson@gmail.com"
+    assert phone_suffix("+44 7700 900123") == phone_suffix("07700-900123")
+    assert soundex("Robert") == soundex("Rupert") == "R163"
+    assert soundex("Ashcraft") == "A261"
+    assert organisation_name_key("Diddly Squat Farm Ltd.") == "diddly squat farm"
+
+
+def test_find_duplicates_scores_pairs_within_blocks(db):
+    add_person(db, 1, "Jeremy", "Clarkson", "jeremy@farm.com", "07700 900123", date(1960, 4, 11))
+    add_person(db, 2, "Jeremy", "Clarksen", "j.clarkson@other.com", "+44 7700 900123", date(1960, 4, 11))
+    add_person(db, 3, "Kaleb", "Cooper", "kaleb@farm.com", "07700 900456", date(1998, 1, 1))
+    # Same phone, different person and birth date
+    add_person(db, 4, "Lisa", "Hogan", "lisa@farm.com", "07700 900456", date(1973, 6, 1))
+    db.commit()
+
+    stats = find_duplicates(db, "person", min_score=0.6)
+    candidates = db.query(DuplicateCandidate).all()
+    assert stats["pairs_compared"] == 2
+    assert [(c.party_id, c.duplicate_party_id, c.matched_on) for c in candidates] == [(1, 2, "phone,surname_dob")]
+
+    # A rerun replaces the previous results
+    find_duplicates(db, "person", min_score=0.6)
+    assert db.query(DuplicateCandidate).count() == 1
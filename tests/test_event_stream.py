@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import events
+from app.routes.auth import auth_scheme
+from app.services.event_stream import EventBroadcaster, Subscriber
+
+
+def test_broadcast_filters_and_bounds_buffers():
+    broadcaster = EventBroadcaster(buffer_size=2)
+    all_events = Subscriber(None, None, broadcaster.buffer_size)
+    party_events = Subscriber({"PersonUpdated"}, 7, broadcaster.buffer_size)
+    broadcaster.subscribers.update({all_events, party_events})
+
+    broadcaster.broadcast("1-0", "PersonUpdated", {"party_id": 7})
+    broadcaster.broadcast("2-0", "PersonUpdated", {"party_id": 8})
+    assert party_events.queue.qsize() == 1
+    assert all_events.queue.qsize() == 2
+
+    # A third event overflows the unfiltered subscriber, which is dropped with a close marker
+    broadcaster.broadcast("3-0", "OrganisationCreated", {"party_id": 9})
+    assert all_events.overflowed
+    assert all_events.queue.get_nowait() is None
+    assert broadcaster.subscribers == {party_events}
+
+
+def test_websocket_unsubscribes_when_the_client_disconnects(monkeypatch):
+    broadcaster = EventBroadcaster(buffer_size=10)
+
+    async def idle():
+        await asyncio.Event().wait()
+
+    # No Redis here; events are handed to the broadcaster directly
+    monkeypatch.setattr(broadcaster, "run", idle)
+    monkeypatch.setattr(events, "event_broadcaster", broadcaster)
+    app = FastAPI()
+    app.include_router(events.router, prefix="/events")
+    token = auth_scheme.create_access_token(subject={"username": "kaleb", "roles": ["user"]})
+
+    with TestClient(app) as client:
+        with client.websocket_connect(f"/events/ws?token={token}") as websocket:
+            deadline = time.monotonic() + 2
+            while not broadcaster.subscribers and time.monotonic() < deadline:
+                time.sleep(0.01)
+            client.portal.call(broadcaster.broadcast, "1-0", "PersonCreated", {"party_id": 1})
+            assert websocket.receive_json() == {"id": "1-0", "event_type": "PersonCreated", "payload": {"party_id": 1}}
+            # Closed while no events are flowing: the subscription still goes away
+            websocket.send({"type": "websocket.disconnect", "code": 1000})
+            deadline = time.monotonic() + 2
+            while broadcaster.subscribers and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert not broadcaster.subscribers
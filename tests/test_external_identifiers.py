@@ -0,0 +1,74 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models
+from app.api.v1.endpoints import external_identifiers
+from app.db.session import Base, get_db
+from app.models.party import Party
+from app.routes.auth import auth_scheme
+
+
+@pytest.fixture
+def client():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add_all([Party(party_id=i, party_type="organisation", display_name=f"Org {i}") for i in (1, 2)])
+        db.commit()
+
+    def get_test_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    api = FastAPI()
+    api.include_router(external_identifiers.router, prefix="/external-identifiers")
+    api.dependency_overrides[get_db] = get_test_db
+    token = auth_scheme.create_access_token(subject={"username": "kaleb", "roles": ["user"]})
+    client = TestClient(api, headers={"Authorization": f"Bearer {token}"})
+    for party_id, system_name, external_id in [(1, "crm", "C-1"), (1, "erp", "E-9"), (2, "crm", "C-2")]:
+        response = client.post("/external-identifiers/", json={
+            "party_id": party_id, "system_name": system_name, "external_id": external_id,
+        })
+        assert response.status_code == 200
+    yield client
+    engine.dispose()
+
+
+def test_lookup_by_system_and_external_id(client):
+    response = client.get("/external-identifiers/lookup", params={"system_name": "crm", "external_id": "C-2"})
+    assert response.status_code == 200
+    assert response.json()["data"]["party_id"] == 2
+    # The same external_id in another system is a different identifier
+    assert client.get("/external-identifiers/lookup",
+                      params={"system_name": "erp", "external_id": "C-2"}).status_code == 404
+
+
+def test_resolve_returns_a_result_per_key_in_order(client):
+    response = client.post("/external-identifiers/resolve", json={"identifiers": [
+        {"system_name": "erp", "external_id": "E-9"},
+        {"system_name": "crm", "external_id": "C-404"},
+        {"system_name": "crm", "external_id": "C-2"},
+        {"system_name": "billing", "external_id": "C-1"},
+    ]})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["resolved"] == 2
+    assert [result["data"]["party_id"] for result in body["results"]] == [1, None, 2, None]
+    assert body["results"][1]["links"] == []
+
+
+def test_duplicate_identifiers_conflict(client):
+    # Another party claiming the same system and external_id, or a second id for a party in one system
+    for party_id, external_id in [(2, "C-1"), (1, "C-3")]:
+        response = client.post("/external-identifiers/", json={
+            "party_id": party_id, "system_name": "crm", "external_id": external_id,
+        })
+        assert response.status_code == 409
@@ -0,0 +1,42 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.api.v1.fieldsets import Fieldset, get_fieldset
+from app.models.party import Party
+from app.schemas.party import PartyRead
+
+
+def test_get_fieldset_parses_and_deduplicates():
+    fieldset = get_fieldset(fields="display_name, party_id,display_name,", links=False)
+    assert fieldset.fields == ["display_name", "party_id"]
+    assert fieldset.links is False
+
+    assert get_fieldset(fields="", links=True).fields is None
+
+
+def test_apply_prunes_selected_columns():
+    query = Session().query(Party)
+    pruned = Fieldset(["display_name"]).apply(query, Party, PartyRead)
+    sql = str(pruned)
+    assert "parties.display_name" in sql
+    assert "parties.party_id" in sql
+    assert "parties.created_at" not in sql
+    assert "parties.party_type" not in sql
+
+    with_links = Fieldset(["display_name"]).apply(query, Party, PartyRead, "party_type")
+    assert "parties.party_type" in str(with_links)
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(HTTPException) as exc:
+        Fieldset(["display_name", "password"]).validate(PartyRead)
+    assert exc.value.status_code == 400
+
+
+def test_dump_only_returns_requested_fields():
+    party = Party(party_id=7, party_type="person", display_name="Kaleb Cooper")
+    assert Fieldset(["party_id", "display_name"]).dump(party, PartyRead) == {
+        "party_id": 7,
+        "display_name": "Kaleb Cooper",
+    }
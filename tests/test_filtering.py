@@ -0,0 +1,56 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.api.v1.filtering import ListQuery, index_keys
+from app.models.address import Address
+from app.models.party import Party
+from app.models.party_relationship import PartyRelationship
+from app.models.person import Person
+
+
+def test_index_keys_list_columns_in_key_order():
+    assert ["postal_code", "city"] in index_keys(Address)
+    assert ["last_name", "first_name"] in index_keys(Person)
+    assert ["party_id"] in index_keys(Person)
+    assert ["to_party_id", "start_date", "end_date"] in index_keys(PartyRelationship)
+
+
+def test_filters_compile_to_bound_parameters():
+    list_query = ListQuery([("postal_code", "prefix", "SW1"), ("city", "eq", "London")])
+    query = list_query.apply(Session().query(Address), Address)
+    sql = str(query)
+    assert "addresses.city = :city_1" in sql
+    assert "SW1" not in sql and "London" not in sql
+
+
+def test_sort_adds_primary_key_tiebreak():
+    query = ListQuery(sort=["-party_type"]).apply(Session().query(Party), Party)
+    assert "ORDER BY parties.party_type DESC, parties.party_id ASC" in str(query)
+
+
+@pytest.mark.parametrize("model, filters, sort", [
+    (Party, [("party_type", "eq", "person")], ["-updated_at"]),
+    (Person, [("last_name", "eq", "Cooper"), ("first_name", "eq", "Kaleb")], []),
+    (Person, [("last_name", "eq", "Cooper")], ["first_name"]),
+    (Address, [("postal_code", "prefix", "SW1"), ("city", "eq", "London")], []),
+    (Address, [("city", "eq", "London"), ("postal_code", "gte", "SW1")], ["city"]),
+    (PartyRelationship, [("from_party_id", "eq", "1"), ("start_date", "gte", "2024-01-01")], ["start_date"]),
+])
+def test_queries_on_a_leftmost_index_prefix_are_accepted(model, filters, sort):
+    ListQuery(filters, sort).apply(Session().query(model), model)
+
+
+@pytest.mark.parametrize("filters, sort", [
+    ([("phone_primary", "eq", "0123")], []),
+    ([("first_name", "eq", "Kaleb")], []),
+    ([("last_name", "prefix", "Coo")], ["first_name"]),
+    ([("last_name", "gte", "C"), ("first_name", "gte", "K")], []),
+    ([("email", "eq", "kaleb@diddlysquat.co.uk")], ["last_name"]),
+    ([("no_such_field", "eq", "x")], []),
+    ([], ["display_name"]),
+])
+def test_queries_no_single_index_covers_are_rejected(filters, sort):
+    with pytest.raises(HTTPException) as exc:
+        ListQuery(filters, sort).apply(Session().query(Person), Person)
+    assert exc.value.status_code == 400
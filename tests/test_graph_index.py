@@ -0,0 +1,57 @@
+from app.services.graph_index import GraphIndex
+
+
+def build_graph():
+    graph = GraphIndex()
+    graph.loaded = True
+    edges = [(1, 2, 10, "subsidiary_of"), (2, 3, 11, "subsidiary_of"), (3, 1, 12, "subsidiary_of"),
+             (3, 4, 13, "subsidiary_of"), (4, 5, 14, "director_of")]
+    graph._rebuild([(src, dst, rid, graph._type_code(t)) for src, dst, rid, t in edges])
+    return graph
+
+
+def test_shortest_path_respects_direction_and_types():
+    graph = build_graph()
+    assert graph.shortest_path(1, 5) == ([1, 3, 4, 5], [12, 13, 14])
+    assert graph.shortest_path(1, 5, direction="outgoing") == ([1, 2, 3, 4, 5], [10, 11, 13, 14])
+    assert graph.shortest_path(5, 1, direction="outgoing") is None
+    assert graph.shortest_path(1, 5, types=["subsidiary_of"]) is None
+    assert graph.shortest_path(1, 5, max_depth=2) is None
+
+
+def test_k_hop_and_component():
+    graph = build_graph()
+    distances, truncated = graph.k_hop(1, 2, direction="outgoing")
+    assert distances == {1: 0, 2: 1, 3: 2}
+    assert not truncated
+    assert graph.component(5) == ({1, 2, 3, 4, 5}, False)
+    assert graph.component(5, limit=2)[1] is True
+
+
+def test_incremental_updates_and_compaction():
+    graph = build_graph()
+    graph.apply_event("PartyRelationshipDeleted", {"relationship_id": 13, "from_party_id": 3, "to_party_id": 4})
+    graph.apply_event("PartyRelationshipCreated", {"relationship_id": 15, "from_party_id": 2, "to_party_id": 4,
+                                                   "relationship_type": "subsidiary_of"})
+    # Replayed events for edges already present must not duplicate them
+    graph.apply_event("PartyRelationshipCreated", {"relationship_id": 10, "from_party_id": 1, "to_party_id": 2,
+                                                   "relationship_type": "subsidiary_of"})
+    assert graph.shortest_path(1, 5) == ([1, 2, 4, 5], [10, 15, 14])
+    assert graph.stats()["relationships"] == 5
+
+    graph.compact()
+    assert graph.stats()["pending_delta"] == 0
+    assert graph.shortest_path(1, 5) == ([1, 2, 4, 5], [10, 15, 14])
+
+    graph.apply_event("PersonDeleted", {"party_id": 4})
+    assert graph.component(1) == ({1, 2, 3}, False)
+
+
+def test_merge_event_repoints_edges():
+    graph = build_graph()
+    # 3 is merged into 1: the 3 -> 1 edge (12) becomes a self-loop and is deleted
+    graph.apply_event("PartiesMerged", {"party_id": 1, "merged_party_ids": [3], "deleted_relationship_ids": [12]})
+    assert sorted(graph.neighbours(1, "outgoing")) == [(2, 10, 0), (4, 13, 0)]
+    assert sorted(graph.neighbours(2, "outgoing")) == [(1, 11, 0)]
+    assert list(graph.neighbours(3)) == []
+    assert graph.stats()["relationships"] == 4
@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models
+from app.db.session import Base
+from app.models.party import Party
+from app.models.party_hierarchy import PartyHierarchy
+from app.models.party_relationship import PartyRelationship
+from app.services import hierarchy
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    for party_id in range(1, 6):
+        session.add(Party(party_id=party_id, party_type="organisation", display_name=f"Org {party_id}"))
+    session.flush()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def link(db, child, parent):
+    relationship = PartyRelationship(from_party_id=child, to_party_id=parent, relationship_type="subsidiary_of")
+    db.add(relationship)
+    db.flush()
+    hierarchy.add_relationship(db, relationship)
+    return relationship
+
+
+def descendants(db, party_id):
+    related = hierarchy.related(party_id, "descendants")
+    return sorted(db.execute(related.select()).all())
+
+
+def test_diamond_keeps_paths_until_last_one_removed(db):
+    link(db, 2, 1)
+    link(db, 3, 1)
+    via_two = link(db, 4, 2)
+    link(db, 4, 3)
+    link(db, 5, 4)
+    assert descendants(db, 1) == [(2, 1), (3, 1), (4, 2), (5, 3)]
+    assert hierarchy.creates_cycle(db, "subsidiary_of", 1, 5)
+
+    hierarchy.remove_relationship(db, via_two)
+    assert descendants(db, 1) == [(2, 1), (3, 1), (4, 2), (5, 3)]
+    assert descendants(db, 2) == []
+
+
+def test_rebuild_matches_incremental_maintenance(db):
+    link(db, 2, 1)
+    link(db, 3, 2)
+    link(db, 4, 3)
+    incremental = sorted(tuple(row) for row in db.query(
+        PartyHierarchy.ancestor_id, PartyHierarchy.descendant_id, PartyHierarchy.depth, PartyHierarchy.path_count
+    ))
+    db.commit()
+    assert hierarchy.rebuild(db) == 3
+    rebuilt = sorted(tuple(row) for row in db.query(
+        PartyHierarchy.ancestor_id, PartyHierarchy.descendant_id, PartyHierarchy.depth, PartyHierarchy.path_count
+    ))
+    assert rebuilt == incremental
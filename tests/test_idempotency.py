@@ -0,0 +1,77 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import Base
+from app.db.sqlite import IMMEDIATE, apply_sqlite_profile
+from app.middleware.idempotency import IdempotencyMiddleware
+from app.routes.auth import auth_scheme
+from app.services.idempotency import DatabaseIdempotencyStore
+
+
+def make_app(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'idempotency.db'}", connect_args={"check_same_thread": False})
+    apply_sqlite_profile(engine)
+    Base.metadata.create_all(engine)
+    # Like WriteSessionLocal, so concurrent reservations queue for the write lock
+    write_engine = engine.execution_options(**{IMMEDIATE: True})
+    store = DatabaseIdempotencyStore(sessionmaker(bind=write_engine), ttl=60, lock_seconds=60)
+
+    app = FastAPI()
+    app.state.calls = 0
+
+    @app.post("/persons/")
+    async def create(payload: dict):
+        app.state.calls += 1
+        await asyncio.sleep(0.2)
+        if payload.get("fail"):
+            return app.state.calls / 0
+        return {"party_id": app.state.calls, **payload}
+
+    app.add_middleware(IdempotencyMiddleware, store=store, paths=["/persons/"], wait_seconds=5)
+    return app
+
+
+def token(username):
+    return auth_scheme.create_access_token(subject={"username": username, "roles": ["user"]})
+
+
+def test_retries_replay_the_first_response(tmp_path):
+    app = make_app(tmp_path)
+    kaleb, jeremy = token("kaleb"), token("jeremy")
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            def post(key, payload, bearer=kaleb):
+                return client.post("/persons/", json=payload,
+                                   headers={"Idempotency-Key": key, "Authorization": f"Bearer {bearer}"})
+
+            # Concurrent duplicates: one runs, the other waits and gets its response
+            first, second = await asyncio.gather(post("k1", {"name": "Kaleb"}), post("k1", {"name": "Kaleb"}))
+            assert first.json() == second.json() == {"party_id": 1, "name": "Kaleb"}
+            assert {first.headers.get("idempotent-replayed"), second.headers.get("idempotent-replayed")} == {None, "true"}
+
+            # A retry after logging in again still belongs to the same user
+            retry = await post("k1", {"name": "Kaleb"}, bearer=token("kaleb"))
+            assert retry.json()["party_id"] == 1
+
+            assert (await post("k1", {"name": "Jeremy"})).status_code == 422
+            # The stored body is already encoded, so asking for another encoding is not a retry
+            other_encoding = await client.post("/persons/", json={"name": "Kaleb"}, headers={
+                "Idempotency-Key": "k1", "Authorization": f"Bearer {kaleb}", "Accept": "application/msgpack"})
+            assert other_encoding.status_code == 422
+            # Another user's key of the same name is their own
+            assert (await post("k1", {"name": "Kaleb"}, bearer=jeremy)).json()["party_id"] == 2
+
+            # Server errors are not stored, so the retry runs again
+            assert (await post("k2", {"fail": True})).status_code == 500
+            assert (await post("k2", {"fail": True})).status_code == 500
+            assert app.state.calls == 4
+
+            assert (await client.post("/persons/", json={"name": "Lisa"})).json()["party_id"] == 5
+
+    asyncio.run(scenario())
@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models
+from app.db.session import Base
+from app.models.address import Address
+from app.models.external_identifier import ExternalIdentifier
+from app.models.outbox_event import OutboxEvent
+from app.models.party import Party
+from app.models.party_address import PartyAddress
+from app.models.party_relationship import PartyRelationship
+from app.services.merge import merge_parties
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_merge_repoints_and_deduplicates(db):
+    db.add_all([Party(party_id=i, party_type="organisation", display_name=f"Org {i}") for i in range(1, 5)])
+    db.add_all([Address(address_id=i, address_line_1=f"{i} Farm Lane", city="Chipping Norton",
+                        postal_code="OX7", country="UK", address_type="Business") for i in (1, 2)])
+    db.add_all([PartyAddress(party_id=1, address_id=1), PartyAddress(party_id=2, address_id=1),
+                PartyAddress(party_id=2, address_id=2), PartyAddress(party_id=3, address_id=2)])
+    db.add_all([
+        PartyRelationship(relationship_id=1, from_party_id=1, to_party_id=4, relationship_type="supplier"),
+        PartyRelationship(relationship_id=2, from_party_id=2, to_party_id=4, relationship_type="supplier"),
+        PartyRelationship(relationship_id=3, from_party_id=2, to_party_id=3, relationship_type="supplier"),
+        PartyRelationship(relationship_id=4, from_party_id=4, to_party_id=3, relationship_type="customer"),
+    ])
+    db.add_all([ExternalIdentifier(party_id=1, system_name="crm", external_id="A"),
+                ExternalIdentifier(party_id=2, system_name="crm", external_id="B"),
+                ExternalIdentifier(party_id=3, system_name="erp", external_id="C")])
+    db.commit()
+
+    survivor = db.get(Party, 1)
+    summary = merge_parties(db, survivor, [2, 3])
+    db.commit()
+
+    assert summary["deleted_relationship_ids"] == [2, 3]
+    assert sorted((r.from_party_id, r.to_party_id, r.relationship_type)
+                  for r in db.query(PartyRelationship)) == [(1, 4, "supplier"), (4, 1, "customer")]
+    assert sorted((pa.party_id, pa.address_id) for pa in db.query(PartyAddress)) == [(1, 1), (1, 2)]
+    assert sorted((ei.party_id, ei.system_name) for ei in db.query(ExternalIdentifier)) == [(1, "crm"), (1, "erp")]
+    assert sorted(party_id for (party_id,) in db.query(Party.party_id)) == [1, 4]
+    event = db.query(OutboxEvent).one()
+    assert event.event_type == "PartiesMerged"
+    assert event.payload["merged_party_ids"] == [2, 3]
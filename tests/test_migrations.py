@@ -0,0 +1,85 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+
+import app.models
+from app.api.v1.endpoints import addresses
+from app.db import migrations
+from app.db.session import Base, get_db
+from app.routes.auth import auth_scheme
+
+
+def index_names(engine, table):
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+def test_upgrade_downgrade_and_current(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    assert migrations.current(engine) is None
+
+    versions = [m.version for m in migrations.MIGRATIONS]
+    assert [m.version for m in migrations.upgrade(engine)] == versions
+    assert migrations.current(engine) == migrations.HEAD
+    assert "ix_party_addresses_address_id" in index_names(engine, "party_addresses")
+    assert migrations.upgrade(engine) == []
+
+    assert [m.version for m in migrations.downgrade(engine, "0001")] == versions[:0:-1]
+    assert migrations.current(engine) == "0001"
+    assert "ix_party_addresses_address_id" not in index_names(engine, "party_addresses")
+    assert "ix_party_relationships_from_party_dates" not in index_names(engine, "party_relationships")
+
+    # Indexes that already exist are left alone on the way back up
+    with engine.begin() as conn:
+        migrations.create_index(conn, "ix_party_addresses_address_id", "party_addresses", ["address_id"])
+    migrations.upgrade(engine)
+    assert "ix_party_relationships_from_party_dates" in index_names(engine, "party_relationships")
+
+    migrations.downgrade(engine, migrations.BASE)
+    assert migrations.current(engine) is None
+    assert inspect(engine).get_table_names() == ["schema_migrations"]
+    engine.dispose()
+
+
+def test_upgrade_brings_a_baseline_database_up_to_the_models(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}", connect_args={"check_same_thread": False})
+    # What `manage_db create` built before migrations existed, with nothing recorded
+    with engine.begin() as conn:
+        migrations.initial_upgrade(conn)
+    migrations.upgrade(engine)
+
+    expected = create_engine(f"sqlite:///{tmp_path / 'models.db'}")
+    Base.metadata.create_all(expected)
+    for table in Base.metadata.tables:
+        assert {column["name"] for column in inspect(engine).get_columns(table)} == \
+            {column["name"] for column in inspect(expected).get_columns(table)}
+    expected.dispose()
+
+    api = FastAPI()
+    api.include_router(addresses.router, prefix="/addresses")
+    Session = sessionmaker(bind=engine)
+
+    def get_test_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    api.dependency_overrides[get_db] = get_test_db
+    token = auth_scheme.create_access_token(subject={"username": "gerald", "roles": ["user"]})
+    client = TestClient(api, headers={"Authorization": f"Bearer {token}"})
+    address = {"address_line_1": "Diddly Squat Farm", "city": "Chadlington", "postal_code": "ox7 3pe",
+               "country": "United Kingdom", "address_type": "business"}
+    first = client.post("/addresses/", json=address)
+    assert first.status_code == 200
+    assert client.post("/addresses/", json=address).json()["data"] == first.json()["data"]
+    engine.dispose()
+
+
+def test_stamp_records_versions_without_running_them(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'stamp.db'}")
+    migrations.stamp(engine, "0001")
+    assert migrations.applied_versions(engine) == ["0001"]
+    assert not inspect(engine).has_table("parties")
+    engine.dispose()
@@ -0,0 +1,33 @@
+from app.middleware.compression import choose_encoding, parse_qualities
+from app.middleware.negotiation import choose_media_type
+
+
+def test_parse_qualities():
+    assert parse_qualities("gzip;q=0.5, br, identity;q=bogus") == {
+        "gzip": 0.5,
+        "br": 1.0,
+        "identity": 0.0,
+    }
+
+
+def test_choose_encoding_prefers_brotli_then_gzip():
+    assert choose_encoding("gzip, deflate, br") == "br"
+    assert choose_encoding("gzip, br;q=0.1") == "gzip"
+    assert choose_encoding("br;q=0, gzip;q=0") is None
+    assert choose_encoding("") is None
+
+
+def test_choose_media_type_defaults_to_json():
+    assert choose_media_type("") == "application/json"
+    assert choose_media_type("*/*") == "application/json"
+    assert choose_media_type("application/xml") == "application/json"
+    assert choose_media_type("application/msgpack") == "application/msgpack"
+    assert choose_media_type("application/json, application/cbor;q=0.5") == "application/json"
+
+
+def test_openapi_schema_builds_with_the_negotiated_default_response():
+    from app.main import app
+
+    schema = app.openapi()
+    assert "/persons/" in schema["paths"]
+    assert "200" in schema["paths"]["/persons/"]["post"]["responses"]
@@ -0,0 +1,51 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models
+from app.db.session import Base
+from app.models.party import Party
+from app.models.party_relationship import PartyRelationship
+from app.services.party_network import find_network, hop_distances
+
+
+def make_db(edges):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    party_ids = {party_id for edge in edges for party_id in edge}
+    db.add_all([Party(party_id=i, party_type="organisation", display_name=f"Org {i}") for i in party_ids])
+    db.add_all([
+        PartyRelationship(relationship_id=i, from_party_id=src, to_party_id=dst, relationship_type="supplier_of")
+        for i, (src, dst) in enumerate(edges, start=1)
+    ])
+    db.commit()
+    return db
+
+
+def walked(rows):
+    return [(relationship.relationship_id, hop) for relationship, hop in rows]
+
+
+def test_cycles_are_walked_once_per_hop():
+    # 1 -> 2 -> 3 -> 1, plus 3 -> 4
+    db = make_db([(1, 2), (2, 3), (3, 1), (3, 4)])
+    rows, truncated = find_network(db, 1, depth=5, direction="outgoing")
+    assert walked(rows) == [(1, 1), (2, 2), (3, 3), (4, 3)]
+    assert not truncated
+    assert hop_distances(1, rows, "outgoing") == {1: 0, 2: 1, 3: 2, 4: 3}
+
+    rows, _ = find_network(db, 1, depth=1, direction="both")
+    assert walked(rows) == [(1, 1), (3, 1)]
+    rows, _ = find_network(db, 4, depth=2, direction="incoming")
+    assert walked(rows) == [(4, 1), (2, 2)]
+    db.close()
+
+
+def test_network_is_truncated_at_the_limit():
+    db = make_db([(1, party_id) for party_id in range(2, 8)] + [(2, 8)])
+    rows, truncated = find_network(db, 1, depth=2, max_relationships=4)
+    assert walked(rows) == [(1, 1), (2, 1), (3, 1), (4, 1)]
+    assert truncated
+    rows, truncated = find_network(db, 1, depth=2, max_relationships=7)
+    assert len(rows) == 7 and not truncated
+    db.close()
@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models
+from app.db.session import Base
+from app.models.address import Address
+from app.models.organisation import Organisation
+from app.models.party import Party
+from app.models.party_address import PartyAddress
+from app.models.person import Person
+from app.services.party_search import rebuild_index, reindex_party, remove_parties, search_parties
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def add_person(db, party_id, first_name, last_name, email):
+    db.add(Party(party_id=party_id, party_type="person", display_name=f"{first_name} {last_name}"))
+    db.add(Person(party_id=party_id, first_name=first_name, last_name=last_name, email=email, phone_primary="0"))
+
+
+def test_search_ranks_across_names_and_addresses(db):
+    add_person(db, 1, "Jeremy", "Clarkson", "jeremy@farm.com")
+    add_person(db, 2, "Kaleb", "Cooper", "kaleb@farm.com")
+    db.add(Party(party_id=3, party_type="organisation", display_name="Diddly Squat Farm"))
+    db.add(Organisation(party_id=3, organisation_name="Diddly Squat Farm", organisation_type="Farm",
+                        registration_number="DS123", email="info@diddly.com", phone_primary="0"))
+    db.add(Address(address_id=1, address_line_1="Diddly Squat Farm", city="Chipping Norton",
+                   postal_code="OX7 3PE", country="UK", address_type="Business"))
+    db.add(PartyAddress(party_id=1, address_id=1))
+    db.flush()
+    for party_id in (1, 2, 3):
+        reindex_party(db, party_id)
+
+    assert search_parties(db, "Jeremy Chipping Norton") == [1]
+    assert search_parties(db, "ds123") == [3]
+    assert search_parties(db, "coop") == [2]
+    assert search_parties(db, "farm")[0] == 3
+    assert search_parties(db, "***") == []
+
+
+def test_remove_and_rebuild(db):
+    add_person(db, 1, "Lisa", "Hogan", "lisa@farmshop.com")
+    db.commit()
+    assert search_parties(db, "lisa") == []
+
+    assert rebuild_index(db) == 1
+    assert search_parties(db, "hogan") == [1]
+
+    remove_parties(db, [1])
+    assert search_parties(db, "hogan") == []
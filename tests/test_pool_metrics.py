@@ -0,0 +1,28 @@
+import pytest
+from sqlalchemy import create_engine, exc
+
+from app.db.pool_metrics import InstrumentedQueuePool, pool_stats
+
+
+def test_pool_stats_track_in_use_overflow_and_timeouts(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=1, pool_timeout=0.05,
+    )
+    first, second = engine.connect(), engine.connect()
+    stats = pool_stats(engine.pool)
+    assert (stats["size"], stats["in_use"], stats["overflow_in_use"]) == (1, 2, 1)
+    assert stats["checkouts"] == 2 and stats["timeouts"] == 0
+
+    # Pool and overflow are both taken, the next checkout waits out pool_timeout
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    stats = pool_stats(engine.pool)
+    assert stats["timeouts"] == 1
+    assert stats["wait_seconds_max"] >= 0.05
+
+    first.close()
+    second.close()
+    stats = pool_stats(engine.pool)
+    assert (stats["in_use"], stats["overflow_in_use"], stats["checked_in"]) == (0, 0, 1)
+    engine.dispose()
@@ -0,0 +1,57 @@
+from sqlalchemy import create_engine, insert, select
+from starlette.requests import Request
+
+from app.db.session import (
+    Base, RecentWriters, RoutingSession, reads_from_replica, recent_writers, takes_write_lock,
+)
+from app.models.party import Party
+
+
+def make_engines(tmp_path):
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine in (primary, replica):
+        Base.metadata.create_all(engine, tables=[Party.__table__])
+    return primary, replica
+
+
+def test_read_only_session_reads_replica_until_it_writes(tmp_path):
+    primary, replica = make_engines(tmp_path)
+    with replica.begin() as conn:
+        conn.execute(insert(Party), [{"party_type": "person", "display_name": "On replica"}])
+
+    db = RoutingSession(primary=primary, replicas=[replica], read_only=True)
+    assert db.scalars(select(Party.display_name)).all() == ["On replica"]
+
+    db.add(Party(party_type="person", display_name="On primary"))
+    db.flush()
+    # Once written, reads follow the write to the primary
+    assert db.wrote
+    assert db.scalars(select(Party.display_name)).all() == ["On primary"]
+    db.commit()
+    db.close()
+
+
+def test_write_session_and_missing_replicas_use_primary(tmp_path):
+    primary, replica = make_engines(tmp_path)
+    assert RoutingSession(primary=primary, replicas=[replica]).get_bind() is primary
+    assert RoutingSession(primary=primary, replicas=[], read_only=True).get_bind() is primary
+
+
+def test_recent_writers_expire():
+    writers = RecentWriters(window=0)
+    writers.record("client")
+    assert not writers.is_recent("client")
+    writers.window = 60
+    assert writers.is_recent("client")
+    assert not writers.is_recent("other")
+
+
+def test_recent_writer_reads_primary_without_the_write_lock():
+    def request(method):
+        return Request({"type": "http", "method": method, "headers": [(b"authorization", b"Bearer kaleb")]})
+
+    recent_writers.record("Bearer kaleb")
+    assert not reads_from_replica(request("GET"))
+    assert not takes_write_lock(request("GET"))
+    assert takes_write_lock(request("POST"))
@@ -0,0 +1,33 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.db.sqlite import IMMEDIATE, apply_sqlite_profile
+
+
+def test_profile_sets_pragmas_and_writers_lock_up_front(tmp_path):
+    path = tmp_path / "profile.db"
+    engine = create_engine(f"sqlite:///{path}")
+    apply_sqlite_profile(engine)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        conn.commit()
+
+    other = sqlite3.connect(path, timeout=0, isolation_level=None)
+    with engine.connect() as reader:
+        reader.execute(text("SELECT * FROM t")).all()
+        # A read transaction leaves the write lock free
+        other.execute("BEGIN IMMEDIATE")
+        other.execute("ROLLBACK")
+
+    with engine.execution_options(**{IMMEDIATE: True}).connect() as writer:
+        writer.execute(text("SELECT * FROM t")).all()
+        # The writer holds the lock from BEGIN, before it has written anything
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            other.execute("BEGIN IMMEDIATE")
+    other.close()
+    engine.dispose()
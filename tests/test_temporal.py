@@ -0,0 +1,47 @@
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models
+from app.api.v1.temporal import ActiveWindow, get_active_window
+from app.db.session import Base
+from app.models.party import Party
+from app.models.party_relationship import PartyRelationship
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([Party(party_id=i, party_type="organisation", display_name=f"Org {i}") for i in (1, 2)])
+    for relationship_id, start, end in [(1, date(2020, 1, 1), date(2020, 12, 31)),
+                                        (2, date(2021, 1, 1), None),
+                                        (3, None, date(2019, 6, 30))]:
+        session.add(PartyRelationship(relationship_id=relationship_id, from_party_id=1, to_party_id=2,
+                                      relationship_type="supplier", start_date=start, end_date=end))
+    session.flush()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def active(db, window):
+    query = window.apply(db.query(PartyRelationship.relationship_id), PartyRelationship)
+    return sorted(relationship_id for (relationship_id,) in query)
+
+
+def test_as_of_treats_missing_bounds_as_open(db):
+    assert active(db, get_active_window(as_of="2020-12-31", active_between=None)) == [1]
+    assert active(db, get_active_window(as_of="2030-01-01", active_between=None)) == [2]
+    assert active(db, get_active_window(as_of="2018-01-01", active_between=None)) == [3]
+    assert active(db, ActiveWindow()) == [1, 2, 3]
+
+
+def test_active_between_matches_overlapping_intervals(db):
+    assert active(db, get_active_window(as_of=None, active_between="2019-06-30,2020-01-01")) == [1, 3]
+    with pytest.raises(HTTPException):
+        get_active_window(as_of=None, active_between="2021-01-01,2020-01-01")
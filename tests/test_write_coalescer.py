@@ -0,0 +1,80 @@
+import threading
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import Base
+from app.db.sqlite import apply_sqlite_profile
+from app.models.outbox_event import OutboxEvent
+from app.models.person import Person
+from app.schemas.person import PersonCreate
+from app.services.person_writes import create_persons, update_persons
+from app.services.write_coalescer import WriteCoalescer
+
+
+def person(first_name, email):
+    return PersonCreate(first_name=first_name, last_name="Cooper", email=email, phone_primary="0123")
+
+
+@pytest.fixture
+def coalescer(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'coalesce.db'}")
+    # The profile's explicit BEGIN makes SAVEPOINT work on pysqlite
+    apply_sqlite_profile(engine)
+    Base.metadata.create_all(engine)
+    coalescer = WriteCoalescer(
+        handlers={"person_create": create_persons, "person_update": update_persons},
+        session_factory=sessionmaker(bind=engine, autoflush=False),
+        window=0.05,
+    )
+    yield coalescer
+    coalescer.stop()
+    engine.dispose()
+
+
+def count(coalescer, model):
+    with coalescer.session_factory() as db:
+        return db.scalar(select(func.count()).select_from(model))
+
+
+def test_concurrent_creates_share_a_transaction(coalescer):
+    barrier = threading.Barrier(10)
+    results = [None] * 10
+
+    def create(i):
+        barrier.wait()
+        results[i] = coalescer.submit("person_create", person(f"Kaleb {i}", f"kaleb{i}@diddlysquat.co.uk")).result()
+
+    threads = [threading.Thread(target=create, args=(i,)) for i in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [result.first_name for result in results] == [f"Kaleb {i}" for i in range(10)]
+    assert len({result.party_id for result in results}) == 10
+    assert coalescer.stats["operations"] == 10 and coalescer.stats["batches"] < 10
+    assert count(coalescer, Person) == 10
+    assert count(coalescer, OutboxEvent) == 10
+
+
+def test_failing_write_only_fails_its_caller(coalescer):
+    coalescer.submit("person_create", person("Kaleb", "kaleb@diddlysquat.co.uk")).result()
+    futures = [
+        coalescer.submit("person_create", person("Jeremy", "jeremy@diddlysquat.co.uk")),
+        coalescer.submit("person_create", person("Clone", "kaleb@diddlysquat.co.uk")),
+        coalescer.submit("person_update", (1, person("Kaleb", "kaleb.cooper@diddlysquat.co.uk"))),
+        coalescer.submit("person_update", (99, person("Nobody", "nobody@diddlysquat.co.uk"))),
+    ]
+
+    assert futures[0].result().first_name == "Jeremy"
+    with pytest.raises(IntegrityError):
+        futures[1].result()
+    assert futures[2].result().email == "kaleb.cooper@diddlysquat.co.uk"
+    assert futures[3].result() is None
+    assert coalescer.stats["replayed_batches"] == 1
+    assert count(coalescer, Person) == 2
+    # The clone's party and outbox event were rolled back with its savepoint
+    assert count(coalescer, OutboxEvent) == 3